@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for the indicator calculators in server.py.
+
+Runs each indicator over ~20 years of synthetic daily bars and reports the
+best-of-N wall time. Iterative indicators are timed both with the compiled
+numba kernels (when numba is installed) and with the pure-Python fallback;
+sliding-window indicators are compared with the rolling().apply() callbacks
+they replaced.
+
+Usage:
+    python benchmarks/bench_indicators.py [--bars 5040] [--repeat 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+CURRENT_DIR = Path(__file__).resolve().parent
+if str(CURRENT_DIR.parent) not in sys.path:
+    sys.path.insert(0, str(CURRENT_DIR.parent))
+
+import server  # type: ignore  # noqa: E402
+
+
+def make_daily_bars(n_bars: int, seed: int = 7) -> pd.DataFrame:
+    """Random-walk OHLCV bars on a business-day index."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, n_bars)))
+    spread = close * rng.uniform(0.002, 0.03, n_bars)
+    return pd.DataFrame({
+        'open': close + rng.normal(0, 0.5, n_bars),
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.integers(1_000_000, 5_000_000, n_bars),
+    }, index=pd.bdate_range('2005-01-03', periods=n_bars))
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    fn()  # warm-up (includes numba compilation)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def iterative_cases(df: pd.DataFrame) -> Dict[str, Callable[[], object]]:
+    return {
+        'SUPERTREND(10, 3)': lambda: server.calculate_supertrend(df, 10, 3.0),
+        'PARABOLIC_SAR(0.02, 0.2)': lambda: server.calculate_psar(df, 0.02, 0.2),
+    }
+
+
+def windowed_cases(df: pd.DataFrame) -> Dict[str, tuple]:
+    """(vectorized, rolling().apply reference) pairs."""
+    weights = np.arange(1, 21)
+    tp = (df['high'] + df['low'] + df['close']) / 3
+    return {
+        'WMA(20)': (
+            lambda: server.calculate_wma(df, 20),
+            lambda: df['close'].rolling(20).apply(lambda x: np.dot(x, weights) / weights.sum(), raw=True),
+        ),
+        'AROON(25)': (
+            lambda: server.calculate_aroon(df, 25),
+            lambda: (df['high'].rolling(26).apply(lambda x: 25 - np.argmax(x), raw=True),
+                     df['low'].rolling(26).apply(lambda x: 25 - np.argmin(x), raw=True)),
+        ),
+        'CCI(20)': (
+            lambda: server.calculate_cci(df, 20),
+            lambda: tp.rolling(20).apply(lambda x: np.abs(x - x.mean()).mean(), raw=True),
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--bars', type=int, default=252 * 20, help='Number of daily bars (default: 20 years)')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    df = make_daily_bars(args.bars)
+    print(f"{args.bars} daily bars, best of {args.repeat}\n")
+
+    compiled = {name: best_of(fn, args.repeat) for name, fn in iterative_cases(df).items()}
+    numba_enabled = any(
+        kernel is not getattr(server, name) for name, kernel in server._COMPILED_KERNELS.items()
+    )
+
+    saved = dict(server._COMPILED_KERNELS)
+    server._COMPILED_KERNELS.update({name: getattr(server, name) for name in saved})
+    try:
+        fallback = {name: best_of(fn, args.repeat) for name, fn in iterative_cases(df).items()}
+    finally:
+        server._COMPILED_KERNELS.clear()
+        server._COMPILED_KERNELS.update(saved)
+
+    print(f"{'indicator':<28}{'python (ms)':>14}{'numba (ms)':>14}{'speedup':>10}")
+    for name in compiled:
+        if numba_enabled:
+            print(f"{name:<28}{fallback[name] * 1e3:>14.2f}{compiled[name] * 1e3:>14.2f}"
+                  f"{fallback[name] / compiled[name]:>9.1f}x")
+        else:
+            print(f"{name:<28}{fallback[name] * 1e3:>14.2f}{'n/a':>14}{'':>10}")
+
+    print(f"\n{'indicator':<28}{'apply (ms)':>14}{'vector (ms)':>14}{'speedup':>10}")
+    for name, (vectorized, reference) in windowed_cases(df).items():
+        new, old = best_of(vectorized, args.repeat), best_of(reference, args.repeat)
+        print(f"{name:<28}{old * 1e3:>14.2f}{new * 1e3:>14.2f}{old / new:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Scan throughput of the in-process scan against the process pool.
+
+Scans a synthetic universe of random-walk daily bars with a few indicator
+filters, first in process, then with SCAN_WORKERS set to each requested
+worker count, and reports the best-of-N wall time and the speedup. The
+candle fetch is replaced by an in-memory lookup so only scanning is timed;
+the pool is started before timing.
+
+Usage:
+    python benchmarks/bench_parallel_scan.py [--symbols 5000] [--workers 2 4 8] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+CURRENT_DIR = Path(__file__).resolve().parent
+if str(CURRENT_DIR.parent) not in sys.path:
+    sys.path.insert(0, str(CURRENT_DIR.parent))
+
+import server  # type: ignore  # noqa: E402
+
+FILTERS = [
+    {"type": "indicator", "field": "RSI", "time_period": 14, "operator": "gt", "value": 55},
+    {"type": "indicator", "field": "ADX", "time_period": 14, "operator": "gt", "value": 20},
+    {"type": "indicator", "field": "SMA", "time_period": 50, "operator": "lt", "value": 1e9},
+]
+
+
+def make_universe(n_symbols: int, n_bars: int, seed: int = 7) -> Dict[tuple, Any]:
+    """Daily fetch results keyed like _prefetch_stock_data's."""
+    rng = np.random.default_rng(seed)
+    dates = np.arange(np.datetime64('2024-01-01'), np.datetime64('2024-01-01') + n_bars, dtype='datetime64[D]')
+    universe = {}
+    for i in range(n_symbols):
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.015, n_bars)))
+        spread = close * rng.uniform(0.002, 0.03, n_bars)
+        universe[(f'SYM{i:05d}', 'daily')] = {'symbol': f'SYM{i:05d}', 'columns': {
+            'date': dates, 'open': close + rng.normal(0, 0.5, n_bars), 'high': close + spread,
+            'low': close - spread, 'close': close, 'volume': rng.uniform(1e6, 5e6, n_bars),
+        }}
+    return universe
+
+
+def best_of(fn: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--bars', type=int, default=300)
+    parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, os.cpu_count() or 1])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.getLogger('stock-scanner-mcp').setLevel(logging.WARNING)
+    universe = make_universe(args.symbols, args.bars)
+    server._prefetch_stock_data = lambda pairs, outputsize='compact', *rest: {pair: universe[pair] for pair in pairs}
+    server.SCAN_PARALLEL_MIN_SYMBOLS = 1
+    symbols = [symbol for symbol, _ in universe]
+
+    def scan() -> object:
+        return server._scan_stocks_core(symbols, FILTERS)
+
+    print(f"{args.symbols} symbols x {args.bars} daily bars, {os.cpu_count()} CPUs, best of {args.repeat}\n")
+    server.SCAN_WORKERS = 0
+    serial = best_of(scan, args.repeat)
+    print(f"{'workers':<10}{'time (s)':>10}{'symbols/s':>12}{'speedup':>10}")
+    print(f"{'in process':<10}{serial:>10.2f}{args.symbols / serial:>12.0f}{1:>9.1f}x")
+    for workers in sorted(set(args.workers)):
+        server._shutdown_scan_process_pool()
+        server.SCAN_WORKERS = workers
+        scan()  # start the pool and import the server in every worker
+        elapsed = best_of(scan, args.repeat)
+        print(f"{workers:<10}{elapsed:>10.2f}{args.symbols / elapsed:>12.0f}{serial / elapsed:>9.1f}x")
+    server._shutdown_scan_process_pool()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark for server.py.
+
+Each run uses a fresh interpreter and reports the best and median wall time of:
+
+* import  - ``import server`` (module import plus tool registration)
+* ready   - spawn ``server.py`` over stdio until it answers ``tools/list``
+
+Pass ``--redis-url`` with an unreachable address (e.g. ``redis://10.255.255.1:6379/0``)
+to check that a missing Redis does not delay startup.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--redis-url URL]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+
+
+def time_import(env: Dict[str, str]) -> float:
+    code = "import time; t = time.perf_counter(); import server; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, '-c', code], cwd=SERVER_DIR, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def time_ready(env: Dict[str, str]) -> float:
+    messages = [
+        {'jsonrpc': '2.0', 'id': 1, 'method': 'initialize', 'params': {
+            'protocolVersion': '2025-06-18', 'capabilities': {},
+            'clientInfo': {'name': 'bench_startup', 'version': '1.0'},
+        }},
+        {'jsonrpc': '2.0', 'method': 'notifications/initialized'},
+        {'jsonrpc': '2.0', 'id': 2, 'method': 'tools/list'},
+    ]
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, 'server.py'], cwd=SERVER_DIR, env=env, text=True,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        for message in messages:
+            proc.stdin.write(json.dumps(message) + '\n')
+        proc.stdin.flush()
+        for line in proc.stdout:
+            response = json.loads(line)
+            if response.get('id') == 2:
+                if not response.get('result', {}).get('tools'):
+                    raise RuntimeError(f'tools/list failed: {response}')
+                return time.perf_counter() - start
+        raise RuntimeError('server exited before answering tools/list')
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def summarize(name: str, fn: Callable[[Dict[str, str]], float], env: Dict[str, str], repeat: int) -> None:
+    samples: List[float] = [fn(env) for _ in range(repeat)]
+    print(f"{name:<10}{min(samples) * 1e3:>12.0f}{statistics.median(samples) * 1e3:>14.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--redis-url', default=None)
+    args = parser.parse_args()
+
+    env = dict(os.environ, LOG_LEVEL='WARNING')
+    if args.redis_url:
+        env['REDIS_URL'] = args.redis_url
+
+    print(f"{'stage':<10}{'best (ms)':>12}{'median (ms)':>14}")
+    summarize('import', time_import, env, args.repeat)
+    summarize('ready', time_ready, env, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
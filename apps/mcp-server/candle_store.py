@@ -0,0 +1,287 @@
+"""Append-only, memory-mapped columnar store for historical OHLCV bars.
+
+Every timeframe has one data file and one JSON index in the store directory::
+
+    daily.index.json   {"data": "daily.3.bars", "size": ..., "symbols": {symbol: segment}}
+    daily.3.bars       segments of fixed-width columns
+    daily.lock         writers' lock file
+
+A segment holds ``capacity`` slots of each column back to back: ``date``
+(int64 epoch seconds), then ``open``, ``high``, ``low``, ``close`` and
+``volume`` (float64). The index maps a symbol to its segment as
+``[offset, capacity, count, last_date, updated]``. Readers map the data file
+read-only and return column slices as zero-copy views.
+
+Writers hold an exclusive ``flock`` on the lock file, so several ingestion
+processes can append. New bars go into a segment's free slots, or into a new
+segment with twice the room at the end of the file. The index is then
+replaced atomically with ``os.replace``. Bytes a published index refers to
+are never modified, so a reader keeps a consistent view until it reloads
+the index, and never sees a half-written append. Replacing the last bar
+(the forming candle) therefore also moves the segment. ``compact`` rewrites
+the live segments into a new data file, named by a new generation, once
+moved segments leave too much dead space.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not POSIX: in-process locking only
+    fcntl = None
+
+COLUMNS = ('date', 'open', 'high', 'low', 'close', 'volume')
+PRICE_COLUMNS = COLUMNS[1:]
+SLOT_BYTES = 8
+MIN_CAPACITY = 64
+
+# Compact once dead bytes exceed live bytes and this floor
+COMPACT_MIN_DEAD_BYTES = 16 * 1024 * 1024
+
+_OFFSET, _CAPACITY, _COUNT, _LAST, _UPDATED = range(5)
+
+
+def _segment_bytes(capacity: int) -> int:
+    return len(COLUMNS) * SLOT_BYTES * capacity
+
+
+def _column_offset(segment: List[Any], column: int) -> int:
+    return segment[_OFFSET] + column * SLOT_BYTES * segment[_CAPACITY]
+
+
+def _epoch_seconds(dates: Any) -> np.ndarray:
+    return np.asarray(dates).astype('datetime64[s]').astype('int64')
+
+
+class CandleStore:
+    """Memory-mapped OHLCV history under ``root``, one data file per timeframe.
+
+    ``fsync`` makes every append durable before its index is published.
+    """
+
+    def __init__(self, root: str, fsync: bool = False):
+        self.root = root
+        self.fsync = fsync
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._write_mutex = threading.Lock()
+        # timeframe -> (index stat key, index, data map)
+        self._views: Dict[str, tuple] = {}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _index_path(self, timeframe: str) -> str:
+        return self._path(f'{timeframe}.index.json')
+
+    def _read_index(self, timeframe: str) -> Dict[str, Any]:
+        try:
+            with open(self._index_path(timeframe), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'version': 1, 'data': f'{timeframe}.0.bars', 'size': 0, 'symbols': {}}
+
+    def _publish_index(self, timeframe: str, index: Dict[str, Any]) -> None:
+        path = self._index_path(timeframe)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'))
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    @contextmanager
+    def _write_lock(self, timeframe: str):
+        with self._write_mutex, open(self._path(f'{timeframe}.lock'), 'a+b') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _view(self, timeframe: str) -> tuple:
+        """(index, data map) of the latest published index, reloading what changed."""
+        for _ in range(3):
+            try:
+                stat = os.stat(self._index_path(timeframe))
+            except FileNotFoundError:
+                return self._read_index(timeframe), None
+            stat_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            with self._lock:
+                cached = self._views.get(timeframe)
+                if cached is not None and cached[0] == stat_key:
+                    return cached[1], cached[2]
+                index = self._read_index(timeframe)
+                data = cached[2] if cached is not None else None
+                if data is None or data[0] != index['data'] or len(data[1]) < index['size']:
+                    try:
+                        data = self._map(index['data']) if index['size'] else None
+                    except FileNotFoundError:
+                        continue  # compacted between reading the index and mapping its file
+                self._views[timeframe] = (stat_key, index, data)
+                return index, data
+        raise RuntimeError(f'Candle store index for {timeframe} keeps changing')
+
+    def _map(self, name: str) -> tuple:
+        with open(self._path(name), 'rb') as f:
+            # Old maps stay alive for as long as views into them do
+            return name, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def symbols(self, timeframe: str) -> List[str]:
+        return sorted(self._view(timeframe)[0]['symbols'])
+
+    def info(self, timeframe: str, symbol: str) -> Optional[Dict[str, Any]]:
+        """Bar count, last bar date (epoch seconds) and last ingest time of a stored series."""
+        segment = self._view(timeframe)[0]['symbols'].get(symbol)
+        if segment is None:
+            return None
+        return {'count': segment[_COUNT], 'last_date': segment[_LAST], 'updated': segment[_UPDATED]}
+
+    def read(self, timeframe: str, symbol: str, bars: Optional[int] = None,
+             since: Any = None) -> Optional[Dict[str, np.ndarray]]:
+        """Columns of a stored series as read-only views into the mapped file.
+
+        ``bars`` keeps only the most recent bars and ``since`` only bars
+        dated at or after it. ``date`` is datetime64[s]; None if the symbol
+        is not stored.
+        """
+        index, data = self._view(timeframe)
+        segment = index['symbols'].get(symbol)
+        if segment is None or data is None:
+            return None
+        count = segment[_COUNT]
+        dates = np.frombuffer(data[1], dtype='<i8', count=count, offset=_column_offset(segment, 0))
+        start = 0
+        if bars is not None:
+            start = max(count - int(bars), 0)
+        if since is not None:
+            start = max(start, int(np.searchsorted(dates, _epoch_seconds(since))))
+        columns = {'date': dates[start:].view('datetime64[s]')}
+        for column, name in enumerate(PRICE_COLUMNS, start=1):
+            values = np.frombuffer(data[1], dtype='<f8', count=count, offset=_column_offset(segment, column))
+            columns[name] = values[start:]
+        return columns
+
+    def append(self, timeframe: str, batches: Dict[str, Dict[str, Any]], updated: Optional[float] = None) -> int:
+        """Append bars of many symbols in one atomic commit; returns the bars written.
+
+        ``batches`` maps a symbol to OHLCV columns with a ``date`` column,
+        sorted by date. Bars older than a symbol's last stored bar are
+        ignored; a bar dated like it replaces it when its values differ.
+        Every symbol in ``batches`` is marked ingested at ``updated``.
+        """
+        updated = time.time() if updated is None else updated
+        written = 0
+        with self._write_lock(timeframe):
+            index = self._read_index(timeframe)
+            symbols = index['symbols']
+            data_path = self._path(index['data'])
+            with open(data_path, 'r+b' if os.path.exists(data_path) else 'w+b') as f:
+                for symbol, columns in batches.items():
+                    segment = symbols.get(symbol)
+                    dates = _epoch_seconds(columns['date'])
+                    values = [dates] + [np.asarray(columns[name], dtype='float64') for name in PRICE_COLUMNS]
+                    start, keep = 0, 0
+                    if segment is not None:
+                        keep = segment[_COUNT]
+                        start = int(np.searchsorted(dates, segment[_LAST]))
+                        if start < len(dates) and dates[start] == segment[_LAST]:
+                            last_bar = [self._read_slot(f, segment, column, keep - 1) for column in range(len(COLUMNS))]
+                            if [v[start] for v in values[1:]] == last_bar[1:]:
+                                start += 1
+                            else:
+                                keep -= 1
+                        segment[_UPDATED] = updated
+                    new = [v[start:] for v in values]
+                    if not len(new[0]):
+                        continue
+                    count = keep + len(new[0])
+                    if segment is not None and keep == segment[_COUNT] and count <= segment[_CAPACITY]:
+                        for column, arr in enumerate(new):
+                            f.seek(_column_offset(segment, column) + keep * SLOT_BYTES)
+                            f.write(np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder('<')).tobytes())
+                    else:
+                        segment = self._relocate(f, index, segment, keep, new, count)
+                        symbols[symbol] = segment
+                    segment[_COUNT] = count
+                    segment[_LAST] = int(new[0][-1])
+                    segment[_UPDATED] = updated
+                    written += len(new[0])
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            self._publish_index(timeframe, index)
+            live = sum(_segment_bytes(segment[_CAPACITY]) for segment in symbols.values())
+            if index['size'] - live > max(live, COMPACT_MIN_DEAD_BYTES):
+                self._compact(timeframe, index)
+        return written
+
+    @staticmethod
+    def _read_slot(f: Any, segment: List[Any], column: int, slot: int) -> Any:
+        f.seek(_column_offset(segment, column) + slot * SLOT_BYTES)
+        return np.frombuffer(f.read(SLOT_BYTES), dtype='<i8' if column == 0 else '<f8')[0].item()
+
+    @staticmethod
+    def _write_segment(f: Any, offset: int, capacity: int, columns: List[np.ndarray]) -> None:
+        f.seek(offset)
+        for arr in columns:
+            block = np.zeros(capacity, dtype=arr.dtype.newbyteorder('<'))
+            block[:len(arr)] = arr
+            f.write(block.tobytes())
+
+    def _relocate(self, f: Any, index: Dict[str, Any], segment: Optional[List[Any]], keep: int,
+                  new: List[np.ndarray], count: int) -> List[Any]:
+        """Write kept plus new bars as a fresh segment at the end of the data file."""
+        columns = new
+        if segment is not None and keep:
+            old = []
+            for column, arr in enumerate(new):
+                f.seek(_column_offset(segment, column))
+                old.append(np.frombuffer(f.read(keep * SLOT_BYTES), dtype=arr.dtype.newbyteorder('<')))
+            columns = [np.concatenate([o, n]) for o, n in zip(old, new)]
+        capacity = max(2 * count, MIN_CAPACITY)
+        offset = index['size']
+        self._write_segment(f, offset, capacity, columns)
+        index['size'] = offset + _segment_bytes(capacity)
+        return [offset, capacity, count, 0, 0]
+
+    def compact(self, timeframe: str) -> None:
+        """Rewrite the live segments of ``timeframe`` into a new data file."""
+        with self._write_lock(timeframe):
+            self._compact(timeframe, self._read_index(timeframe))
+
+    def _compact(self, timeframe: str, index: Dict[str, Any]) -> None:
+        old_name = index['data']
+        generation = int(old_name.split('.')[-2]) + 1
+        new_name = f'{timeframe}.{generation}.bars'
+        compacted = dict(index, data=new_name, size=0, symbols={})
+        with open(self._path(old_name), 'rb') as src, open(self._path(new_name), 'w+b') as dst:
+            for symbol, segment in index['symbols'].items():
+                count = segment[_COUNT]
+                columns = []
+                for column in range(len(COLUMNS)):
+                    src.seek(_column_offset(segment, column))
+                    columns.append(np.frombuffer(src.read(count * SLOT_BYTES), dtype='<i8' if column == 0 else '<f8'))
+                capacity = max(2 * count, MIN_CAPACITY)
+                self._write_segment(dst, compacted['size'], capacity, columns)
+                compacted['symbols'][symbol] = [compacted['size'], capacity, count, segment[_LAST], segment[_UPDATED]]
+                compacted['size'] += _segment_bytes(capacity)
+            dst.flush()
+            if self.fsync:
+                os.fsync(dst.fileno())
+        self._publish_index(timeframe, compacted)
+        # Readers that already mapped the old file keep it until they reload
+        os.remove(self._path(old_name))
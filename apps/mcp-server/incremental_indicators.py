@@ -0,0 +1,345 @@
+"""Streaming versions of the recursive indicators, updated in O(1) per bar.
+
+EMA, RSI, ATR, ADX, MACD and OBV are recursive filters: each value depends
+only on the previous state and the new bar. The classes here keep that state
+(last EMA values, Wilder average gain/loss, running OBV, ...) and their
+``update`` returns, bar by bar, the value the matching ``calculate_*``
+function in server.py yields over the same bars. ``EWMean`` replays pandas'
+``ewm(adjust=False).mean()`` kernel step for step, including NaN handling
+and ``min_periods``, so results agree to the last bit rather than within a
+tolerance.
+
+``IndicatorStream`` adds bar dates: a bar dated like the previous one is the
+forming candle being updated and replaces it, and the most recent outputs
+are kept so a caller can read the series for the bars it holds.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+NAN = float('nan')
+
+# Bar fields each indicator reads
+INDICATOR_INPUTS = {
+    'EMA': ('close',),
+    'RSI': ('close',),
+    'ATR': ('high', 'low', 'close'),
+    'ADX': ('high', 'low', 'close'),
+    'MACD': ('close',),
+    'MACD_SIGNAL': ('close',),
+    'MACD_HIST': ('close',),
+    'OBV': ('close', 'volume'),
+}
+
+# Indicators whose values depend on every bar since the first one rather
+# than fading it out: a batch over a later-starting frame starts over
+CUMULATIVE_INDICATORS = frozenset({'OBV'})
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    """IEEE division as NumPy/pandas do it: x/0 is +-inf and 0/0 is NaN."""
+    try:
+        return numerator / denominator
+    except ZeroDivisionError:
+        if numerator != numerator or numerator == 0:
+            return NAN
+        return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+
+
+def _fmax(a: float, b: float) -> float:
+    """np.fmax for scalars: the larger value, ignoring a NaN operand."""
+    if a != a:
+        return b
+    if b != b:
+        return a
+    return a if a >= b else b
+
+
+class EWMean:
+    """``Series.ewm(com=com, adjust=False, min_periods=...).mean()``, one value at a time."""
+
+    __slots__ = ('com', 'min_periods', 'old_wt_factor', 'new_wt', 'weighted', 'old_wt', 'nobs', 'started')
+
+    def __init__(self, com: float, min_periods: int = 0):
+        self.com = float(com)
+        self.min_periods = min_periods
+        alpha = 1.0 / (1.0 + self.com)
+        self.old_wt_factor = 1.0 - alpha
+        self.new_wt = alpha
+        self.weighted = NAN
+        self.old_wt = 1.0
+        self.nobs = 0
+        self.started = False
+
+    @classmethod
+    def from_span(cls, span: float, min_periods: int = 0) -> 'EWMean':
+        return cls((span - 1) / 2, min_periods)
+
+    @classmethod
+    def from_alpha(cls, alpha: float, min_periods: int = 0) -> 'EWMean':
+        return cls((1 - alpha) / alpha, min_periods)
+
+    def update(self, value: float) -> float:
+        is_observation = value == value
+        self.nobs += is_observation
+        if not self.started:
+            self.started = True
+            self.weighted = value
+        elif self.weighted == self.weighted:
+            # ignore_na=False: gaps still decay the old weight
+            self.old_wt *= self.old_wt_factor
+            if self.com == 1:
+                self.new_wt = 1.0 - self.old_wt
+            if is_observation:
+                if self.weighted != value:
+                    self.weighted = (self.old_wt * self.weighted + self.new_wt * value) / (self.old_wt + self.new_wt)
+                self.old_wt = 1.0
+        elif is_observation:
+            self.weighted = value
+        return self.weighted if self.nobs >= max(self.min_periods, 1) else NAN
+
+    def copy(self) -> 'EWMean':
+        other = object.__new__(EWMean)
+        for name in EWMean.__slots__:
+            setattr(other, name, getattr(self, name))
+        return other
+
+
+class _State:
+    """Base of the indicator states; ``copy`` also clones nested states."""
+
+    def copy(self):
+        other = object.__new__(type(self))
+        other.__dict__ = {name: value.copy() if isinstance(value, (_State, EWMean)) else value
+                          for name, value in self.__dict__.items()}
+        return other
+
+
+class EMA(_State):
+    """calculate_ema: ewm(span=period) of the close."""
+
+    def __init__(self, period: int):
+        self.ema = EWMean.from_span(period)
+
+    def update(self, bar: Dict[str, float]) -> float:
+        return self.ema.update(bar['close'])
+
+
+class RSI(_State):
+    """calculate_rsi: Wilder-smoothed average gain over average loss."""
+
+    def __init__(self, period: int):
+        self.prev_close = NAN
+        self.avg_gain = EWMean.from_alpha(1 / period, min_periods=period)
+        self.avg_loss = EWMean.from_alpha(1 / period, min_periods=period)
+
+    def update(self, bar: Dict[str, float]) -> float:
+        close = bar['close']
+        delta = close - self.prev_close
+        self.prev_close = close
+        gain = delta if delta > 0 else 0.0
+        loss = -(delta if delta < 0 else 0.0)
+        rs = _divide(self.avg_gain.update(gain), self.avg_loss.update(loss))
+        return 100 - _divide(100, 1 + rs)
+
+
+class _TrueRange(_State):
+    """Wilder-smoothed true range shared by ATR and ADX."""
+
+    def __init__(self, period: int):
+        self.prev_close = NAN
+        self.atr = EWMean.from_alpha(1 / period)
+
+    def update(self, bar: Dict[str, float]) -> float:
+        high, low = bar['high'], bar['low']
+        tr = _fmax(high - low, _fmax(abs(high - self.prev_close), abs(low - self.prev_close)))
+        self.prev_close = bar['close']
+        return self.atr.update(tr)
+
+
+class ATR(_State):
+    """calculate_atr."""
+
+    def __init__(self, period: int):
+        self.tr = _TrueRange(period)
+
+    def update(self, bar: Dict[str, float]) -> float:
+        return self.tr.update(bar)
+
+
+class ADX(_State):
+    """calculate_adx: Wilder-smoothed DX of the smoothed directional movement."""
+
+    def __init__(self, period: int):
+        self.prev_high = NAN
+        self.prev_low = NAN
+        self.tr = _TrueRange(period)
+        self.plus_dm = EWMean.from_alpha(1 / period)
+        self.minus_dm = EWMean.from_alpha(1 / period)
+        self.adx = EWMean.from_alpha(1 / period)
+
+    def update(self, bar: Dict[str, float]) -> float:
+        high, low = bar['high'], bar['low']
+        up_move = high - self.prev_high
+        down_move = self.prev_low - low
+        self.prev_high, self.prev_low = high, low
+        plus_dm = up_move if up_move > down_move and up_move > 0 else 0.0
+        minus_dm = down_move if down_move > up_move and down_move > 0 else 0.0
+
+        atr = self.tr.update(bar)
+        plus_di = _divide(100 * self.plus_dm.update(plus_dm), atr)
+        minus_di = _divide(100 * self.minus_dm.update(minus_dm), atr)
+        dx = _divide(100 * abs(plus_di - minus_di), plus_di + minus_di)
+        return self.adx.update(dx)
+
+
+class MACD(_State):
+    """calculate_macd; ``output`` picks 'macd', 'signal' or 'histogram'."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9, output: str = 'macd'):
+        self.fast = EWMean.from_span(fast)
+        self.slow = EWMean.from_span(slow)
+        self.signal = EWMean.from_span(signal)
+        self.output = output
+
+    def update(self, bar: Dict[str, float]) -> float:
+        close = bar['close']
+        macd = self.fast.update(close) - self.slow.update(close)
+        signal = self.signal.update(macd)
+        if self.output == 'signal':
+            return signal
+        if self.output == 'histogram':
+            return macd - signal
+        return macd
+
+
+class OBV(_State):
+    """calculate_obv: running sum of volume signed by the close's direction."""
+
+    def __init__(self):
+        self.prev_close = NAN
+        self.total = 0
+
+    def update(self, bar: Dict[str, float]) -> float:
+        close = bar['close']
+        direction = 1 if close > self.prev_close else -1 if close < self.prev_close else 0
+        self.prev_close = close
+        value = bar['volume'] * direction
+        if value != value:
+            return NAN  # cumsum leaves NaN in place and carries on
+        self.total += value
+        return self.total
+
+
+def create_indicator(name: str, time_period: Optional[int], params: Dict[str, Any]) -> Any:
+    """Streaming indicator for a resolved indicator name, or None if it has none.
+
+    ``params`` are the normalized parameters of server._indicator_signature.
+    """
+    if name == 'EMA':
+        return EMA(int(time_period))
+    if name == 'RSI':
+        return RSI(int(time_period))
+    if name == 'ATR':
+        return ATR(int(time_period))
+    if name == 'ADX':
+        return ADX(int(time_period))
+    if name in ('MACD', 'MACD_SIGNAL', 'MACD_HIST'):
+        output = {'MACD': 'macd', 'MACD_SIGNAL': 'signal', 'MACD_HIST': 'histogram'}[name]
+        return MACD(int(params.get('fast', 12)), int(params.get('slow', 26)), int(params.get('signal', 9)), output)
+    if name == 'OBV':
+        return OBV()
+    return None
+
+
+class IndicatorStream:
+    """A streaming indicator fed dated bars, keeping its most recent outputs.
+
+    Dates are int64 timestamps and must not decrease. A bar with the same
+    date as the last one replaces it: the state from before that bar is
+    restored and the new bar applied, so updating the forming candle costs
+    the same as appending. ``history`` bounds the outputs kept.
+    """
+
+    def __init__(self, indicator: Any, history: int):
+        self.indicator = indicator
+        self.history = max(int(history), 1)
+        self._before_last = None
+        self._dates = np.empty(2 * self.history, dtype='int64')
+        self._values = np.empty(2 * self.history, dtype='float64')
+        self._start = 0
+        self._stop = 0
+        self.first_date: Optional[int] = None
+        # Inputs of the last bar and of the one before it (the last completed bar)
+        self.last_bar: Optional[Dict[str, float]] = None
+        self.completed_bar: Optional[Dict[str, float]] = None
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self._dates[self._start:self._stop]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[self._start:self._stop]
+
+    @property
+    def last_date(self) -> Optional[int]:
+        return int(self._dates[self._stop - 1]) if self._stop > self._start else None
+
+    def reserve(self, history: int) -> None:
+        """Keep at least ``history`` outputs from now on."""
+        if history <= self.history:
+            return
+        dates, values = self.dates, self.values
+        self.history = history
+        self._dates = np.empty(2 * history, dtype='int64')
+        self._values = np.empty(2 * history, dtype='float64')
+        self._start, self._stop = 0, len(dates)
+        self._dates[:self._stop] = dates
+        self._values[:self._stop] = values
+
+    def push(self, date: int, bar: Dict[str, float]) -> float:
+        """Apply one bar and return the indicator's value for it."""
+        return self._push(date, bar, True)
+
+    def extend(self, dates: Iterable[int], bars: Iterable[Dict[str, float]]) -> None:
+        """Push several bars, snapshotting the state only before the final one."""
+        dates = list(dates)
+        for k, (date, bar) in enumerate(zip(dates, bars)):
+            self._push(date, bar, k == len(dates) - 1)
+
+    def _push(self, date: int, bar: Dict[str, float], snapshot: bool) -> float:
+        last_date = self.last_date
+        if last_date is not None and date == last_date:
+            if self._before_last is None:
+                raise ValueError('No state to replace the last bar from')
+            self.indicator = self._before_last.copy()
+            self._stop -= 1
+        elif last_date is not None and date < last_date:
+            raise ValueError('Bars must be pushed in date order')
+        else:
+            self._before_last = self.indicator.copy() if snapshot else None
+            self.completed_bar = self.last_bar
+        value = self.indicator.update(bar)
+
+        if self._stop == len(self._dates):
+            # Slide the kept window back to the front of the buffers
+            keep = self.history - 1
+            self._dates[:keep] = self._dates[self._stop - keep:self._stop]
+            self._values[:keep] = self._values[self._stop - keep:self._stop]
+            self._start, self._stop = 0, keep
+        self._dates[self._stop] = date
+        self._values[self._stop] = value
+        self._stop += 1
+        self._start = max(self._start, self._stop - self.history)
+        self.last_bar = bar
+        if self.first_date is None:
+            self.first_date = date
+        return value
@@ -0,0 +1,153 @@
+"""Binary columnar codec for cached OHLCV series.
+
+Layout (little-endian)::
+
+    MAGIC (6 bytes) | flags (uint8) | header length (uint32) | JSON header | payload
+
+The JSON header holds the result metadata (symbol, interval, last_updated,
+...), the bar count, the date format and the dtype of every column. The
+payload is the epoch-seconds index (int64) followed by each OHLCV column as
+packed float64/int64, optionally zlib-compressed. Decoding wraps the payload
+with ``np.frombuffer``, so no per-row Python objects are created unless the
+caller asks for records.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+MAGIC = b'OHLCV1'
+FLAG_ZLIB = 0x01
+
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+_PREFIX = struct.Struct('<6sBI')
+_DATE_FORMATS = {
+    # header value -> datetime64 unit of the record date strings
+    'date': 'D',
+    'datetime': 's',
+}
+
+
+def is_ohlcv_blob(blob: Any) -> bool:
+    """Return True if ``blob`` was produced by encode_ohlcv."""
+    return isinstance(blob, (bytes, bytearray, memoryview)) and bytes(blob[:len(MAGIC)]) == MAGIC
+
+
+def _format_dates(index: np.ndarray, date_format: str) -> np.ndarray:
+    strings = np.datetime_as_string(index.astype(f"datetime64[{_DATE_FORMATS[date_format]}]"))
+    if date_format == 'datetime':
+        strings = np.char.replace(strings, 'T', ' ')
+    return strings
+
+
+def encode_ohlcv(result: Dict[str, Any], compress: bool = False) -> bytes:
+    """Encode a stock data result (metadata plus ``data`` records) to bytes.
+
+    Raises ValueError if the records cannot be round-tripped exactly (extra
+    fields, missing values, unrecognized date strings); callers should store
+    such results as JSON instead.
+    """
+    records: List[Dict[str, Any]] = result.get('data') or []
+    meta = {key: value for key, value in result.items() if key != 'data'}
+
+    dates = [record.get('date') for record in records]
+    if any(set(record) != {'date', *COLUMNS} for record in records):
+        raise ValueError('records must contain exactly date and OHLCV fields')
+    if not all(isinstance(d, str) for d in dates):
+        raise ValueError('record dates must be strings')
+
+    if any(len(d) not in (10, 19) for d in dates):
+        raise ValueError('record dates must be YYYY-MM-DD or YYYY-MM-DD HH:MM:SS')
+    date_format = 'date' if all(len(d) == 10 for d in dates) else 'datetime'
+    try:
+        parsed = np.array([d.replace(' ', 'T') for d in dates], dtype='datetime64[s]')
+    except ValueError as exc:
+        raise ValueError(f'unsupported date format: {exc}') from exc
+    if not np.array_equal(_format_dates(parsed, date_format), np.array(dates, dtype=str)):
+        raise ValueError('record dates do not round-trip')
+    index = parsed.astype('int64')
+
+    dtypes: Dict[str, str] = {}
+    arrays = [index]
+    for col in COLUMNS:
+        values = [record[col] for record in records]
+        if all(type(v) is int for v in values):
+            arr = np.array(values, dtype='int64')
+        elif all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            arr = np.array(values, dtype='float64')
+        else:
+            raise ValueError(f"column '{col}' is not numeric")
+        dtypes[col] = arr.dtype.str
+        arrays.append(arr)
+
+    header = json.dumps({
+        'meta': meta,
+        'n': len(records),
+        'date_format': date_format,
+        'dtypes': dtypes,
+    }, separators=(',', ':')).encode('utf-8')
+
+    payload = b''.join(np.ascontiguousarray(arr, dtype=arr.dtype.newbyteorder('<')).tobytes() for arr in arrays)
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload)
+        flags |= FLAG_ZLIB
+
+    return _PREFIX.pack(MAGIC, flags, len(header)) + header + payload
+
+
+def decode_ohlcv(blob: bytes, records: bool = False) -> Dict[str, Any]:
+    """Decode an encode_ohlcv blob.
+
+    By default the result carries ``columns``: a dict of NumPy arrays with a
+    ``date`` column (datetime64[s]) and the OHLCV fields, in stored order.
+    With ``records=True`` the original ``data`` list of dicts is rebuilt
+    instead, so the result equals what was encoded.
+    """
+    magic, flags, header_len = _PREFIX.unpack_from(blob, 0)
+    if magic != MAGIC:
+        raise ValueError('not an OHLCV blob')
+
+    start = _PREFIX.size
+    header = json.loads(bytes(blob[start:start + header_len]))
+    payload: Any = memoryview(blob)[start + header_len:]
+    if flags & FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+
+    n = header['n']
+    columns: Dict[str, np.ndarray] = {}
+    offset = 0
+    index = np.frombuffer(payload, dtype='<i8', count=n, offset=offset)
+    offset += index.nbytes
+    for col in COLUMNS:
+        dtype = np.dtype(header['dtypes'][col])
+        columns[col] = np.frombuffer(payload, dtype=dtype, count=n, offset=offset)
+        offset += columns[col].nbytes
+    dates = index.astype('datetime64[s]')
+
+    result = dict(header['meta'])
+    if records:
+        date_strings = _format_dates(dates, header['date_format']).tolist()
+        values = [columns[col].tolist() for col in COLUMNS]
+        result['data'] = [
+            {'date': d, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for d, o, h, l, c, v in zip(date_strings, *values)
+        ]
+    else:
+        columns['date'] = dates
+        result['columns'] = columns
+    return result
+
+
+def try_encode_ohlcv(result: Dict[str, Any], compress: bool = False) -> Optional[bytes]:
+    """encode_ohlcv, returning None for results that must stay JSON."""
+    try:
+        return encode_ohlcv(result, compress=compress)
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return None
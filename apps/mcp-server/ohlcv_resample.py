@@ -0,0 +1,102 @@
+"""Vectorized OHLCV resampling to coarser timeframes.
+
+Input and output use the columnar layout of ``ohlcv_codec.decode_ohlcv``: a
+``date`` column (datetime64, ascending) plus one array per OHLCV field.
+Bars are grouped into
+
+* exchange weeks (Monday to Friday) for ``weekly``,
+* calendar months for ``monthly``,
+* fixed buckets aligned to the session open for intraday targets, so that
+  with a 09:30 open ``60min`` bars cover 09:30-10:30, 10:30-11:30, ...
+
+and each group is reduced with ``np.maximum/minimum/add.reduceat``: open of
+the first bar, max high, min low, close of the last bar, summed volume.
+Weekly and monthly bars are dated by their first session, intraday bars by
+the start of their bucket. The last group may still be forming, exactly like
+the current bar of an upstream weekly/monthly/hourly series.
+"""
+
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+INTERVAL_MINUTES = {
+    '1min': 1,
+    '5min': 5,
+    '15min': 15,
+    '30min': 30,
+    '60min': 60,
+}
+
+# Source bars per target bar, upper bound (trading days in a week / month)
+_CALENDAR_BARS = {
+    ('daily', 'weekly'): 5,
+    ('daily', 'monthly'): 23,
+}
+
+
+def can_resample(source: str, target: str) -> bool:
+    """Return True if ``target`` bars can be built from ``source`` bars."""
+    if (source, target) in _CALENDAR_BARS:
+        return True
+    if source in INTERVAL_MINUTES and target in INTERVAL_MINUTES:
+        return INTERVAL_MINUTES[target] > INTERVAL_MINUTES[source] and INTERVAL_MINUTES[target] % INTERVAL_MINUTES[source] == 0
+    return False
+
+
+def bars_per_bar(source: str, target: str) -> int:
+    """Upper bound on the ``source`` bars that make up one ``target`` bar."""
+    if (source, target) in _CALENDAR_BARS:
+        return _CALENDAR_BARS[(source, target)]
+    return INTERVAL_MINUTES[target] // INTERVAL_MINUTES[source]
+
+
+def _group_keys(dates: np.ndarray, target: str, session_open_minutes: int) -> np.ndarray:
+    if target == 'weekly':
+        days = dates.astype('datetime64[D]')
+        # 1970-01-01 was a Thursday: shift so Monday is weekday 0
+        return days - (days.astype('int64') + 3) % 7
+    if target == 'monthly':
+        return dates.astype('datetime64[M]')
+    seconds = dates.astype('datetime64[s]').astype('int64')
+    day_start = seconds - seconds % 86400
+    step = INTERVAL_MINUTES[target] * 60
+    since_open = seconds - day_start - session_open_minutes * 60
+    return day_start + session_open_minutes * 60 + (since_open // step) * step
+
+
+def resample_ohlcv(columns: Dict[str, np.ndarray], source: str, target: str,
+                   session_open_minutes: int = 570) -> Dict[str, np.ndarray]:
+    """Aggregate ``source`` bars in ``columns`` into ``target`` bars.
+
+    ``session_open_minutes`` is the session open in minutes after midnight
+    (570 = 09:30) and only matters for intraday targets. Raises ValueError
+    for pairs can_resample rejects.
+    """
+    if not can_resample(source, target):
+        raise ValueError(f"Cannot resample {source} bars to {target}")
+
+    dates = np.asarray(columns['date'])
+    if len(dates) == 0:
+        return {'date': dates[:0], **{col: np.asarray(columns[col])[:0] for col in COLUMNS}}
+
+    keys = _group_keys(dates, target, session_open_minutes)
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    ends = np.concatenate((starts[1:], [len(dates)])) - 1
+
+    if target in INTERVAL_MINUTES:
+        labels = keys[starts].astype('datetime64[s]').astype(dates.dtype)
+    else:
+        labels = dates[starts]
+    return {
+        'date': labels,
+        'open': np.asarray(columns['open'])[starts],
+        'high': np.maximum.reduceat(np.asarray(columns['high']), starts),
+        'low': np.minimum.reduceat(np.asarray(columns['low']), starts),
+        'close': np.asarray(columns['close'])[ends],
+        'volume': np.add.reduceat(np.asarray(columns['volume']), starts),
+    }
@@ -1,13 +1,26 @@
 #!/usr/bin/env python3
-"""Utility script to invoke an MCP tool and return JSON output."""
+"""Utility script to invoke an MCP tool and return JSON output.
+
+If MCP_DAEMON_URL (e.g. http://127.0.0.1:8000/mcp) or MCP_DAEMON_SOCKET is
+set, the call is forwarded to a warm server started with
+``python server.py --daemon``. When the daemon is unreachable the script
+falls back to starting server.py over stdio for this call.
+
+``run_tool.py --batch`` reads newline-delimited JSON requests from stdin and
+runs them concurrently over one session, streaming NDJSON results back in
+input order (see _run_batch).
+"""
 
 import asyncio
+import http.client
 import json
 import logging
 import os
+import socket
 import sys
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Awaitable, Callable, Dict, Optional, TextIO
+from urllib.parse import urlparse
 
 # Suppress logging before importing fastmcp
 os.environ["FASTMCP_LOG_LEVEL"] = "CRITICAL"
@@ -17,28 +30,202 @@ logging.getLogger("fastmcp").setLevel(logging.CRITICAL)
 logging.getLogger("mcp").setLevel(logging.CRITICAL)
 logging.getLogger("stock-scanner-mcp").setLevel(logging.CRITICAL)
 
-from fastmcp import Client
+DAEMON_URL = os.getenv("MCP_DAEMON_URL")
+DAEMON_SOCKET = os.getenv("MCP_DAEMON_SOCKET")
+DAEMON_TIMEOUT = float(os.getenv("MCP_DAEMON_TIMEOUT", "300"))
+BATCH_CONCURRENCY = int(os.getenv("MCP_BATCH_CONCURRENCY", "8"))
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a Unix domain socket."""
+
+    def __init__(self, path: str, timeout: float):
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self._socket_path)
+
+
+def _daemon_connection() -> Optional[tuple]:
+    """Return (connection, request path) for the configured daemon, if any."""
+    if DAEMON_SOCKET:
+        return _UnixHTTPConnection(DAEMON_SOCKET, DAEMON_TIMEOUT), "/mcp"
+    if DAEMON_URL:
+        url = urlparse(DAEMON_URL)
+        return http.client.HTTPConnection(url.hostname, url.port or 80, timeout=DAEMON_TIMEOUT), url.path or "/mcp"
+    return None
+
+
+def _call_daemon(tool_name: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Call a tool on the warm daemon; None if no daemon is reachable."""
+    target = _daemon_connection()
+    if target is None:
+        return None
+    connection, path = target
+    body = json.dumps({
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tools/call",
+        "params": {"name": tool_name, "arguments": payload},
+    })
+    headers = {"Content-Type": "application/json", "Accept": "application/json, text/event-stream"}
+    try:
+        connection.connect()
+    except OSError:
+        # Daemon not running: only connection failures fall back, so a call
+        # is never executed twice.
+        connection.close()
+        return None
+    try:
+        connection.request("POST", path, body=body, headers=headers)
+        response = connection.getresponse()
+        raw = response.read()
+    finally:
+        connection.close()
+
+    if response.status != 200:
+        raise RuntimeError(f"MCP daemon returned HTTP {response.status}: {raw[:500]!r}")
+    message = json.loads(raw)
+    if "error" in message:
+        raise RuntimeError(f"MCP daemon error: {message['error'].get('message')}")
+
+    result = message["result"]
+    if result.get("isError"):
+        text = " ".join(item.get("text", "") for item in result.get("content", []))
+        raise RuntimeError(f"Tool {tool_name} failed: {text}")
+
+    data = result.get("structuredContent")
+    if data is None:
+        data = json.loads(result["content"][0]["text"])
+    elif result.get("_meta", {}).get("fastmcp", {}).get("wrap_result"):
+        data = data.get("result")
+    if not isinstance(data, dict):
+        raise TypeError("Tool result must be a dictionary")
+    return data
+
+
+def _tool_result(response: Any) -> Dict[str, Any]:
+    result = response.data if hasattr(response, "data") else response
+    if not isinstance(result, dict):
+        raise TypeError("Tool result must be a dictionary")
+    return result
 
 
 async def _call_tool(tool_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    from fastmcp import Client
+
     server_path = str(Path(__file__).resolve().with_name("server.py"))
     async with Client(server_path) as client:
         response = await client.call_tool(tool_name, payload)
-        result = response.data if hasattr(response, "data") else response
-        if not isinstance(result, dict):
-            raise TypeError("Tool result must be a dictionary")
-        return result
+        return _tool_result(response)
+
+
+def _daemon_available() -> bool:
+    target = _daemon_connection()
+    if target is None:
+        return False
+    connection, _ = target
+    try:
+        connection.connect()
+        return True
+    except OSError:
+        return False
+    finally:
+        connection.close()
+
+
+async def _process_batch(
+    call: Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]],
+    stdin: TextIO,
+    stdout: TextIO,
+    concurrency: int,
+) -> None:
+    """Run NDJSON requests from stdin concurrently, writing results in input order."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    finished: "asyncio.Queue[Optional[asyncio.Task]]" = asyncio.Queue()
+
+    async def run_one(line_number: int, line: str) -> Dict[str, Any]:
+        request_id: Any = line_number
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            request_id = request.get("id", line_number)
+            tool_name = request["tool"]
+            payload = request.get("payload") or {}
+            async with semaphore:
+                result = await call(tool_name, payload)
+            return {"id": request_id, "ok": True, "result": result}
+        except Exception as exc:
+            return {"id": request_id, "ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+    async def write_results() -> None:
+        while True:
+            task = await finished.get()
+            if task is None:
+                return
+            stdout.write(json.dumps(await task) + "\n")
+            stdout.flush()
+
+    loop = asyncio.get_running_loop()
+    writer = asyncio.create_task(write_results())
+    line_number = 0
+    while True:
+        line = await loop.run_in_executor(None, stdin.readline)
+        if not line:
+            break
+        line_number += 1
+        if line.strip():
+            finished.put_nowait(asyncio.create_task(run_one(line_number, line)))
+    finished.put_nowait(None)
+    await writer
+
+
+async def _run_batch(stdin: TextIO = sys.stdin, stdout: TextIO = sys.stdout, concurrency: int = BATCH_CONCURRENCY) -> None:
+    """Batch mode: one session (daemon or stdio server) for every request.
+
+    Each stdin line is {"id": ..., "tool": "<tool_name>", "payload": {...}};
+    each stdout line is {"id": ..., "ok": true, "result": {...}} or
+    {"id": ..., "ok": false, "error": "..."}. Requests without an id are
+    tagged with their line number.
+    """
+    if _daemon_available():
+        async def call_daemon(tool_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+            result = await asyncio.get_running_loop().run_in_executor(None, _call_daemon, tool_name, payload)
+            if result is None:
+                raise ConnectionError("MCP daemon is no longer reachable")
+            return result
+
+        await _process_batch(call_daemon, stdin, stdout, concurrency)
+        return
+
+    from fastmcp import Client
+
+    server_path = str(Path(__file__).resolve().with_name("server.py"))
+    async with Client(server_path) as client:
+        async def call_client(tool_name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+            return _tool_result(await client.call_tool(tool_name, payload))
+
+        await _process_batch(call_client, stdin, stdout, concurrency)
 
 
 async def _main() -> None:
+    if sys.argv[1:] == ["--batch"]:
+        await _run_batch()
+        return
     if len(sys.argv) != 3:
-        raise SystemExit("Usage: run_tool.py <tool_name> '<json_payload>'")
+        raise SystemExit("Usage: run_tool.py <tool_name> '<json_payload>'\n       run_tool.py --batch < requests.ndjson")
     tool_name = sys.argv[1]
     try:
         payload = json.loads(sys.argv[2])
     except json.JSONDecodeError as exc:
         raise SystemExit(f"Invalid JSON payload: {exc}") from exc
-    result = await _call_tool(tool_name, payload)
+    result = _call_daemon(tool_name, payload)
+    if result is None:
+        result = await _call_tool(tool_name, payload)
     print(json.dumps(result))
 
 
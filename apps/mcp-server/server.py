@@ -2,26 +2,64 @@
 Phoenix-like Stock Scanner MCP Server - Phase 1 Core Tools
 """
 
+from __future__ import annotations
+
 import os
+import sys
 import json
+import argparse
+import bisect
+import importlib.util
 import logging
-from typing import Dict, List, Any, Optional
+import contextvars
+import copy
+import functools
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import BrokenExecutor, Future, ThreadPoolExecutor
+from contextlib import AsyncExitStack, contextmanager
+from typing import Dict, List, Any, Optional, Callable, FrozenSet, NamedTuple, Tuple, Union
 from datetime import datetime, timedelta
 from pathlib import Path
 from uuid import uuid4
 from dotenv import load_dotenv
+
+# Load environment variables
 load_dotenv()
 
+# Startup must not touch the network: FastMCP's PyPI version check is opt-in
+os.environ.setdefault('FASTMCP_CHECK_FOR_UPDATES', 'off')
+
+
+def _lazy_import(name: str):
+    """Return ``name`` as a module that is only executed on first attribute access."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# Heavy dependencies are loaded on first use so tool registration stays fast
+requests = _lazy_import('requests')
+pd = _lazy_import('pandas')
+np = _lazy_import('numpy')
+redis = _lazy_import('redis')
+ohlcv_codec = _lazy_import('ohlcv_codec')
+ohlcv_resample = _lazy_import('ohlcv_resample')
+incremental_indicators = _lazy_import('incremental_indicators')
+candle_store = _lazy_import('candle_store')
+shared_ohlcv = _lazy_import('shared_ohlcv')
 
-import requests
-import pandas as pd
-import numpy as np
-import redis
 from fastmcp import FastMCP
 
-# Load environment variables
-load_dotenv()
-
 
 # --- async helper: replace any previous _invoke_tool/_bind_and_call_member ---
 import inspect
@@ -134,18 +172,78 @@ mcp = FastMCP(
 DATA_DIR = Path(__file__).resolve().parent
 
 
-# Redis cache configuration
-try:
-    redis_client = redis.from_url(
-        os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
-        decode_responses=True
-    )
-    redis_client.ping()
+# Redis cache configuration. The connection is opened on first cache use with
+# a short timeout; after a failure the cache stays disabled while a background
+# thread retries, so an unreachable Redis never blocks startup or tool calls.
+REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+REDIS_CONNECT_TIMEOUT = float(os.getenv('REDIS_CONNECT_TIMEOUT', '0.5'))
+REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', '2'))
+REDIS_RECONNECT_INTERVAL = float(os.getenv('REDIS_RECONNECT_INTERVAL', '30'))
+redis_client = None
+CACHE_ENABLED = False
+_redis_lock = threading.Lock()
+_redis_state = {'attempted': False, 'reconnecting': False}
+
+
+def _connect_redis() -> bool:
+    """Open and ping a Redis connection; on success enable the cache."""
+    global redis_client, CACHE_ENABLED
+    try:
+        # Raw bytes: OHLCV entries use the binary codec, JSON entries are decoded on read
+        client = redis.from_url(
+            REDIS_URL,
+            decode_responses=False,
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+        )
+        client.ping()
+    except Exception as e:
+        logger.debug(f"Redis connection attempt failed: {e}")
+        return False
+    redis_client = client
     CACHE_ENABLED = True
     logger.info("Redis cache connected successfully")
-except Exception as e:
-    logger.warning(f"Redis not available: {e}. Caching disabled.")
-    CACHE_ENABLED = False
+    return True
+
+
+def _reconnect_redis_loop() -> None:
+    while not _connect_redis():
+        time.sleep(REDIS_RECONNECT_INTERVAL)
+    with _redis_lock:
+        _redis_state['reconnecting'] = False
+
+
+def _schedule_redis_reconnect() -> None:
+    with _redis_lock:
+        if _redis_state['reconnecting'] or REDIS_RECONNECT_INTERVAL <= 0:
+            return
+        _redis_state['reconnecting'] = True
+    threading.Thread(target=_reconnect_redis_loop, name='redis-reconnect', daemon=True).start()
+
+
+def _cache_available() -> bool:
+    """True if Redis caching is usable, connecting on the first call."""
+    if CACHE_ENABLED:
+        return True
+    with _redis_lock:
+        if _redis_state['attempted']:
+            return CACHE_ENABLED
+        _redis_state['attempted'] = True
+    if _connect_redis():
+        return True
+    logger.warning(f"Redis not available at {REDIS_URL}. Caching disabled; retrying in the background.")
+    _schedule_redis_reconnect()
+    return False
+
+
+def _handle_redis_error(e: Exception) -> None:
+    """Disable the cache after a lost connection and reconnect in the background."""
+    global CACHE_ENABLED
+    if isinstance(e, (redis.ConnectionError, redis.TimeoutError)) and CACHE_ENABLED:
+        logger.warning(f"Redis connection lost: {e}. Caching disabled; retrying in the background.")
+        CACHE_ENABLED = False
+        _schedule_redis_reconnect()
+
 
 # Cache TTL settings (in seconds)
 CACHE_TTL = {
@@ -153,43 +251,452 @@ CACHE_TTL = {
     'indicator': 1800,        # 30 minutes
     'scan_result': 300        # 5 minutes
 }
+# Candle series outlive their 'stock_data' freshness so stale entries can be
+# topped up with only the bars since their last one (default 7 days)
+STOCK_SERIES_RETENTION = int(os.getenv('STOCK_SERIES_RETENTION', str(7 * 24 * 3600)))
+
+
+def _stock_data_ttl(result: Dict[str, Any]) -> int:
+    """Cache TTL of a stock data result: mock fallbacks expire with their freshness."""
+    if result.get('source') == 'mock':
+        return CACHE_TTL['stock_data']
+    return STOCK_SERIES_RETENTION
+
+# OHLCV cache encoding: 'binary' (ohlcv_codec) or 'json'. Both are readable.
+CACHE_OHLCV_FORMAT = os.getenv('CACHE_OHLCV_FORMAT', 'binary').lower()
+CACHE_COMPRESSION = os.getenv('CACHE_COMPRESSION', 'none').lower() == 'zlib'
 
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+class LocalLRUCache:
+    """Byte-bounded in-process LRU tier in front of Redis.
+
+    Entries expire with the TTL they were stored with (or the remaining Redis
+    TTL when filled from a Redis hit). Values are kept as the encoded bytes
+    stored in Redis, so every hit decodes a value of its own.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: str, value: Any, ttl: float, size: int):
+        if self.max_bytes <= 0 or ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, size, value)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Size of the in-process tier in bytes of encoded payload; 0 disables it
+LOCAL_CACHE = LocalLRUCache(int(os.getenv('LOCAL_CACHE_MAX_BYTES', str(256 * 1024 * 1024))))
+
+
+class Rolling52WeekSummary:
+    """High/low/close of the last ``window`` daily bars, maintained bar by bar.
+
+    Highs and lows live in monotonic deques of (bar number, value): appending
+    a bar is amortized O(1), reading the extremes is O(1), and only the bars
+    that can still become an extreme are kept.
+    """
+
+    __slots__ = ('window', 'count', 'last_date', 'close', 'stale', '_highs', '_lows')
+
+    def __init__(self, window: int):
+        self.window = window
+        self.count = 0  # bars pushed so far
+        self.last_date: Optional[str] = None
+        self.close: Optional[float] = None
+        self.stale = False  # set when an update cannot be applied incrementally
+        self._highs: deque = deque()
+        self._lows: deque = deque()
+
+    @property
+    def high(self) -> Optional[float]:
+        return self._highs[0][1] if self._highs else None
+
+    @property
+    def low(self) -> Optional[float]:
+        return self._lows[0][1] if self._lows else None
+
+    @property
+    def complete(self) -> bool:
+        return self.count >= self.window
+
+    def push(self, date: str, high: float, low: float, close: float):
+        """Add the bar for ``date``; a repeated date replaces the forming candle."""
+        if self.last_date is not None and date <= self.last_date:
+            if date < self.last_date:
+                return
+            if (self._highs and high < self._highs[-1][1]) or (self._lows and low > self._lows[-1][1]):
+                # A shrinking candle may uncover extremes the deques dropped
+                self.stale = True
+                return
+            if self._highs and self._highs[-1][0] == self.count - 1:
+                self._highs.pop()
+            if self._lows and self._lows[-1][0] == self.count - 1:
+                self._lows.pop()
+            seq = self.count - 1
+        else:
+            seq = self.count
+            self.count += 1
+
+        if high == high:  # skip NaN, as Series.max does
+            while self._highs and self._highs[-1][1] <= high:
+                self._highs.pop()
+            self._highs.append((seq, high))
+        if low == low:
+            while self._lows and self._lows[-1][1] >= low:
+                self._lows.pop()
+            self._lows.append((seq, low))
+
+        cutoff = self.count - self.window
+        while self._highs and self._highs[0][0] < cutoff:
+            self._highs.popleft()
+        while self._lows and self._lows[0][0] < cutoff:
+            self._lows.popleft()
+        self.last_date = date
+        self.close = close
+
+
+class Week52SummaryStore:
+    """Per-symbol Rolling52WeekSummary objects, fed as daily bars are ingested.
+
+    Every symbol gets a summary for the default window; other windows are
+    added when a filter asks for them and are then maintained alongside.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._summaries: Dict[str, Dict[int, Rolling52WeekSummary]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, symbol: str, bars: Any):
+        """Push the bars of ``bars`` (records, columns or a frame) newer than each summary."""
+        with self._lock:
+            windows = self._summaries.setdefault(symbol, {})
+            windows.setdefault(self.window, Rolling52WeekSummary(self.window))
+            for window, summary in list(windows.items()):
+                since = None if summary.stale else summary.last_date
+                if since is not None:
+                    dates, highs, lows, closes = _daily_bars(bars, since)
+                    if not dates:
+                        continue
+                    if dates[0] == since:
+                        for bar in zip(dates, highs, lows, closes):
+                            summary.push(*bar)
+                        if not summary.stale:
+                            continue
+                # Nothing to append to (new, stale or a gap since the last bar): rebuild
+                windows[window] = self._build(window, bars)
+
+    @staticmethod
+    def _build(window: int, bars: Any) -> Rolling52WeekSummary:
+        dates, highs, lows, closes = _daily_bars(bars, None)
+        start = max(len(dates) - window, 0)
+        summary = Rolling52WeekSummary(window)
+        for bar in zip(dates[start:], highs[start:], lows[start:], closes[start:]):
+            summary.push(*bar)
+        return summary
+
+    def seed(self, symbol: str, window: int, bars: Any) -> Rolling52WeekSummary:
+        """Replace the ``window`` summary of ``symbol`` with one built from ``bars``."""
+        summary = self._build(window, bars)
+        with self._lock:
+            self._summaries.setdefault(symbol, {})[window] = summary
+        return summary
+
+    def get(self, symbol: str, window: int) -> Optional[Rolling52WeekSummary]:
+        with self._lock:
+            return self._summaries.get(symbol, {}).get(window)
+
+    def clear(self):
+        with self._lock:
+            self._summaries.clear()
+
+
+def _daily_bars(bars: Any, since: Optional[str]) -> tuple:
+    """(dates, highs, lows, closes) lists of the bars dated ``since`` or later.
+
+    ``bars`` is a list of records, a dict of cached NumPy columns or a
+    DatetimeIndex frame, sorted by date. Dates become 'YYYY-MM-DD' strings.
+    """
+    if isinstance(bars, list):
+        dates = [str(r['date'])[:10] for r in bars]
+        start = 0 if since is None else bisect.bisect_left(dates, since)
+        tail = bars[start:]
+        return (dates[start:], [float(r['high']) for r in tail],
+                [float(r['low']) for r in tail], [float(r['close']) for r in tail])
+    if isinstance(bars, dict):
+        days = bars['date'].astype('datetime64[D]')
+        start = 0 if since is None else int(np.searchsorted(days, np.datetime64(since, 'D')))
+        return (np.datetime_as_string(days[start:]).tolist(), bars['high'][start:].astype(float).tolist(),
+                bars['low'][start:].astype(float).tolist(), bars['close'][start:].astype(float).tolist())
+    index = bars.index
+    start = 0 if since is None else int(index.searchsorted(pd.Timestamp(since)))
+    tail = bars.iloc[start:]
+    return (tail.index.strftime('%Y-%m-%d').tolist(), tail['high'].astype(float).tolist(),
+            tail['low'].astype(float).tolist(), tail['close'].astype(float).tolist())
+
+
+# Trading days in the 52-week window maintained for every symbol
+WEEK52_BARS = int(os.getenv('WEEK52_BARS', '252'))
+WEEK52_SUMMARIES = Week52SummaryStore(WEEK52_BARS)
+
+
+def _observe_daily_bars(symbol: str, interval: str, result: Any):
+    """Feed freshly fetched or cached daily bars to the 52-week summaries."""
+    if interval != 'daily' or not isinstance(result, dict) or result.get('source') == 'mock':
+        return
+    bars = result.get('columns') if 'columns' in result else result.get('data')
+    if bars is None or len(bars) == 0:
+        return
+    try:
+        WEEK52_SUMMARIES.observe(symbol, bars)
+    except Exception as e:
+        logger.debug(f"52-week summary update skipped for {symbol}: {e}")
+
+
+def _redis_get_with_ttl(key: str) -> tuple:
+    """GET a key together with its remaining TTL in one round trip."""
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.get(key)
+    pipe.ttl(key)
+    cached, remaining = pipe.execute()
+    return cached, remaining
+
+
 def get_from_cache(key: str) -> Optional[Any]:
-    """Get data from Redis cache"""
-    if not CACHE_ENABLED:
+    """Get data from the local tier, then Redis"""
+    if not _cache_available():
         return None
+
+    local = LOCAL_CACHE.get(key)
+    if local is not None:
+        logger.debug(f"Local cache HIT: {key}")
+        return json.loads(local)
     
     try:
-        cached = redis_client.get(key)
+        cached, remaining = _redis_get_with_ttl(key)
         if cached:
             logger.info(f"Cache HIT: {key}")
-            return json.loads(cached)
+            value = json.loads(cached)
+            LOCAL_CACHE.put(key, bytes(cached), remaining, len(cached))
+            return value
     except Exception as e:
         logger.error(f"Cache read error: {e}")
+        _handle_redis_error(e)
     
     logger.info(f"Cache MISS: {key}")
     return None
 
 
 def set_in_cache(key: str, value: Any, ttl: int):
-    """Store data in Redis cache"""
-    if not CACHE_ENABLED:
+    """Store data in Redis cache and the local tier"""
+    if not _cache_available():
         return
     
     try:
+        payload = json.dumps(value).encode()
+        LOCAL_CACHE.put(key, payload, ttl, len(payload))
         redis_client.setex(
             key,
             ttl,
-            json.dumps(value)
+            payload
         )
         logger.info(f"Cache SET: {key} (TTL: {ttl}s)")
     except Exception as e:
         logger.error(f"Cache write error: {e}")
+        _handle_redis_error(e)
+
+
+def _decode_stock_data(raw: bytes, as_columns: bool = False) -> Dict[str, Any]:
+    """Decode a cached stock data entry, a binary OHLCV blob or JSON."""
+    if ohlcv_codec.is_ohlcv_blob(raw):
+        return ohlcv_codec.decode_ohlcv(raw, records=not as_columns)
+    return json.loads(raw)
+
+
+def get_stock_data_from_cache(key: str, as_columns: bool = False) -> Optional[Dict[str, Any]]:
+    """Get a stock data result from the local tier or Redis.
+
+    Binary entries decode to NumPy ``columns`` when ``as_columns`` is set,
+    otherwise (and for JSON entries) the result carries ``data`` records.
+    The local tier keeps entries as their encoded bytes; binary ones decode
+    to columns without copying.
+    """
+    if not _cache_available():
+        return None
+
+    cached = LOCAL_CACHE.get(key)
+    if cached is not None:
+        logger.debug(f"Local cache HIT: {key}")
+        return _decode_stock_data(cached, as_columns)
+
+    try:
+        cached, remaining = _redis_get_with_ttl(key)
+        if cached:
+            logger.info(f"Cache HIT: {key}")
+            value = _decode_stock_data(cached, as_columns)
+            LOCAL_CACHE.put(key, bytes(cached), remaining, len(cached))
+            return value
+    except Exception as e:
+        logger.error(f"Cache read error: {e}")
+        _handle_redis_error(e)
+
+    logger.info(f"Cache MISS: {key}")
+    return None
+
+
+def set_stock_data_in_cache(key: str, value: Dict[str, Any], ttl: int):
+    """Store a stock data result, using the binary OHLCV codec when enabled."""
+    if not _cache_available():
+        return
+
+    blob = None
+    if CACHE_OHLCV_FORMAT == 'binary':
+        blob = ohlcv_codec.try_encode_ohlcv(value, compress=CACHE_COMPRESSION)
+    if blob is None:
+        set_in_cache(key, value, ttl)
+        return
+
+    LOCAL_CACHE.put(key, blob, ttl, len(blob))
+    try:
+        redis_client.setex(key, ttl, blob)
+        logger.info(f"Cache SET: {key} (TTL: {ttl}s, {len(blob)} bytes)")
+    except Exception as e:
+        logger.error(f"Cache write error: {e}")
+        _handle_redis_error(e)
+
+
+CACHE_BULK_BATCH_SIZE = max(1, int(os.getenv('CACHE_BULK_BATCH_SIZE', '500')))
+
+
+def get_many_stock_data_from_cache(keys: List[str], as_columns: bool = False) -> Dict[str, Dict[str, Any]]:
+    """Bulk get_stock_data_from_cache: returns hits only, keyed by cache key.
+
+    Local-tier misses are read from Redis with one pipelined MGET (plus the
+    TTLs for the local tier) per CACHE_BULK_BATCH_SIZE keys.
+    """
+    if not _cache_available() or not keys:
+        return {}
+
+    hits: Dict[str, Dict[str, Any]] = {}
+    remote_keys: List[str] = []
+    for key in dict.fromkeys(keys):
+        local = LOCAL_CACHE.get(key)
+        if local is None:
+            remote_keys.append(key)
+        else:
+            hits[key] = _decode_stock_data(local, as_columns)
+
+    for start in range(0, len(remote_keys), CACHE_BULK_BATCH_SIZE):
+        chunk = remote_keys[start:start + CACHE_BULK_BATCH_SIZE]
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.mget(chunk)
+            for key in chunk:
+                pipe.ttl(key)
+            values, *remaining = pipe.execute()
+        except Exception as e:
+            logger.error(f"Cache bulk read error: {e}")
+            _handle_redis_error(e)
+            continue
+
+        for key, raw, ttl in zip(chunk, values, remaining):
+            if not raw:
+                continue
+            try:
+                hits[key] = _decode_stock_data(raw, as_columns)
+                LOCAL_CACHE.put(key, bytes(raw), ttl, len(raw))
+            except Exception as e:
+                logger.error(f"Cache read error for {key}: {e}")
+                _handle_redis_error(e)
+
+    logger.info(f"Cache bulk read: {len(hits)}/{len(keys)} hits")
+    return hits
+
+
+def set_many_stock_data_in_cache(entries: Dict[str, Dict[str, Any]], ttl: int):
+    """Bulk set_stock_data_in_cache with one pipelined SETEX batch per CACHE_BULK_BATCH_SIZE keys."""
+    if not _cache_available() or not entries:
+        return
+
+    payloads = []
+    for key, value in entries.items():
+        try:
+            payload = None
+            if CACHE_OHLCV_FORMAT == 'binary':
+                payload = ohlcv_codec.try_encode_ohlcv(value, compress=CACHE_COMPRESSION)
+            if payload is None:
+                payload = json.dumps(value).encode()
+            LOCAL_CACHE.put(key, payload, ttl, len(payload))
+            payloads.append((key, payload))
+        except Exception as e:
+            logger.error(f"Cache write error for {key}: {e}")
+            _handle_redis_error(e)
+
+    for start in range(0, len(payloads), CACHE_BULK_BATCH_SIZE):
+        chunk = payloads[start:start + CACHE_BULK_BATCH_SIZE]
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            for key, payload in chunk:
+                pipe.setex(key, ttl, payload)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Cache bulk write error: {e}")
+            _handle_redis_error(e)
+
+    logger.info(f"Cache bulk SET: {len(payloads)} keys (TTL: {ttl}s)")
 
 
 def _parse_offset(offset_val) -> int:
@@ -206,21 +713,172 @@ def _parse_offset(offset_val) -> int:
     return 0
 
 
+# ============================================================================
+# TOOL EXECUTION
+# ============================================================================
+
+# Threads tool bodies run on: they block on HTTP, Redis and pandas, so the
+# event loop only awaits them and keeps serving other clients meanwhile
+TOOL_WORKERS = max(1, int(os.getenv('TOOL_WORKERS', '8')))
+
+# Tools that can hold a thread for a long time. Together they may use at most
+# TOOL_SLOW_CONCURRENCY threads (default half, never all of them when there
+# are two or more), so quick calls such as fetch_stock_data always find one free.
+_SLOW_TOOLS = frozenset({'scan_stocks', 'run_preset_scan', 'run_saved_scan', 'get_watchlist_scan_results',
+                         'ingest_candles'})
+TOOL_SLOW_CONCURRENCY = min(max(1, int(os.getenv('TOOL_SLOW_CONCURRENCY', str(TOOL_WORKERS // 2)))),
+                            max(1, TOOL_WORKERS - 1))
+# Semaphore key of the limit the slow tools share
+_SLOW_TOOLS_KEY = '*slow_tools'
+
+
+def _parse_tool_concurrency(spec: str) -> Dict[str, int]:
+    """Per-tool limits from 'tool=limit,...'; 0 (or less) means no limit."""
+    limits = {}
+    for item in spec.split(','):
+        name, _, limit = item.partition('=')
+        if not name.strip():
+            continue
+        try:
+            limits[name.strip()] = int(limit)
+        except ValueError:
+            logger.warning(f"Ignoring TOOL_CONCURRENCY entry {item!r}")
+    return {name: limit for name, limit in limits.items() if limit > 0}
+
+
+TOOL_CONCURRENCY = _parse_tool_concurrency(os.getenv('TOOL_CONCURRENCY', ''))
+
+_tool_executor_state: Dict[str, Optional[ThreadPoolExecutor]] = {'executor': None}
+_tool_lock = threading.Lock()
+# key -> (event loop, semaphore): asyncio primitives belong to one loop
+_tool_semaphores: Dict[str, tuple] = {}
+_tool_running: Dict[str, int] = {}
+
+
+def _tool_executor() -> ThreadPoolExecutor:
+    with _tool_lock:
+        if _tool_executor_state['executor'] is None:
+            _tool_executor_state['executor'] = ThreadPoolExecutor(max_workers=TOOL_WORKERS,
+                                                                  thread_name_prefix='mcp-tool')
+        return _tool_executor_state['executor']
+
+
+def _tool_semaphore(key: str, limit: int) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    with _tool_lock:
+        entry = _tool_semaphores.get(key)
+        if entry is None or entry[0] is not loop:
+            entry = _tool_semaphores[key] = (loop, asyncio.Semaphore(limit))
+        return entry[1]
+
+
+def _tool_limits(name: str) -> List[asyncio.Semaphore]:
+    """Semaphores a call of ``name`` holds: its own limit, then the slow tools' shared one."""
+    semaphores = []
+    if name in TOOL_CONCURRENCY:
+        semaphores.append(_tool_semaphore(name, TOOL_CONCURRENCY[name]))
+    if name in _SLOW_TOOLS:
+        semaphores.append(_tool_semaphore(_SLOW_TOOLS_KEY, TOOL_SLOW_CONCURRENCY))
+    return semaphores
+
+
+async def _run_tool(name: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a tool body on the tool executor, within the tool's concurrency limits.
+
+    Calls over a limit wait on the event loop without holding a thread.
+    """
+    async with AsyncExitStack() as limits:
+        for semaphore in _tool_limits(name):
+            await limits.enter_async_context(semaphore)
+        with _tool_lock:
+            _tool_running[name] = _tool_running.get(name, 0) + 1
+        try:
+            call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+            return await asyncio.get_running_loop().run_in_executor(_tool_executor(), call)
+        finally:
+            with _tool_lock:
+                _tool_running[name] -= 1
+
+
+def _tool_stats() -> Dict[str, Any]:
+    with _tool_lock:
+        running = {name: count for name, count in _tool_running.items() if count}
+    return {
+        'workers': TOOL_WORKERS,
+        'limits': dict(TOOL_CONCURRENCY),
+        'slow_tools': {'tools': sorted(_SLOW_TOOLS), 'limit': TOOL_SLOW_CONCURRENCY},
+        'running': running,
+    }
+
+
+def _async_tool(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Register ``fn`` as an async MCP tool that runs it through _run_tool.
+
+    The module keeps the plain function, so in-process callers and tests call
+    it synchronously as before.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def tool(*args, **kwargs):
+        return await _run_tool(name, fn, *args, **kwargs)
+
+    mcp.tool()(tool)
+    return fn
+
+
 # ============================================================================
 # API CLIENT HELPER
 # ============================================================================
 
 API_BASE_URL = os.getenv('API_URL', 'http://localhost:4001')
 USE_LOCAL_CANDLES = os.getenv('USE_LOCAL_CANDLES', 'true').lower() == 'true'
+API_TIMEOUT = float(os.getenv('API_TIMEOUT', '10'))
+API_MAX_RETRIES = int(os.getenv('API_MAX_RETRIES', '2'))
+SCAN_FETCH_CONCURRENCY = max(1, int(os.getenv('SCAN_FETCH_CONCURRENCY', '16')))
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+
+def _get_http_session() -> requests.Session:
+    """Shared session so API calls reuse pooled keep-alive connections."""
+    global _http_session
+    if _http_session is not None:
+        return _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=API_MAX_RETRIES,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({'GET'}),
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=SCAN_FETCH_CONCURRENCY,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _http_session = session
+        return _http_session
+
 
 def _api_request(method: str, endpoint: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Make a request to the centralized API."""
     url = f"{API_BASE_URL}{endpoint}"
+    session = _get_http_session()
     try:
         if method.upper() == 'GET':
-            response = requests.get(url, params=data, timeout=10)
+            response = session.get(url, params=data, timeout=API_TIMEOUT)
         else:
-            response = requests.request(method, url, json=data, timeout=10)
+            response = session.request(method, url, json=data, timeout=API_TIMEOUT)
         
         response.raise_for_status()
         return response.json()
@@ -271,7 +929,7 @@ def _resolve_scan_symbols(symbols: Optional[List[str]], watchlist_id: Optional[s
 
 
 
-@mcp.tool()
+@_async_tool
 def create_watchlist(
     name: str,
     symbols: List[str],
@@ -295,7 +953,7 @@ def create_watchlist(
     return _api_request('POST', '/api/watchlists', payload)
 
 
-@mcp.tool()
+@_async_tool
 def list_watchlists() -> Dict[str, Any]:
     """List all saved watchlists via API.
 
@@ -308,7 +966,7 @@ def list_watchlists() -> Dict[str, Any]:
     return _api_request('GET', '/api/watchlists')
 
 
-@mcp.tool()
+@_async_tool
 def update_watchlist_symbols(
     identifier: str,
     symbols: List[str]
@@ -330,7 +988,7 @@ def update_watchlist_symbols(
     return _api_request('PATCH', f'/api/watchlists/{identifier}/symbols', payload)
 
 
-@mcp.tool()
+@_async_tool
 def delete_watchlist(identifier: str) -> Dict[str, Any]:
     """Delete a watchlist by identifier via API.
 
@@ -343,7 +1001,7 @@ def delete_watchlist(identifier: str) -> Dict[str, Any]:
     return _api_request('DELETE', f'/api/watchlists/{identifier}')
 
 
-@mcp.tool()
+@_async_tool
 def get_watchlist_scan_results(
     identifier: str,
     filters: List[Dict[str, Any]],
@@ -366,7 +1024,7 @@ def get_watchlist_scan_results(
     return _api_request('POST', f'/api/watchlists/{identifier}/scan', payload)
 
 
-@mcp.tool()
+@_async_tool
 def create_saved_scan(
     name: str,
     filters: List[Dict[str, Any]],
@@ -396,7 +1054,7 @@ def create_saved_scan(
     return _api_request('POST', '/api/saved-scans', payload)
 
 
-@mcp.tool()
+@_async_tool
 def list_saved_scans() -> Dict[str, Any]:
     """List all saved scan definitions via API.
 
@@ -409,7 +1067,7 @@ def list_saved_scans() -> Dict[str, Any]:
     return _api_request('GET', '/api/saved-scans')
 
 
-@mcp.tool()
+@_async_tool
 def run_saved_scan(identifier: str) -> Dict[str, Any]:
     """Execute a saved scan by identifier via API.
 
@@ -422,7 +1080,7 @@ def run_saved_scan(identifier: str) -> Dict[str, Any]:
     return _api_request('POST', f'/api/saved-scans/{identifier}/run')
 
 
-@mcp.tool()
+@_async_tool
 def delete_saved_scan(identifier: str) -> Dict[str, Any]:
     """Delete a saved scan definition via API.
 
@@ -502,15 +1160,32 @@ def calculate_bollinger_bands(df: pd.DataFrame, period: int = 20, std_dev: int =
     }
 
 
+def _rolling_window_apply(values, window: int, func):
+    """Vectorized equivalent of ``values.rolling(window).apply(func, raw=True)``.
+
+    ``func`` receives every full window at once as an array whose last axis
+    is the window. Windows containing NaN yield NaN, matching rolling().
+    Works for a Series or a wide (bars x symbols) DataFrame.
+    """
+    arr = np.asarray(values, dtype='float64')
+    out = np.full(arr.shape, np.nan)
+    if window >= 1 and len(arr) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(arr, window, axis=0)
+        result = np.asarray(func(windows), dtype='float64')
+        result[np.isnan(windows).any(axis=-1)] = np.nan
+        out[window - 1:] = result
+
+    if isinstance(values, pd.DataFrame):
+        return pd.DataFrame(out, index=values.index, columns=values.columns)
+    return pd.Series(out, index=values.index, name=values.name)
+
+
 def calculate_wma(df: pd.DataFrame, period: int = 20) -> pd.Series:
     """Calculate Weighted Moving Average (WMA)."""
     close = df['close']
-    weights = np.arange(1, period + 1)
+    weights = np.arange(1, period + 1, dtype='float64')
     
-    def wma_func(x):
-        return np.dot(x, weights) / weights.sum()
-        
-    return close.rolling(window=period).apply(wma_func, raw=True)
+    return _rolling_window_apply(close, period, lambda w: (w @ weights) / weights.sum())
 
 
 def calculate_vwap(df: pd.DataFrame) -> pd.Series:
@@ -539,7 +1214,8 @@ def calculate_atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
     tr2 = (high - close).abs()
     tr3 = (low - close).abs()
     
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+    # np.fmax skips NaN like a row-wise max and also works on wide (bars x symbols) frames
+    tr = np.fmax(tr1, np.fmax(tr2, tr3))
     atr = tr.ewm(alpha=1/period, adjust=False).mean() # Wilder's smoothing
     return atr
 
@@ -553,15 +1229,15 @@ def calculate_adx(df: pd.DataFrame, period: int = 14) -> pd.Series:
     up_move = high - high.shift(1)
     down_move = low.shift(1) - low
     
-    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
-    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    plus_dm = up_move.where((up_move > down_move) & (up_move > 0), 0.0)
+    minus_dm = down_move.where((down_move > up_move) & (down_move > 0), 0.0)
     
     # Calculate ATR
     atr = calculate_atr(df, period)
     
     # Smooth DM
-    plus_di = 100 * pd.Series(plus_dm, index=df.index).ewm(alpha=1/period, adjust=False).mean() / atr
-    minus_di = 100 * pd.Series(minus_dm, index=df.index).ewm(alpha=1/period, adjust=False).mean() / atr
+    plus_di = 100 * plus_dm.ewm(alpha=1/period, adjust=False).mean() / atr
+    minus_di = 100 * minus_dm.ewm(alpha=1/period, adjust=False).mean() / atr
     
     dx = 100 * abs(plus_di - minus_di) / (plus_di + minus_di)
     adx = dx.ewm(alpha=1/period, adjust=False).mean()
@@ -584,120 +1260,168 @@ def calculate_stoch(df: pd.DataFrame, period: int = 14, smooth_k: int = 3) -> Di
     return {'k': k} # We can add 'd' if needed (SMA of K)
 
 
-def calculate_supertrend(df: pd.DataFrame, period: int = 10, multiplier: float = 3.0) -> pd.Series:
-    """Calculate Supertrend."""
-    atr = calculate_atr(df, period)
-    
-    high = df['high']
-    low = df['low']
-    close = df['close']
-    
-    hl2 = (high + low) / 2
-    
-    basic_upper = hl2 + (multiplier * atr)
-    basic_lower = hl2 - (multiplier * atr)
-    
-    # Initialize series
-    final_upper = pd.Series(0.0, index=df.index)
-    final_lower = pd.Series(0.0, index=df.index)
-    supertrend = pd.Series(0.0, index=df.index)
-    
-    # We need to iterate to implement the logic which depends on previous values
-    # Optimizing this in pandas is tricky because of the conditional dependency on previous close.
-    # We will do a loop for MVP correctness.
-    
-    # Pre-calculate arrays for speed
-    bu = basic_upper.values
-    bl = basic_lower.values
-    c = close.values
-    
-    fu = np.zeros(len(df))
-    fl = np.zeros(len(df))
-    st = np.zeros(len(df))
-    
-    for i in range(1, len(df)):
+def _supertrend_kernel(bu, bl, c):
+    """Supertrend band recursion over basic upper/lower bands and closes."""
+    n = len(c)
+    st = np.zeros(n)
+    fu_prev = 0.0
+    fl_prev = 0.0
+    st_prev = 0.0
+    for i in range(1, n):
         # Upper Band
-        if bu[i] < fu[i-1] or c[i-1] > fu[i-1]:
-            fu[i] = bu[i]
+        if bu[i] < fu_prev or c[i-1] > fu_prev:
+            fu = bu[i]
         else:
-            fu[i] = fu[i-1]
-            
+            fu = fu_prev
+
         # Lower Band
-        if bl[i] > fl[i-1] or c[i-1] < fl[i-1]:
-            fl[i] = bl[i]
+        if bl[i] > fl_prev or c[i-1] < fl_prev:
+            fl = bl[i]
         else:
-            fl[i] = fl[i-1]
-            
+            fl = fl_prev
+
         # Supertrend
-        if st[i-1] == fu[i-1]:
-            if c[i] > fu[i]:
-                st[i] = fl[i] # Trend Up
+        if st_prev == fu_prev:
+            if c[i] > fu:
+                value = fl # Trend Up
             else:
-                st[i] = fu[i] # Trend Down
+                value = fu # Trend Down
         else:
-            if c[i] < fl[i]:
-                st[i] = fu[i] # Trend Down
+            if c[i] < fl:
+                value = fu # Trend Down
             else:
-                st[i] = fl[i] # Trend Up
+                value = fl # Trend Up
 
-    return pd.Series(st, index=df.index)
+        st[i] = value
+        fu_prev = fu
+        fl_prev = fl
+        st_prev = value
+    return st
 
 
-def calculate_psar(df: pd.DataFrame, step: float = 0.02, max_step: float = 0.2) -> pd.Series:
-    """Calculate Parabolic SAR."""
-    high = df['high']
-    low = df['low']
-    close = df['close']
-    
-    psar = close.copy()
-    psar_series = pd.Series(index=psar.index, dtype='float64')
-    
+def _psar_kernel(high, low, step, max_step):
+    """Parabolic SAR recursion over high/low prices."""
+    n = len(high)
+    out = np.empty(n)
+    if n == 0:
+        return out
+
     bullish = True
     af = step
-    hp = high.iloc[0]
-    lp = low.iloc[0]
-    
+    hp = high[0]
+    lp = low[0]
+
     # Initialize
-    psar_series.iloc[0] = low.iloc[0]
-    
-    for i in range(1, len(df)):
-        curr_high = high.iloc[i]
-        curr_low = low.iloc[i]
-        prev_psar = psar_series.iloc[i-1]
-        
+    prev = low[0]
+    out[0] = prev
+
+    for i in range(1, n):
+        curr_high = high[i]
+        curr_low = low[i]
+
         if bullish:
-            psar_series.iloc[i] = prev_psar + af * (hp - prev_psar)
-            psar_series.iloc[i] = min(psar_series.iloc[i], low.iloc[i-1])
-            if i > 1:
-                psar_series.iloc[i] = min(psar_series.iloc[i], low.iloc[i-2])
-            
-            if curr_low < psar_series.iloc[i]:
+            sar = prev + af * (hp - prev)
+            if low[i-1] < sar:
+                sar = low[i-1]
+            if i > 1 and low[i-2] < sar:
+                sar = low[i-2]
+
+            if curr_low < sar:
                 bullish = False
-                psar_series.iloc[i] = hp
+                sar = hp
                 lp = curr_low
                 af = step
-            else:
-                if curr_high > hp:
-                    hp = curr_high
-                    af = min(af + step, max_step)
-                    
+            elif curr_high > hp:
+                hp = curr_high
+                af = af + step
+                if max_step < af:
+                    af = max_step
+
         else: # Bearish
-            psar_series.iloc[i] = prev_psar + af * (lp - prev_psar)
-            psar_series.iloc[i] = max(psar_series.iloc[i], high.iloc[i-1])
-            if i > 1:
-                psar_series.iloc[i] = max(psar_series.iloc[i], high.iloc[i-2])
-                
-            if curr_high > psar_series.iloc[i]:
+            sar = prev + af * (lp - prev)
+            if high[i-1] > sar:
+                sar = high[i-1]
+            if i > 1 and high[i-2] > sar:
+                sar = high[i-2]
+
+            if curr_high > sar:
                 bullish = True
-                psar_series.iloc[i] = lp
+                sar = lp
                 hp = curr_high
                 af = step
-            else:
-                if curr_low < lp:
-                    lp = curr_low
-                    af = min(af + step, max_step)
+            elif curr_low < lp:
+                lp = curr_low
+                af = af + step
+                if max_step < af:
+                    af = max_step
+
+        out[i] = sar
+        prev = sar
+    return out
+
+
+# Compiled kernels by name; populated on first use
+_COMPILED_KERNELS: Dict[str, Any] = {}
+
 
-    return psar_series
+def _run_indicator_kernel(kernel, arrays: List[np.ndarray], *args) -> np.ndarray:
+    """Run a bar-by-bar indicator kernel, compiled with numba when available.
+
+    numba is an optional accelerator. Without it the same kernel runs as plain
+    Python over lists, which avoids per-element NumPy scalar overhead.
+    """
+    compiled = _COMPILED_KERNELS.get(kernel.__name__)
+    if compiled is None:
+        try:
+            from numba import njit
+            compiled = njit(cache=True, nogil=True)(kernel)
+        except ImportError:
+            compiled = kernel
+        _COMPILED_KERNELS[kernel.__name__] = compiled
+
+    if compiled is kernel:
+        return np.asarray(kernel(*[np.asarray(a, dtype='float64').tolist() for a in arrays], *args), dtype='float64')
+    return compiled(*[np.ascontiguousarray(a, dtype='float64') for a in arrays], *args)
+
+
+def calculate_supertrend(df: pd.DataFrame, period: int = 10, multiplier: float = 3.0) -> pd.Series:
+    """Calculate Supertrend."""
+    atr = calculate_atr(df, period)
+    
+    high = df['high']
+    low = df['low']
+    close = df['close']
+    
+    hl2 = (high + low) / 2
+    
+    basic_upper = hl2 + (multiplier * atr)
+    basic_lower = hl2 - (multiplier * atr)
+    
+    # The bands depend on the previous close and band values, so this runs
+    # as a sequential kernel (compiled when numba is installed).
+    if isinstance(close, pd.DataFrame):
+        return pd.DataFrame({
+            col: _run_indicator_kernel(_supertrend_kernel, [basic_upper[col], basic_lower[col], close[col]])
+            for col in close.columns
+        }, index=df.index)
+
+    st = _run_indicator_kernel(_supertrend_kernel, [basic_upper, basic_lower, close])
+    return pd.Series(st, index=df.index)
+
+
+def calculate_psar(df: pd.DataFrame, step: float = 0.02, max_step: float = 0.2) -> pd.Series:
+    """Calculate Parabolic SAR."""
+    high = df['high']
+    low = df['low']
+
+    if isinstance(high, pd.DataFrame):
+        return pd.DataFrame({
+            col: _run_indicator_kernel(_psar_kernel, [high[col], low[col]], float(step), float(max_step))
+            for col in high.columns
+        }, index=df.index)
+
+    psar = _run_indicator_kernel(_psar_kernel, [high, low], float(step), float(max_step))
+    return pd.Series(psar, index=df.index)
 
 
 def calculate_ichimoku(df: pd.DataFrame, tenkan_period: int = 9, kijun_period: int = 26, senkou_b_period: int = 52) -> Dict[str, pd.Series]:
@@ -739,14 +1463,9 @@ def calculate_aroon(df: pd.DataFrame, period: int = 25) -> Dict[str, pd.Series]:
     high = df['high']
     low = df['low']
     
-    def days_since_high(x):
-        return period - np.argmax(x)
-    
-    def days_since_low(x):
-        return period - np.argmin(x)
-    
-    aroon_up = high.rolling(window=period + 1).apply(days_since_high, raw=True) / period * 100
-    aroon_down = low.rolling(window=period + 1).apply(days_since_low, raw=True) / period * 100
+    # argmax/argmin pick the first (oldest) extreme in each window
+    aroon_up = _rolling_window_apply(high, period + 1, lambda w: period - np.argmax(w, axis=-1)) / period * 100
+    aroon_down = _rolling_window_apply(low, period + 1, lambda w: period - np.argmin(w, axis=-1)) / period * 100
     aroon_oscillator = aroon_up - aroon_down
     
     return {
@@ -765,10 +1484,10 @@ def calculate_cci(df: pd.DataFrame, period: int = 20) -> pd.Series:
     typical_price = (df['high'] + df['low'] + df['close']) / 3
     sma = typical_price.rolling(window=period).mean()
     
-    def mean_absolute_deviation(x):
-        return np.abs(x - x.mean()).mean()
+    def mean_absolute_deviation(w):
+        return np.abs(w - w.mean(axis=-1, keepdims=True)).mean(axis=-1)
     
-    mad = typical_price.rolling(window=period).apply(mean_absolute_deviation, raw=True)
+    mad = _rolling_window_apply(typical_price, period, mean_absolute_deviation)
     cci = (typical_price - sma) / (0.015 * mad)
     
     return cci
@@ -832,6 +1551,56 @@ def calculate_roc(df: pd.DataFrame, period: int = 12) -> pd.Series:
     return roc
 
 
+def _crossed_above(current_value, compare_value, previous_value=None, previous_compare=None) -> bool:
+    if previous_value is None or previous_compare is None:
+        return False
+    return (current_value > compare_value and
+            previous_value <= previous_compare)
+
+
+def _crossed_below(current_value, compare_value, previous_value=None, previous_compare=None) -> bool:
+    if previous_value is None or previous_compare is None:
+        return False
+    return (current_value < compare_value and
+            previous_value >= previous_compare)
+
+
+def _between(current_value, compare_value, previous_value=None, previous_compare=None) -> bool:
+    # compare_value should be a tuple/list [min, max]
+    if isinstance(compare_value, (list, tuple)) and len(compare_value) == 2:
+        return compare_value[0] <= current_value <= compare_value[1]
+    return False
+
+
+# operator -> predicate(current, compare, previous=None, previous_compare=None)
+_CONDITIONS = {
+    'gt': lambda c, v, p=None, pv=None: c > v,
+    '>': lambda c, v, p=None, pv=None: c > v,
+    'gte': lambda c, v, p=None, pv=None: c >= v,
+    '>=': lambda c, v, p=None, pv=None: c >= v,
+    'lt': lambda c, v, p=None, pv=None: c < v,
+    '<': lambda c, v, p=None, pv=None: c < v,
+    'lte': lambda c, v, p=None, pv=None: c <= v,
+    '<=': lambda c, v, p=None, pv=None: c <= v,
+    'eq': lambda c, v, p=None, pv=None: abs(c - v) < 0.01,
+    '==': lambda c, v, p=None, pv=None: abs(c - v) < 0.01,
+    'crossed_above': _crossed_above,
+    'crosses_above': _crossed_above,
+    'crossed_below': _crossed_below,
+    'crosses_below': _crossed_below,
+    'between': _between,
+}
+
+
+def _never(current_value, compare_value, previous_value=None, previous_compare=None) -> bool:
+    return False
+
+
+def _bind_condition(operator: str):
+    """Resolve an operator once into its predicate (unknown operators never pass)."""
+    return _CONDITIONS.get(operator, _never) if isinstance(operator, str) else _never
+
+
 def evaluate_condition(
     current_value: float,
     compare_value: float,
@@ -840,34 +1609,7 @@ def evaluate_condition(
     previous_compare: Optional[float] = None
 ) -> bool:
     """Evaluate a filter condition"""
-    
-    if operator in ['gt', '>']:
-        return current_value > compare_value
-    elif operator in ['gte', '>=']:
-        return current_value >= compare_value
-    elif operator in ['lt', '<']:
-        return current_value < compare_value
-    elif operator in ['lte', '<=']:
-        return current_value <= compare_value
-    elif operator in ['eq', '==']:
-        return abs(current_value - compare_value) < 0.01
-    elif operator in ['crossed_above', 'crosses_above']:
-        if previous_value is None or previous_compare is None:
-            return False
-        return (current_value > compare_value and 
-                previous_value <= previous_compare)
-    elif operator in ['crossed_below', 'crosses_below']:
-        if previous_value is None or previous_compare is None:
-            return False
-        return (current_value < compare_value and 
-                previous_value >= previous_compare)
-    elif operator == 'between':
-        # compare_value should be a tuple/list [min, max]
-        if isinstance(compare_value, (list, tuple)) and len(compare_value) == 2:
-            return compare_value[0] <= current_value <= compare_value[1]
-        return False
-    
-    return False
+    return _bind_condition(operator)(current_value, compare_value, previous_value, previous_compare)
 
 
 def calculate_percentage_change(current: float, previous: float) -> float:
@@ -898,14 +1640,37 @@ class StockDataProvider:
     without modification.
     """
 
+    # Whether fetch_ohlc_batch is served natively (one call per chunk)
+    supports_batch = False
+
     def fetch_ohlc(
         self,
         symbol: str,
         interval: str,
-        outputsize: str,
+        outputsize: Union[str, int],
     ) -> Dict[str, Any]:
         raise NotImplementedError("fetch_ohlc must be implemented by subclasses")
 
+    def fetch_ohlc_since(self, symbol: str, interval: str, since: int) -> Optional[List[Dict[str, Any]]]:
+        """Records from ``since`` (epoch seconds) up to now.
+
+        Returns None when the provider cannot fetch an arbitrary range;
+        callers then refetch the whole window with fetch_ohlc.
+        """
+        return None
+
+    def fetch_ohlc_batch(
+        self,
+        symbols: List[str],
+        interval: str,
+        outputsize: Union[str, int],
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch several symbols; returns fetch_ohlc results keyed by symbol."""
+        return {
+            symbol: self.fetch_ohlc(symbol=symbol, interval=interval, outputsize=outputsize)
+            for symbol in symbols
+        }
+
 
 def _fetch_market_data_from_api(
     symbol: str,
@@ -926,43 +1691,108 @@ def _fetch_market_data_from_api(
     return _api_request('GET', endpoint, params)
 
 
+def _fetch_market_data_batch_from_api(
+    symbols: List[str],
+    resolution: str,
+    from_ts: int,
+    to_ts: int
+) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Fetch candles for several symbols in one call to the centralized API.
+
+    The batch endpoint answers ``{"candles": {SYMBOL: {s, t, o, h, l, c, v}}}``.
+    Returns None when the API does not offer batching (404/405/501).
+    """
+    params = {
+        'symbols': ','.join(symbols),
+        'resolution': resolution,
+        'from': from_ts,
+        'to': to_ts
+    }
+    local_resolutions = {'D', 'W', 'M'}
+    should_use_local = USE_LOCAL_CANDLES and resolution in local_resolutions
+    endpoint = '/api/market-data/candles/local/batch' if should_use_local else '/api/market-data/candles/batch'
+    url = f"{API_BASE_URL}{endpoint}"
+    try:
+        response = _get_http_session().get(url, params=params, timeout=API_TIMEOUT)
+        if response.status_code in (404, 405, 501):
+            return None
+        response.raise_for_status()
+        return response.json().get('candles') or {}
+    except requests.exceptions.RequestException as e:
+        logger.error(f"API batch request failed: {e}")
+        raise ValueError(f"Failed to communicate with API: {str(e)}")
+
+
 def _fetch_metrics_from_api(symbol: str) -> Dict[str, Any]:
     """Fetch basic financials (metrics) from centralized API."""
     params = {'symbol': symbol}
     return _api_request('GET', '/api/market-data/metric', params)
 
 
+CANDLE_BATCH_SIZE = max(1, int(os.getenv('CANDLE_BATCH_SIZE', '100')))
+# Seconds before the batch candle endpoint is tried again once the API said it lacks it
+CANDLE_BATCH_RETRY_INTERVAL = float(os.getenv('CANDLE_BATCH_RETRY_INTERVAL', '3600'))
+
+
+# Regular US session; intraday bars only exist while the market is open
+TRADING_MINUTES_PER_DAY = 390
+# Session open (local HH:MM of the candle timestamps); resampled intraday
+# bars are aligned to it
+MARKET_SESSION_OPEN = os.getenv('MARKET_SESSION_OPEN', '09:30')
+MARKET_SESSION_OPEN_MINUTES = int(MARKET_SESSION_OPEN.split(':')[0]) * 60 + int(MARKET_SESSION_OPEN.split(':')[1])
+
+
+def _history_span(interval: str, bars: int) -> timedelta:
+    """Calendar span that holds at least ``bars`` bars of ``interval``."""
+    if interval == 'weekly':
+        return timedelta(weeks=bars + 1)
+    if interval == 'monthly':
+        return timedelta(days=31 * (bars + 1))
+    if interval.endswith('min'):
+        trading_days = math.ceil(bars * int(interval[:-3]) / TRADING_MINUTES_PER_DAY)
+    else:
+        trading_days = bars
+    # ~252 sessions a year, plus a week of slack for holidays at the edges
+    return timedelta(days=math.ceil(trading_days * 365 / 252) + 7)
+
+
 class FinnhubDataProvider(StockDataProvider):
     """Stock data provider backed by Finnhub via the centralized NestJS API."""
 
-    def fetch_ohlc(
-        self,
-        symbol: str,
-        interval: str = "daily",
-        outputsize: str = "compact",
-    ) -> Dict[str, Any]:
-        # Map interval to API/Finnhub resolution
-        resolution_map = {
-            'daily': 'D',
-            'weekly': 'W',
-            'monthly': 'M',
-            '1min': '1',
-            '5min': '5',
-            '15min': '15',
-            '30min': '30',
-            '60min': '60',
-        }
+    # monotonic time until which the batch endpoint is not tried
+    _batch_unavailable_until = 0.0
+
+    @property
+    def supports_batch(self) -> bool:
+        return time.monotonic() >= self._batch_unavailable_until
+
+    # Map interval to API/Finnhub resolution
+    resolution_map = {
+        'daily': 'D',
+        'weekly': 'W',
+        'monthly': 'M',
+        '1min': '1',
+        '5min': '5',
+        '15min': '15',
+        '30min': '30',
+        '60min': '60',
+    }
 
-        if interval not in resolution_map:
+    def _request_window(self, interval: str, outputsize: Union[str, int]) -> tuple:
+        """Return (resolution, from_ts, to_ts) for an interval/outputsize."""
+        if interval not in self.resolution_map:
             raise ValueError(f"Invalid interval: {interval}")
 
-        resolution = resolution_map[interval]
+        resolution = self.resolution_map[interval]
 
         # Calculate timestamps
         now = datetime.now()
         to_ts = int(now.timestamp())
 
-        if outputsize == 'compact':
+        if isinstance(outputsize, int):
+            # Exact bar count from the scan lookback planner
+            delta = _history_span(interval, outputsize)
+        elif outputsize == 'compact':
             # Approx 100 periods back
             if interval == 'daily':
                 delta = timedelta(days=150)  # ~100 trading days
@@ -987,23 +1817,23 @@ class FinnhubDataProvider(StockDataProvider):
             delta = timedelta(days=365 * 20)
 
         from_ts = int((now - delta).timestamp())
+        return resolution, from_ts, to_ts
 
-        try:
-            raw_data = _fetch_market_data_from_api(symbol, resolution, from_ts, to_ts)
-        except Exception as exc:
-            logger.error(f"Failed to fetch market data for {symbol}: {exc}")
-            # Return empty structure on failure to prevent crash
-            return {
-                'symbol': symbol,
-                'interval': interval,
-                'outputsize': outputsize,
-                'data_points': 0,
-                'data': [],
-                'last_updated': datetime.now().isoformat(),
-                'latest_price': None,
-            }
+    @staticmethod
+    def _empty_result(symbol: str, interval: str, outputsize: Union[str, int]) -> Dict[str, Any]:
+        return {
+            'symbol': symbol,
+            'interval': interval,
+            'outputsize': outputsize,
+            'data_points': 0,
+            'data': [],
+            'last_updated': datetime.now().isoformat(),
+            'latest_price': None,
+        }
 
-        # Parse Finnhub-style response {c, h, l, o, v, t, s}
+    @staticmethod
+    def _parse_candles(symbol: str, interval: str, outputsize: Union[str, int], raw_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a Finnhub-style {c, h, l, o, v, t, s} payload to OHLCV records."""
         if raw_data.get('s') != 'ok':
             logger.warning(f"No data returned for {symbol}: {raw_data.get('s')}")
             records: List[Dict[str, Any]] = []
@@ -1016,7 +1846,12 @@ class FinnhubDataProvider(StockDataProvider):
             closes = raw_data.get('c', [])
             volumes = raw_data.get('v', [])
 
-            for i in range(len(timestamps)):
+            start = 0
+            if isinstance(outputsize, int):
+                # The window is padded for holidays; keep exactly the bars asked for
+                start = max(len(timestamps) - outputsize, 0)
+
+            for i in range(start, len(timestamps)):
                 dt = datetime.fromtimestamp(timestamps[i])
                 records.append({
                     'date': dt.strftime('%Y-%m-%d %H:%M:%S') if 'min' in interval else dt.strftime('%Y-%m-%d'),
@@ -1027,7 +1862,7 @@ class FinnhubDataProvider(StockDataProvider):
                     'volume': int(volumes[i]),
                 })
 
-        result = {
+        return {
             'symbol': symbol,
             'interval': interval,
             'outputsize': outputsize,
@@ -1037,7 +1872,74 @@ class FinnhubDataProvider(StockDataProvider):
             'latest_price': records[-1]['close'] if records else None,
         }
 
-        return result
+    def fetch_ohlc(
+        self,
+        symbol: str,
+        interval: str = "daily",
+        outputsize: Union[str, int] = "compact",
+    ) -> Dict[str, Any]:
+        resolution, from_ts, to_ts = self._request_window(interval, outputsize)
+
+        try:
+            raw_data = _fetch_market_data_from_api(symbol, resolution, from_ts, to_ts)
+        except Exception as exc:
+            logger.error(f"Failed to fetch market data for {symbol}: {exc}")
+            # Return empty structure on failure to prevent crash
+            return self._empty_result(symbol, interval, outputsize)
+
+        return self._parse_candles(symbol, interval, outputsize, raw_data)
+
+    def fetch_ohlc_since(self, symbol: str, interval: str, since: int) -> Optional[List[Dict[str, Any]]]:
+        if interval not in self.resolution_map:
+            raise ValueError(f"Invalid interval: {interval}")
+        to_ts = int(datetime.now().timestamp())
+        raw_data = _fetch_market_data_from_api(symbol, self.resolution_map[interval], int(since), to_ts)
+        if raw_data.get('s') not in ('ok', 'no_data'):
+            raise ValueError(f"Delta fetch failed for {symbol}: {raw_data.get('s')}")
+        return self._parse_candles(symbol, interval, 'delta', raw_data)['data']
+
+    def fetch_ohlc_batch(
+        self,
+        symbols: List[str],
+        interval: str = "daily",
+        outputsize: Union[str, int] = "compact",
+    ) -> Dict[str, Dict[str, Any]]:
+        """Fetch symbols in chunks of CANDLE_BATCH_SIZE per API call.
+
+        A chunk whose batch call fails is fetched one request per symbol.
+        When the API does not support batching, every remaining symbol is,
+        and the batch endpoint is left alone for CANDLE_BATCH_RETRY_INTERVAL.
+        """
+        if not self.supports_batch:
+            return super().fetch_ohlc_batch(symbols, interval, outputsize)
+
+        resolution, from_ts, to_ts = self._request_window(interval, outputsize)
+        results: Dict[str, Dict[str, Any]] = {}
+
+        for start in range(0, len(symbols), CANDLE_BATCH_SIZE):
+            chunk = symbols[start:start + CANDLE_BATCH_SIZE]
+            try:
+                candles = _fetch_market_data_batch_from_api(chunk, resolution, from_ts, to_ts)
+            except Exception as exc:
+                logger.error(f"Failed to fetch market data batch ({len(chunk)} symbols), "
+                             f"fetching them one by one: {exc}")
+                results.update(super().fetch_ohlc_batch(chunk, interval, outputsize))
+                continue
+
+            if candles is None:
+                logger.info("Candle batch endpoint not available; falling back to per-symbol requests")
+                self._batch_unavailable_until = time.monotonic() + CANDLE_BATCH_RETRY_INTERVAL
+                results.update(super().fetch_ohlc_batch(symbols[start:], interval, outputsize))
+                break
+
+            for symbol in chunk:
+                raw_data = candles.get(symbol)
+                if raw_data is None:
+                    results[symbol] = self._empty_result(symbol, interval, outputsize)
+                else:
+                    results[symbol] = self._parse_candles(symbol, interval, outputsize, raw_data)
+
+        return results
 
 
 class MockDataProvider(StockDataProvider):
@@ -1047,7 +1949,7 @@ class MockDataProvider(StockDataProvider):
         self,
         symbol: str,
         interval: str = "daily",
-        outputsize: str = "compact",
+        outputsize: Union[str, int] = "compact",
     ) -> Dict[str, Any]:
         logger.info(f"Generating mock data for {symbol}")
         
@@ -1114,7 +2016,7 @@ def _fetch_stock_universe_from_api(exchange: str = None) -> List[Dict[str, Any]]
         logger.error(f"Failed to fetch stock universe: {e}")
         return []
 
-@mcp.tool()
+@_async_tool
 def fetch_stock_universe(exchange: str = "US") -> str:
     """
     Fetch the list of available stocks for a given exchange.
@@ -1126,20 +2028,21 @@ def fetch_stock_universe(exchange: str = "US") -> str:
     return json.dumps(symbols, indent=2)
 
 
-def _fetch_stock_data_core(
+def _mock_stock_data(symbol: str, interval: str, outputsize: Union[str, int]) -> Dict[str, Any]:
+    """MOCK_DATA_PROVIDER bars standing in for a failed provider fetch."""
+    return dict(MOCK_DATA_PROVIDER.fetch_ohlc(symbol=symbol, interval=interval, outputsize=outputsize), source='mock')
+
+
+def _fetch_stock_data_uncached(
     symbol: str,
     interval: str = "daily",
-    outputsize: str = "compact"
+    outputsize: Union[str, int] = "compact"
 ) -> Dict[str, Any]:
-    """Core logic for fetching stock data via the configured StockDataProvider."""
-
-    cache_key = f"stock:{symbol}:{interval}:{outputsize}"
-
-    # Check cache first
-    cached = get_from_cache(cache_key)
-    if cached:
-        return cached
+    """Fetch from the configured StockDataProvider, falling back to Mock (no caching).
 
+    Mock fallbacks are marked ``'source': 'mock'`` so they are never kept or
+    topped up like provider series.
+    """
     logger.info(f"Fetching {symbol} data - {interval} ({outputsize})")
 
     # Delegate to provider with fallback
@@ -1152,22 +2055,357 @@ def _fetch_stock_data_core(
              
     except Exception as e:
         logger.warning(f"Primary provider failed for {symbol}: {e}. Falling back to Mock.")
-        result = MOCK_DATA_PROVIDER.fetch_ohlc(symbol=symbol, interval=interval, outputsize=outputsize)
+        result = _mock_stock_data(symbol, interval, outputsize)
+
+    return result
+
+
+# Directory of the memory-mapped candle store filled by ingest_candles; empty disables it
+CANDLE_STORE_DIR = os.getenv('CANDLE_STORE_DIR', '')
+_candle_store_state: Dict[str, Any] = {'store': None}
+_candle_store_lock = threading.Lock()
+
+
+def _candle_store() -> Optional[Any]:
+    """The process's CandleStore, opened on first use; None when disabled."""
+    if not CANDLE_STORE_DIR:
+        return None
+    with _candle_store_lock:
+        if _candle_store_state['store'] is None:
+            _candle_store_state['store'] = candle_store.CandleStore(CANDLE_STORE_DIR)
+        return _candle_store_state['store']
+
+
+def _stored_stock_data(symbol: str, interval: str, outputsize: Union[str, int],
+                       as_columns: bool = False) -> Optional[Dict[str, Any]]:
+    """A stock data result sliced from the candle store, or None if it cannot serve the request.
+
+    ``columns`` are zero-copy views of the stored series; ``last_updated`` is
+    the series' last ingest, so the usual freshness check and delta refresh
+    apply. 'full' requests always go to the provider.
+    """
+    store = _candle_store()
+    if store is None or outputsize == 'full':
+        return None
+    bars = outputsize if isinstance(outputsize, int) else COMPACT_BARS
+    try:
+        info = store.info(interval, symbol)
+        if info is None or info['count'] < bars:
+            return None
+        columns = store.read(interval, symbol, bars=bars)
+    except Exception as e:
+        logger.warning(f"Candle store read failed for {symbol} {interval}: {e}")
+        return None
+    result = {
+        'symbol': symbol,
+        'interval': interval,
+        'outputsize': outputsize,
+        'data_points': bars,
+        'columns': columns,
+        'last_updated': datetime.fromtimestamp(info['updated']).isoformat(),
+        'latest_price': float(columns['close'][-1]),
+    }
+    if not as_columns:
+        result['data'] = _stock_data_records(result, interval)
+        del result['columns']
+    return result
+
+
+def _ingest_symbol_candles(symbol: str, interval: str, outputsize: Union[str, int], info: Optional[Dict[str, Any]]):
+    """Provider bars to append for one symbol: the delta since its last stored bar, else ``outputsize`` bars."""
+    records = None
+    if info is not None:
+        # Daily-or-coarser bars carry no time of day: start a day early and let the store dedupe
+        since = info['last_date'] if 'min' in interval else info['last_date'] - 86400
+        records = STOCK_DATA_PROVIDER.fetch_ohlc_since(symbol, interval, since)
+    if records is None:
+        records = STOCK_DATA_PROVIDER.fetch_ohlc(symbol=symbol, interval=interval, outputsize=outputsize).get('data') or []
+    return _records_to_columns(records)
+
+
+def _ingest_candles_core(symbols: List[str], interval: str = "daily",
+                         outputsize: Union[str, int] = "full") -> Dict[str, Any]:
+    """Fetch candles from the provider and append them to the candle store in one commit.
+
+    Unlike the scan fetch path there is no mock fallback: a symbol whose
+    fetch fails is reported and left as it was.
+    """
+    store = _candle_store()
+    if store is None:
+        raise ValueError("Candle store is disabled; set CANDLE_STORE_DIR")
+    symbols = list(dict.fromkeys(symbols))
+    with ThreadPoolExecutor(max_workers=max(1, SCAN_FETCH_CONCURRENCY), thread_name_prefix='ingest') as pool:
+        futures = {
+            symbol: pool.submit(_ingest_symbol_candles, symbol, interval, outputsize, store.info(interval, symbol))
+            for symbol in symbols
+        }
+    batches, failed = {}, {}
+    for symbol, future in futures.items():
+        try:
+            batches[symbol] = future.result()
+        except Exception as e:
+            logger.error(f"Candle ingest failed for {symbol} {interval}: {e}")
+            failed[symbol] = str(e)
+    written = store.append(interval, batches) if batches else 0
+    logger.info(f"Ingested {written} {interval} bars for {len(batches)} symbols")
+    return {
+        'interval': interval,
+        'symbols': len(batches),
+        'bars_written': written,
+        'failed': failed,
+    }
+
+
+def _is_fresh_stock_data(result: Dict[str, Any]) -> bool:
+    """True if a cached series was fetched less than CACHE_TTL['stock_data'] ago."""
+    try:
+        fetched_at = datetime.fromisoformat(result['last_updated'])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return datetime.now() - fetched_at < timedelta(seconds=CACHE_TTL['stock_data'])
+
+
+def _stock_data_records(result: Dict[str, Any], interval: str) -> List[Dict[str, Any]]:
+    """``data`` records of a stock data result, rebuilt from cached columns if needed."""
+    if 'columns' not in result:
+        return result.get('data') or []
+    columns = result['columns']
+    unit = 's' if 'min' in interval else 'D'
+    dates = np.datetime_as_string(columns['date'].astype(f'datetime64[{unit}]'))
+    dates = [d.replace('T', ' ') for d in dates.tolist()]
+    values = [columns[col].tolist() for col in OHLCV_COLUMNS]
+    return [
+        {'date': d, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+        for d, o, h, l, c, v in zip(dates, *values)
+    ]
+
+
+def _merge_bars(old: List[Dict[str, Any]], new: List[Dict[str, Any]], limit: Optional[int]) -> List[Dict[str, Any]]:
+    """Append ``new`` records to ``old``; new bars replace old ones from their first date on."""
+    if not new:
+        return old
+    first_new = str(new[0]['date'])
+    merged = [record for record in old if str(record['date']) < first_new] + new
+    return merged[-limit:] if limit else merged
+
+
+def _refresh_stock_data(
+    symbol: str,
+    interval: str,
+    outputsize: Union[str, int],
+    cached: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Bring a stale cached series up to date with a delta fetch.
+
+    Only bars from the cached series' last bar on are requested; they replace
+    that (possibly still forming) bar and extend the series, which keeps its
+    bar count unless ``outputsize`` is 'full'. Falls back to a full fetch
+    when the provider has no range fetch or the delta request fails, and for
+    mock fallbacks, whose bars must not be extended with real ones.
+    """
+    if cached.get('source') == 'mock':
+        return _fetch_stock_data_uncached(symbol, interval, outputsize)
+    old = _stock_data_records(cached, interval)
+    try:
+        if not old:
+            raise ValueError('no cached bars')
+        last = datetime.fromisoformat(str(old[-1]['date']))
+        # Daily-or-coarser dates have no time of day: start a day early and let the merge dedupe
+        since = last if 'min' in interval else last - timedelta(days=1)
+        new = STOCK_DATA_PROVIDER.fetch_ohlc_since(symbol, interval, int(since.timestamp()))
+    except Exception as e:
+        logger.warning(f"Delta fetch failed for {symbol} {interval}: {e}")
+        new = None
+    if new is None:
+        return _fetch_stock_data_uncached(symbol, interval, outputsize)
+
+    if isinstance(outputsize, int):
+        limit = outputsize
+    else:
+        limit = None if outputsize == 'full' else len(old)
+    records = _merge_bars(old, new, limit)
+    logger.info(f"Delta fetch {symbol} {interval}: {len(new)} bars since {old[-1]['date']}")
+    result = {key: value for key, value in cached.items() if key not in ('data', 'columns')}
+    result.update({
+        'data': records,
+        'data_points': len(records),
+        'last_updated': datetime.now().isoformat(),
+        'latest_price': records[-1]['close'] if records else None,
+    })
+    return result
+
+
+def _fetch_stock_data_core(
+    symbol: str,
+    interval: str = "daily",
+    outputsize: Union[str, int] = "compact",
+    as_columns: bool = False
+) -> Dict[str, Any]:
+    """Core logic for fetching stock data via the configured StockDataProvider.
+
+    With ``as_columns`` a binary cache hit is returned as NumPy ``columns``
+    instead of ``data`` records; fresh results always carry records. Redis
+    misses are served from the candle store when it holds the requested
+    bars. Cached series older than CACHE_TTL['stock_data'] are topped up
+    with the bars since their last one rather than downloaded again.
+    """
+
+    cache_key = f"stock:{symbol}:{interval}:{outputsize}"
+
+    # Check cache first
+    cached = get_stock_data_from_cache(cache_key, as_columns=as_columns)
+    if not cached:
+        cached = _stored_stock_data(symbol, interval, outputsize, as_columns)
+    if cached and _is_fresh_stock_data(cached):
+        _observe_daily_bars(symbol, interval, cached)
+        return cached
+
+    if cached:
+        result = _refresh_stock_data(symbol, interval, outputsize, cached)
+    else:
+        result = _fetch_stock_data_uncached(symbol, interval, outputsize)
+    _observe_daily_bars(symbol, interval, result)
 
     # Cache the result, guarding against unexpected shapes
     try:
-        set_in_cache(cache_key, result, CACHE_TTL['stock_data'])
+        set_stock_data_in_cache(cache_key, result, _stock_data_ttl(result))
     except Exception as exc:
         logger.error(f"Failed to cache stock data for {symbol}: {exc}")
 
     return result
 
 
-@mcp.tool()
+def _fetch_stock_data_batch_uncached(
+    symbols: List[str],
+    interval: str = "daily",
+    outputsize: Union[str, int] = "compact"
+) -> Dict[str, Dict[str, Any]]:
+    """Batched _fetch_stock_data_uncached: one provider call for all symbols."""
+    logger.info(f"Fetching {len(symbols)} symbols - {interval} ({outputsize}) in batch")
+    try:
+        fetched = STOCK_DATA_PROVIDER.fetch_ohlc_batch(symbols, interval, outputsize)
+    except Exception as e:
+        logger.warning(f"Primary provider batch failed: {e}. Falling back to Mock.")
+        fetched = {}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for symbol in symbols:
+        result = fetched.get(symbol)
+        if not result or not result.get('data'):
+            logger.warning(f"Primary provider returned no data for {symbol}. Falling back to Mock.")
+            result = _mock_stock_data(symbol, interval, outputsize)
+        results[symbol] = result
+    return results
+
+
+def _plan_fetch_jobs(requests_list: List[tuple], outputsize: Union[str, int]) -> List[tuple]:
+    """Group (symbol, interval) pairs into (pairs, batched, func, args) fetch jobs.
+
+    Providers with native batching get one job per CANDLE_BATCH_SIZE chunk of
+    symbols per interval; otherwise every pair is its own job.
+    """
+    if not STOCK_DATA_PROVIDER.supports_batch:
+        return [
+            ([(symbol, interval)], False, _fetch_stock_data_uncached, (symbol, interval, outputsize))
+            for symbol, interval in requests_list
+        ]
+
+    by_interval: Dict[str, List[str]] = {}
+    for symbol, interval in requests_list:
+        by_interval.setdefault(interval, []).append(symbol)
+
+    jobs = []
+    for interval, interval_symbols in by_interval.items():
+        for start in range(0, len(interval_symbols), CANDLE_BATCH_SIZE):
+            chunk = interval_symbols[start:start + CANDLE_BATCH_SIZE]
+            pairs = [(symbol, interval) for symbol in chunk]
+            jobs.append((pairs, True, _fetch_stock_data_batch_uncached, (chunk, interval, outputsize)))
+    return jobs
+
+
+async def _prefetch_stock_data_async(
+    requests_list: List[tuple],
+    outputsize: Union[str, int] = "compact",
+    concurrency: int = SCAN_FETCH_CONCURRENCY,
+) -> Dict[tuple, Any]:
+    """Fetch (symbol, interval) candles concurrently.
+
+    Cached pairs are read in bulk first (pipelined MGET), then Redis misses
+    from the candle store. The remaining misses are
+    fetched by jobs on a bounded worker pool sharing the pooled HTTP session,
+    stale entries are topped up with a delta fetch, and both are written back
+    with pipelined SETEX. Results are keyed by
+    (symbol, interval); a failed fetch maps to the exception it raised.
+    Binary cache hits come back as NumPy ``columns``.
+    """
+    unique_pairs = list(dict.fromkeys(requests_list))
+    keys = {pair: f"stock:{pair[0]}:{pair[1]}:{outputsize}" for pair in unique_pairs}
+    cached = get_many_stock_data_from_cache(list(keys.values()), as_columns=True)
+    for pair, key in keys.items():
+        if key not in cached:
+            stored = _stored_stock_data(pair[0], pair[1], outputsize, as_columns=True)
+            if stored is not None:
+                cached[key] = stored
+
+    fetched: Dict[tuple, Any] = {
+        pair: cached[key] for pair, key in keys.items() if key in cached and _is_fresh_stock_data(cached[key])
+    }
+    stale = {pair: cached[key] for pair, key in keys.items() if key in cached and pair not in fetched}
+    jobs = _plan_fetch_jobs([pair for pair in unique_pairs if pair not in fetched and pair not in stale], outputsize)
+    jobs += [
+        ([pair], False, _refresh_stock_data, (pair[0], pair[1], outputsize, entry))
+        for pair, entry in stale.items()
+    ]
+
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix='scan-fetch') as pool:
+        futures = [loop.run_in_executor(pool, func, *args) for _, _, func, args in jobs]
+        outcomes = await asyncio.gather(*futures, return_exceptions=True)
+
+    fresh: Dict[str, Dict[str, Any]] = {}
+    for (pairs, batched, _, _), outcome in zip(jobs, outcomes):
+        for symbol, interval in pairs:
+            if isinstance(outcome, BaseException):
+                fetched[(symbol, interval)] = outcome
+                continue
+            result = outcome[symbol] if batched else outcome
+            fetched[(symbol, interval)] = result
+            fresh[keys[(symbol, interval)]] = result
+
+    retained = {key: result for key, result in fresh.items() if _stock_data_ttl(result) == STOCK_SERIES_RETENTION}
+    set_many_stock_data_in_cache(retained, STOCK_SERIES_RETENTION)
+    set_many_stock_data_in_cache({key: result for key, result in fresh.items() if key not in retained},
+                                 CACHE_TTL['stock_data'])
+    for (symbol, interval), result in fetched.items():
+        _observe_daily_bars(symbol, interval, result)
+    return {pair: fetched[pair] for pair in requests_list}
+
+
+def _prefetch_stock_data(
+    requests_list: List[tuple],
+    outputsize: Union[str, int] = "compact",
+    concurrency: int = SCAN_FETCH_CONCURRENCY,
+) -> Dict[tuple, Any]:
+    """Synchronous entry point for _prefetch_stock_data_async.
+
+    Tools run on the tool executor's threads, where the fetch loop simply
+    runs with asyncio.run; callers already inside an event loop get it on a
+    helper thread instead of nesting asyncio.run.
+    """
+    coro = _prefetch_stock_data_async(requests_list, outputsize, concurrency)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as runner:
+        return runner.submit(asyncio.run, coro).result()
+
+
+@_async_tool
 def fetch_stock_data(
     symbol: str,
     interval: str = "daily",
-    outputsize: str = "compact"
+    outputsize: Union[str, int] = "compact"
 ) -> Dict[str, Any]:
     """
     Fetch historical stock price data from Alpha Vantage.
@@ -1175,7 +2413,8 @@ def fetch_stock_data(
     Args:
         symbol: Stock ticker symbol (e.g., 'AAPL', 'RELIANCE.BSE')
         interval: Time interval - 'daily', 'weekly', 'monthly', '1min', '5min', '15min', '30min', '60min'
-        outputsize: 'compact' (100 recent data points) or 'full' (20+ years of data)
+        outputsize: 'compact' (100 recent data points), 'full' (20+ years of data)
+            or a number of recent bars
     
     Returns:
         Dictionary containing:
@@ -1190,7 +2429,35 @@ def fetch_stock_data(
     return _fetch_stock_data_core(symbol, interval, outputsize)
 
 
-@mcp.tool()
+@_async_tool
+def ingest_candles(
+    symbols: List[str],
+    interval: str = "daily",
+    outputsize: Union[str, int] = "full"
+) -> Dict[str, Any]:
+    """
+    Append provider candles to the on-disk candle store (CANDLE_STORE_DIR).
+    
+    Args:
+        symbols: Stock ticker symbols to ingest
+        interval: Time interval - 'daily', 'weekly', 'monthly', '1min', '5min', '15min', '30min', '60min'
+        outputsize: History to load for symbols not stored yet; stored symbols
+            only fetch the bars since their last stored bar
+    
+    Returns:
+        Dictionary containing:
+        - interval: Time interval
+        - symbols: Number of symbols ingested
+        - bars_written: Bars appended (replaced forming bars included)
+        - failed: Error message per symbol that could not be fetched
+    
+    Example:
+        ingest_candles(["AAPL", "MSFT"], "daily")
+    """
+    return _ingest_candles_core(symbols, interval, outputsize)
+
+
+@_async_tool
 def get_technical_indicator(
     symbol: str,
     indicator: str,
@@ -1319,12 +2586,777 @@ def get_technical_indicator(
     return result
 
 
+# ============================================================================
+# COLUMNAR SCAN ENGINE
+# ============================================================================
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Indicators whose calculate_* functions work on wide frames (rolling/ewm/shift
+# or per-column kernels), so the panel path yields the per-symbol values.
+_PANEL_INDICATORS = {
+    'RSI', 'SMA', 'EMA', 'WMA', 'VWAP', 'ADX', 'STOCH', 'ATR', 'MAX', 'MIN', 'BB_WIDTH',
+    'SUPERTREND', 'PARABOLIC_SAR', 'SAR',
+}
+_PANEL_INDICATOR_PREFIXES = ('MACD', 'BBANDS', 'ICHIMOKU')
+
+_CROSSOVER_OPERATORS = {'crossed_above', 'crosses_above', 'crossed_below', 'crosses_below'}
+
+# Lambdas defer the NumPy lookup to call time (numpy is imported lazily)
+_VECTOR_OPERATORS = {
+    'gt': lambda current, compare: np.greater(current, compare),
+    '>': lambda current, compare: np.greater(current, compare),
+    'gte': lambda current, compare: np.greater_equal(current, compare),
+    '>=': lambda current, compare: np.greater_equal(current, compare),
+    'lt': lambda current, compare: np.less(current, compare),
+    '<': lambda current, compare: np.less(current, compare),
+    'lte': lambda current, compare: np.less_equal(current, compare),
+    '<=': lambda current, compare: np.less_equal(current, compare),
+    'eq': lambda current, compare: np.abs(current - compare) < 0.01,
+    '==': lambda current, compare: np.abs(current - compare) < 0.01,
+}
+
+
+def _records_to_frame(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Build the date-indexed OHLCV DataFrame used by filters from provider records."""
+    df = pd.DataFrame(records)
+    df['date'] = pd.to_datetime(df['date'])
+    return df.set_index('date').sort_index()
+
+
+def _cached_columns_to_frame(cached: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """_records_to_frame for ohlcv_codec columns (no per-row objects)."""
+    df = pd.DataFrame({col: cached[col] for col in OHLCV_COLUMNS}, index=pd.DatetimeIndex(cached['date'], name='date'))
+    return df.sort_index()
+
+
+def _scan_data_to_frame(data: Any) -> pd.DataFrame:
+    """Frame for fetched scan data: provider records or decoded cache columns."""
+    if isinstance(data, dict):
+        return _cached_columns_to_frame(data)
+    return _records_to_frame(data)
+
+
+def _records_to_columns(records: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Convert provider records into sorted NumPy columns (plus a 'date' column).
+
+    Raises KeyError when a record lacks one of the OHLCV fields, mirroring the
+    failure of building a DataFrame column that does not exist.
+    """
+    dates = pd.to_datetime([r['date'] for r in records]).to_numpy()
+    columns = {
+        col: np.array([r[col] for r in records], dtype='float64')
+        for col in OHLCV_COLUMNS
+    }
+    return _sort_columns(dates, columns)
+
+
+def _sort_columns(dates: np.ndarray, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Order OHLCV columns by date (stable) and add the 'date' column."""
+    if len(dates) > 1 and not (dates[1:] >= dates[:-1]).all():
+        order = np.argsort(dates, kind='stable')
+        dates = dates[order]
+        columns = {col: arr[order] for col, arr in columns.items()}
+    columns['date'] = dates
+    return columns
+
+
+def _cached_columns_to_scan_columns(cached: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Adapt ohlcv_codec columns to the float64 layout of _records_to_columns."""
+    columns = {col: cached[col].astype('float64') for col in OHLCV_COLUMNS}
+    return _sort_columns(cached['date'], columns)
+
+
+def _panel_supports_indicator(field: Any, time_period: Any) -> bool:
+    """Return True if an indicator field can be computed on a wide panel frame."""
+    if not isinstance(field, str):
+        return False
+    if field in OHLCV_COLUMNS:
+        return True
+    field_upper, _ = _resolve_indicator_field(field, time_period)
+    return field_upper in _PANEL_INDICATORS or field_upper.startswith(_PANEL_INDICATOR_PREFIXES)
+
+
+class _OHLCVPanel:
+    """Equal-length OHLCV series of many symbols stacked into 2-D arrays.
+
+    Columns are stored bars x symbols so pandas rolling/ewm kernels run down
+    each symbol's history in one call. ``frame`` exposes them as a wide
+    DataFrame whose ``frame['close']`` is itself a bars x symbols frame, which
+    lets the existing calculate_* functions evaluate every symbol at once.
+    Symbols are bucketed by bar count, so no padding is involved and every
+    indicator sees exactly the bars it would see per symbol.
+    """
+
+    __slots__ = ('timeframe', 'positions', 'columns', 'n_bars', 'frame', 'data_frames')
+
+    def __init__(self, timeframe: str, positions: List[int], columns: List[Dict[str, np.ndarray]]):
+        self.timeframe = timeframe
+        self.positions = positions
+        self.columns = columns
+        self.n_bars = len(columns[0]['close'])
+        self.frame = pd.concat(
+            {col: pd.DataFrame(np.column_stack([c[col] for c in columns])) for col in OHLCV_COLUMNS},
+            axis=1,
+        )
+        # One data_frames dict per panel, so shared AST subtrees compute once per panel
+        self.data_frames = {timeframe: self.frame}
+
+
+def _build_panels(timeframe: str, columns_by_position: Dict[int, Dict[str, np.ndarray]]) -> List[_OHLCVPanel]:
+    """Bucket symbols of one timeframe by bar count and stack each bucket."""
+    buckets: Dict[int, List[int]] = {}
+    for pos, cols in columns_by_position.items():
+        buckets.setdefault(len(cols['close']), []).append(pos)
+    return [
+        _OHLCVPanel(timeframe, positions, [columns_by_position[p] for p in positions])
+        for n_bars, positions in sorted(buckets.items())
+        if n_bars > 0
+    ]
+
+
+def _apply_arithmetic(compare_value: Any, filter_config: Dict[str, Any]) -> Any:
+    """Apply the optional arithmeticOperator/arithmeticValue to a compare value."""
+    if 'arithmeticOperator' in filter_config and 'arithmeticValue' in filter_config:
+        op = filter_config['arithmeticOperator']
+        val = float(filter_config['arithmeticValue'])
+        if op == '+': compare_value = compare_value + val
+        elif op == '-': compare_value = compare_value - val
+        elif op == '*': compare_value = compare_value * val
+        elif op == '/':
+            if val == 0:
+                raise ZeroDivisionError("float division by zero")
+            compare_value = compare_value / val
+    return compare_value
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _evaluate_filter_columnar(panel: _OHLCVPanel, filter_config: Dict[str, Any],
+                              spec: Optional[_FilterSpec] = None) -> Optional[List[tuple]]:
+    """Evaluate one filter for every symbol of a panel at once.
+
+    Mirrors the generic comparison path of evaluate_single_filter and returns
+    one (passed, details) tuple per panel symbol. Returns None when the filter
+    uses a feature the columnar path does not cover (measure dicts,
+    cross-timeframe RHS, string values, ...); callers then fall back to
+    evaluate_single_filter for those symbols. ``spec`` is the compiled filter
+    from the scan plan; it is compiled here when omitted.
+    """
+    if spec is None:
+        spec = _compile_filter(filter_config)
+    if spec.expression:
+        return _evaluate_expression_columnar(panel, spec)
+
+    filter_type = spec.filter_type
+    offset = spec.offset
+    idx = spec.idx
+    prev_idx = spec.prev_idx
+    field = spec.field
+    operator = spec.operator
+    value = spec.value
+    time_period = spec.time_period
+    is_crossover = spec.is_crossover
+
+    if filter_type == 'price_52week':
+        return None
+    if spec.vector_operator is None and operator != 'between' and not is_crossover:
+        return None
+    if offset < 0 or panel.n_bars < offset + (2 if is_crossover else 1):
+        return None
+
+    frame = panel.frame
+
+    # LHS series (bars x symbols)
+    if filter_type == 'indicator':
+        if not _panel_supports_indicator(field, time_period):
+            return None
+        lhs = _get_indicator_series(frame, field, time_period, params=filter_config)
+    elif field in OHLCV_COLUMNS:
+        lhs = frame[field]
+    elif filter_type == 'price' and not is_crossover and _panel_supports_indicator(field, time_period):
+        lhs = _get_indicator_series(frame, field, time_period, params=filter_config)
+    else:
+        return None
+    current = lhs.iloc[idx].to_numpy(dtype='float64')
+
+    # RHS: static scalar or same-timeframe indicator
+    rhs = None
+    if isinstance(value, dict):
+        if value.get('type') != 'indicator':
+            return None
+        if value.get('timeframe', panel.timeframe) != panel.timeframe:
+            return None
+        rhs_offset = value.get('offset', offset)
+        rhs_field = value.get('field')
+        rhs_period = value.get('time_period', 14)
+        if not isinstance(rhs_offset, int) or not _panel_supports_indicator(rhs_field, rhs_period):
+            return None
+        rhs_idx = -(rhs_offset + 1)
+        if not -panel.n_bars <= rhs_idx < panel.n_bars:
+            return None
+        rhs = _get_indicator_series(frame, rhs_field, rhs_period, params=value)
+        compare = _apply_arithmetic(rhs.iloc[rhs_idx].to_numpy(dtype='float64'), filter_config)
+    elif 'compareToMeasure' in filter_config:
+        return None
+    else:
+        compare = value
+        if operator == 'between':
+            if isinstance(compare, (list, tuple)) and len(compare) == 2 and not all(_is_number(v) for v in compare):
+                return None
+        elif not _is_number(compare):
+            return None
+        compare = _apply_arithmetic(compare, filter_config)
+
+    notes = None
+    if is_crossover:
+        previous = lhs.iloc[prev_idx].to_numpy(dtype='float64')
+        previous_compare = rhs.iloc[prev_idx].to_numpy(dtype='float64') if rhs is not None else compare
+        static = previous == current
+        if operator in ('crossed_above', 'crosses_above'):
+            static_passed = current > compare
+            passed = np.where(static, static_passed, static_passed & (previous <= previous_compare))
+            note = 'Static data detected, fell back to >'
+        else:
+            static_passed = current < compare
+            passed = np.where(static, static_passed, static_passed & (previous >= previous_compare))
+            note = 'Static data detected, fell back to <'
+        notes = [note if s else None for s in static]
+    elif operator == 'between':
+        if isinstance(compare, (list, tuple)) and len(compare) == 2:
+            passed = (compare[0] <= current) & (current <= compare[1])
+        else:
+            passed = np.zeros(len(current), dtype=bool)
+    else:
+        passed = spec.vector_operator(current, compare)
+
+    passed = np.broadcast_to(passed, current.shape)
+    compare_is_array = isinstance(compare, np.ndarray)
+    results = []
+    for i in range(len(current)):
+        detail = {
+            'type': filter_type,
+            'field': field,
+            'current_value': float(current[i]),
+            'compare_value': float(compare[i]) if compare_is_array else compare,
+            'operator': operator,
+            'passed': bool(passed[i]),
+        }
+        if notes is not None and notes[i] is not None:
+            detail['note'] = notes[i]
+        results.append((detail['passed'], detail))
+    return results
+
+
+def _evaluate_expression_columnar(panel: _OHLCVPanel, spec: _FilterSpec) -> Optional[List[tuple]]:
+    """Evaluate a compiled AST expression filter for every symbol of a panel.
+
+    Only expressions whose nodes all read the panel's own timeframe and OHLCV
+    or panel-capable indicators qualify; anything else returns None.
+    """
+    if spec.compiled_expression is None or not _ast_supports_panel(spec.expression, panel.timeframe):
+        return None
+    if spec.idx >= 0:
+        return None
+    values = spec.compiled_expression(panel.data_frames)
+    if values.ndim == 0:
+        latest = np.full(len(panel.positions), float(values))
+    elif values.ndim == 2 and spec.idx >= -values.shape[0]:
+        latest = values[spec.idx]
+    else:
+        return None
+
+    results = []
+    for value in latest.tolist():
+        passed = bool(value)
+        results.append((passed, {
+            'type': 'expression',
+            'expression': spec.expression,
+            'result': value,
+            'passed': passed,
+        }))
+    return results
+
+
+def _collect_timeframes_from_ast(node: Any, timeframes: set) -> None:
+    """Add every timeframe referenced by an AST expression node to ``timeframes``."""
+    if not isinstance(node, dict):
+        return
+    tf = node.get('timeframe')
+    if isinstance(tf, str) and tf:
+        timeframes.add(tf)
+    node_type = node.get('type')
+    if node_type == 'binary':
+        _collect_timeframes_from_ast(node.get('left'), timeframes)
+        _collect_timeframes_from_ast(node.get('right'), timeframes)
+        return
+    if node_type == 'unary':
+        _collect_timeframes_from_ast(node.get('operand'), timeframes)
+        return
+    if node_type == 'function':
+        args = node.get('args') or []
+        for arg in args:
+            _collect_timeframes_from_ast(arg, timeframes)
+        return
+    if node_type == 'attribute':
+        field = node.get('field')
+        if isinstance(field, dict):
+            _collect_timeframes_from_ast(field, timeframes)
+        return
+
+
+# Common financial fields that might be requested
+FINANCIAL_FIELD_MAP = {
+    'marketCap': 'marketCapitalization',
+    'pe_ratio': 'peBasicExclExtraTTM',
+    'peRatio': 'peBasicExclExtraTTM',
+    'pb_ratio': 'pbQuarterly',
+    'eps': 'epsExclExtraTTM',
+    'dividend_yield': 'dividendYieldIndicatedAnnual',
+    'beta': 'beta',
+    'current_ratio': 'currentRatioQuarterly',
+    'debt_to_equity': 'totalDebtToEquityQuarterly',
+    'roe': 'roeTTM',
+    'net_sales': 'revenueTTM',
+    'net_profit': 'netIncomeTTM',
+    # Finnhub 'metric' has 'operatingCashFlowTTM'.
+    'operating_cash_flow': 'operatingCashFlowTTM',
+    'book_value': 'bookValuePerShareAnnual',
+    'bookValue': 'bookValuePerShareAnnual',
+}
+
+
+class _FilterSpec(NamedTuple):
+    """One filter config with everything that does not depend on the symbol resolved."""
+    config: Dict[str, Any]
+    filter_type: str
+    expression: Any
+    timeframe: str
+    offset: int
+    idx: int
+    prev_idx: int
+    field: Any
+    operator: Any
+    value: Any
+    time_period: Any
+    is_crossover: bool
+    condition: Callable[..., bool]  # pre-bound evaluate_condition predicate
+    vector_operator: Optional[Callable[[Any, Any], Any]]  # _VECTOR_OPERATORS entry, if any
+    lookback: int  # bars back from the latest bar the filter reads
+    compiled_expression: Optional[Callable[[Dict[str, pd.DataFrame]], np.ndarray]]  # compile_ast of expression
+    timeframes: Tuple[str, ...]  # every timeframe the filter reads
+    needs_metrics: bool  # reads a non-OHLCV field that comes from the metrics API
+    cost: float  # estimated per-symbol evaluation cost, fetches included
+    pass_rate: float  # estimated fraction of symbols that pass
+    history: Tuple[Tuple[str, Optional[int]], ...]  # timeframe -> bars needed (None: whole window)
+
+
+class _ScanPlan(NamedTuple):
+    """Compiled form of a scan's filters, built once per scan and shared by all symbols."""
+    filters: Tuple[_FilterSpec, ...]
+    timeframes: Tuple[str, ...]  # 'daily' first, then in order of first use
+    needed_fields: FrozenSet[str]
+    metric_sources: Tuple[Tuple[str, Tuple[str, ...]], ...]  # field -> metric keys to try, in order
+    lookbacks: Tuple[Tuple[str, int], ...]  # timeframe -> deepest lookback of its filters
+    logic: str
+    order: Tuple[int, ...]  # filter indices, cheapest and most decisive first
+    outputsizes: Tuple[Tuple[str, Any], ...]  # fetched timeframe -> outputsize ('compact' or bar count)
+    resampled: Tuple[Tuple[str, str], ...]  # timeframe -> finer timeframe its bars are built from
+
+
+# Rough per-symbol cost units for filter ordering: an OHLCV comparison is 1,
+# fetching another timeframe or the metrics API dwarfs any calculation.
+SCAN_FETCH_COST = 50.0
+SCAN_METRICS_COST = 100.0
+_ITERATIVE_INDICATORS = {'SUPERTREND', 'PARABOLIC_SAR', 'SAR', 'ADX'}
+
+# Estimated share of symbols passing each operator
+_OPERATOR_PASS_RATES = {
+    'eq': 0.1, '==': 0.1,
+    'crossed_above': 0.1, 'crosses_above': 0.1, 'crossed_below': 0.1, 'crosses_below': 0.1,
+    'between': 0.3,
+}
+
+
+def _indicator_cost(field: Any, time_period: Any) -> float:
+    if not isinstance(field, str) or field in OHLCV_COLUMNS:
+        return 1.0
+    try:
+        field_upper, _ = _resolve_indicator_field(field, time_period)
+    except (AttributeError, TypeError):
+        return 4.0
+    if field_upper in _ITERATIVE_INDICATORS or field_upper.startswith('ICHIMOKU'):
+        return 8.0
+    return 4.0
+
+
+def _expression_cost(node: Any) -> float:
+    if not isinstance(node, dict):
+        return 0.0
+    node_type = node.get('type')
+    if node_type == 'attribute':
+        field = node.get('field')
+        return _expression_cost(field) if isinstance(field, dict) else 1.0
+    if node_type == 'indicator':
+        return _indicator_cost(node.get('field'), node.get('time_period', 14))
+    children = [node.get('left'), node.get('right'), node.get('operand')]
+    if isinstance(node.get('args'), list):
+        children.extend(node['args'])
+    return 0.5 + sum(_expression_cost(child) for child in children)
+
+
+def _estimate_filter_cost(filter_config: Dict[str, Any], filter_type: str, is_crossover: bool,
+                          needs_metrics: bool, timeframes: Tuple[str, ...]) -> float:
+    """Estimated per-symbol cost of a filter, used only to order evaluation."""
+    if filter_config.get('expression'):
+        cost = _expression_cost(filter_config['expression'])
+    elif filter_type == 'financial':
+        cost = SCAN_METRICS_COST
+    elif filter_type in ('indicator', 'price'):
+        cost = _indicator_cost(filter_config.get('field', 'close'), filter_config.get('time_period', 14))
+    else:
+        cost = 2.0
+    value = filter_config.get('value')
+    if isinstance(value, dict) and value.get('type') == 'indicator':
+        cost += _indicator_cost(value.get('field'), value.get('time_period', 14))
+    if is_crossover:
+        cost += 1.0
+    if needs_metrics:
+        cost += SCAN_METRICS_COST
+    # Weekly/monthly bars are resampled from the daily bars every scan loads
+    cost += sum(2.0 if tf in ('weekly', 'monthly') else SCAN_FETCH_COST for tf in timeframes if tf != 'daily')
+    return cost
+
+
+# Weight the seed of a recursive average (EMA, Wilder) may still carry at the
+# evaluated bar; warm-up is sized so the seed's influence decays below it.
+SCAN_WARMUP_TOLERANCE = float(os.getenv('SCAN_WARMUP_TOLERANCE', '0.001'))
+# Path-dependent indicators without a closed-form horizon
+SCAN_PATH_WARMUP = int(os.getenv('SCAN_PATH_WARMUP', '100'))
+# Bars the 'compact' window holds; smaller plans keep sharing its cache entries
+COMPACT_BARS = 100
+
+
+def _smoothing_horizon(alpha: float) -> int:
+    """Bars until a recursive average with factor ``alpha`` forgets its seed."""
+    if alpha >= 1:
+        return 1
+    return int(math.ceil(math.log(SCAN_WARMUP_TOLERANCE) / math.log(1.0 - alpha)))
+
+
+def _indicator_warmup(field_upper: str, time_period: Any, params: Dict[str, Any]) -> Optional[int]:
+    """Bars an indicator needs before its latest value is settled.
+
+    None means the value depends on the whole loaded window (VWAP), so no
+    finite history reproduces it.
+    """
+    period = max(int(time_period or 1), 1)
+    if field_upper in ('SMA', 'WMA', 'MAX', 'MIN') or field_upper.startswith('BBANDS') or field_upper.startswith('BB_'):
+        return period
+    if field_upper == 'EMA':
+        return _smoothing_horizon(2.0 / (period + 1))
+    if field_upper in ('RSI', 'ATR'):
+        return 1 + max(period, _smoothing_horizon(1.0 / period))
+    if field_upper == 'ADX':
+        return 1 + 2 * _smoothing_horizon(1.0 / period)
+    if field_upper == 'STOCH':
+        return period + 2
+    if field_upper == 'SUPERTREND':
+        return 1 + _smoothing_horizon(1.0 / period) + SCAN_PATH_WARMUP
+    if field_upper.startswith('MACD'):
+        slow = _smoothing_horizon(2.0 / (int(params.get('slow', 26)) + 1))
+        if field_upper == 'MACD':
+            return slow
+        return slow + _smoothing_horizon(2.0 / (int(params.get('signal', 9)) + 1))
+    if field_upper in ('PARABOLIC_SAR', 'SAR'):
+        return SCAN_PATH_WARMUP
+    if field_upper.startswith('ICHIMOKU'):
+        fast = int(params.get('period_fast', 9))
+        med = int(params.get('period_med', 26))
+        slow = int(params.get('period_slow', 52))
+        if 'SENKOU_A' in field_upper:
+            return med + max(fast, med)
+        if 'SENKOU_B' in field_upper:
+            return med + slow
+        if 'KIJUN' in field_upper:
+            return med
+        if 'CHIKOU' in field_upper:
+            return 1
+        return fast
+    if field_upper in ('VWAP', 'OBV'):
+        return None
+    return 1
+
+
+def _field_warmup(field: Any, time_period: Any, params: Dict[str, Any]) -> Optional[int]:
+    """_indicator_warmup for a raw field name; OHLCV and metric fields need one bar."""
+    if not isinstance(field, str) or field in OHLCV_COLUMNS:
+        return 1
+    try:
+        field_upper, time_period = _resolve_indicator_field(field, time_period)
+        return _indicator_warmup(field_upper, time_period, params)
+    except (AttributeError, TypeError, ValueError):
+        return 1
+
+
+def _add_history(history: Dict[str, Optional[int]], timeframe: str, bars: Optional[int]) -> None:
+    if bars is None or history.get(timeframe, 0) is None:
+        history[timeframe] = None
+    else:
+        history[timeframe] = max(history.get(timeframe, 0), bars)
+
+
+def _ast_history(node: Any, shift: int, timeframe: str, history: Dict[str, Optional[int]]) -> None:
+    """Add the bars each timeframe must hold for ``node`` read ``shift`` bars back."""
+    if not isinstance(node, dict):
+        return
+    node_type = node.get('type')
+    try:
+        shift += max(int(node.get('offset', 0)), 0)
+    except (TypeError, ValueError):
+        pass
+    node_timeframe = node.get('timeframe', timeframe)
+    if node_type == 'attribute':
+        field = node.get('field')
+        if isinstance(field, dict):
+            _ast_history(field, shift, node_timeframe, history)
+        else:
+            _add_history(history, node_timeframe, shift + 1)
+    elif node_type == 'indicator':
+        warmup = _field_warmup(node.get('field'), node.get('time_period', 14), node)
+        _add_history(history, node_timeframe, None if warmup is None else shift + warmup)
+    elif node_type == 'binary':
+        if node.get('operator') in _CROSSOVER_OPERATORS:
+            shift += 1
+        _ast_history(node.get('left'), shift, timeframe, history)
+        _ast_history(node.get('right'), shift, timeframe, history)
+    elif node_type == 'unary':
+        _ast_history(node.get('operand'), shift, timeframe, history)
+    elif node_type == 'function':
+        for arg in node.get('args') or []:
+            _ast_history(arg, shift, timeframe, history)
+
+
+def _filter_history(filter_config: Dict[str, Any], filter_type: str, offset: int, lookback: int,
+                    timeframe: str) -> Dict[str, Optional[int]]:
+    """Minimum bars per timeframe a filter reads: warm-up plus offsets and crossovers."""
+    history: Dict[str, Optional[int]] = {timeframe: lookback}
+    if filter_config.get('expression'):
+        _ast_history(filter_config['expression'], offset, timeframe, history)
+        return history
+
+    shift = lookback - 1
+    time_period = filter_config.get('time_period', 14)
+    if filter_type in ('indicator', 'price'):
+        warmup = _field_warmup(filter_config.get('field', 'close'), time_period, filter_config)
+        _add_history(history, timeframe, None if warmup is None else shift + warmup)
+    elif filter_type == 'volume':
+        try:
+            _add_history(history, timeframe, shift + int(filter_config.get('avg_period', 20)))
+        except (TypeError, ValueError):
+            pass
+    elif filter_type == 'price_52week':
+        try:
+            _add_history(history, 'daily', int(filter_config.get('lookback_days', 252)))
+        except (TypeError, ValueError):
+            pass
+    elif filter_type == 'function':
+        _add_history(history, timeframe, shift + 20)
+    elif filter_type in ('gap', 'pattern'):
+        _add_history(history, timeframe, shift + 3)
+
+    value = filter_config.get('value')
+    if isinstance(value, dict) and value.get('type') == 'indicator':
+        warmup = _field_warmup(value.get('field'), value.get('time_period', 14), value)
+        _add_history(history, value.get('timeframe', timeframe), None if warmup is None else shift + warmup)
+    return history
+
+
+def _compile_filter(filter_config: Dict[str, Any], interned: Optional[Dict[str, Any]] = None,
+                    memo: Optional[Dict[str, Callable]] = None) -> _FilterSpec:
+    """Resolve the offsets, defaults and operator functions of one filter config.
+
+    ``interned``/``memo`` are the scan-wide optimize_ast and compile_ast
+    tables, shared so expressions of different filters reuse subtrees.
+    """
+    filter_type = filter_config.get('type', 'price')
+    offset = _parse_offset(filter_config.get('offset', 0))
+    operator = filter_config.get('operator', 'gt')
+    is_string_operator = isinstance(operator, str)
+    is_crossover = is_string_operator and operator in _CROSSOVER_OPERATORS
+
+    lookback = offset + (2 if is_crossover else 1)
+    if filter_type in ('price_change', 'volume_change'):
+        try:
+            lookback = offset + int(filter_config.get('lookback', 1)) + 1
+        except (TypeError, ValueError):
+            pass
+
+    timeframe = filter_config.get('timeframe', 'daily')
+    timeframes = {timeframe: None}
+    if 'compareToTimeframe' in filter_config:
+        timeframes.setdefault(filter_config['compareToTimeframe'])
+    value = filter_config.get('value')
+    if isinstance(value, dict) and 'timeframe' in value:
+        timeframes.setdefault(value['timeframe'])
+    if isinstance(filter_config.get('expression'), dict):
+        ast_timeframes = set()
+        _collect_timeframes_from_ast(filter_config['expression'], ast_timeframes)
+        for tf in sorted(ast_timeframes):
+            timeframes.setdefault(tf)
+
+    field = filter_config.get('field', 'close')
+    # Non-OHLCV fields of plain comparisons are filled in from the metrics API
+    needs_metrics = (
+        'field' in filter_config and isinstance(field, str) and field not in OHLCV_COLUMNS
+        and filter_type not in ('indicator', 'financial') and not filter_config.get('expression')
+    )
+
+    cost = _estimate_filter_cost(filter_config, filter_type, is_crossover, needs_metrics, tuple(timeframes))
+
+    return _FilterSpec(
+        config=filter_config,
+        filter_type=filter_type,
+        expression=filter_config.get('expression'),
+        timeframe=filter_config.get('timeframe', 'daily'),
+        offset=offset,
+        idx=-(offset + 1),
+        prev_idx=-(offset + 2),
+        field=filter_config.get('field', 'close'),
+        operator=operator,
+        value=filter_config.get('value'),
+        time_period=filter_config.get('time_period', 14),
+        is_crossover=is_crossover,
+        condition=_bind_condition(operator),
+        vector_operator=_VECTOR_OPERATORS.get(operator) if is_string_operator else None,
+        lookback=lookback,
+        compiled_expression=_try_compile_ast(filter_config.get('expression'), interned, memo),
+        timeframes=tuple(timeframes),
+        needs_metrics=needs_metrics,
+        cost=cost,
+        pass_rate=_OPERATOR_PASS_RATES.get(operator, 0.5) if is_string_operator else 0.5,
+        history=tuple(_filter_history(filter_config, filter_type, offset, lookback, timeframe).items()),
+    )
+
+
+def _resample_sources(timeframes: Any) -> Dict[str, str]:
+    """Map each timeframe that can be built from a finer one in ``timeframes`` to it.
+
+    Weekly and monthly come from daily (always fetched); intraday timeframes
+    come from the finest intraday timeframe when its minutes divide theirs.
+    """
+    sources = {tf: 'daily' for tf in timeframes if tf in ('weekly', 'monthly')}
+    intraday = sorted((ohlcv_resample.INTERVAL_MINUTES[tf], tf) for tf in timeframes
+                      if tf in ohlcv_resample.INTERVAL_MINUTES)
+    if intraday:
+        base = intraday[0][1]
+        for _, tf in intraday[1:]:
+            if ohlcv_resample.can_resample(base, tf):
+                sources[tf] = base
+    return sources
+
+
+def _compile_scan_plan(filters: List[Dict[str, Any]], filter_logic: str = "AND") -> _ScanPlan:
+    """Compile a scan's filters once, before any symbol is fetched or evaluated."""
+    interned: Dict[str, Any] = {}
+    memo: Dict[str, Callable] = {}
+    specs = tuple(_compile_filter(f, interned, memo) for f in filters)
+
+    # --- MULTI-TIMEFRAME SUPPORT ---
+    timeframes = {'daily': None}  # Always fetch daily for basic checks/enrichment
+    for f in filters:
+        timeframes.setdefault(f.get('timeframe', 'daily'))
+        # Also check compareToTimeframe
+        if 'compareToTimeframe' in f:
+            timeframes.setdefault(f['compareToTimeframe'])
+        if isinstance(f.get('value'), dict) and 'timeframe' in f['value']:
+            timeframes.setdefault(f['value']['timeframe'])
+        if isinstance(f.get('expression'), dict):
+            ast_timeframes = set()
+            _collect_timeframes_from_ast(f['expression'], ast_timeframes)
+            for tf in sorted(ast_timeframes):
+                timeframes.setdefault(tf)
+
+    # Fields required by filters that may be missing in OHLCV
+    needed_fields = frozenset(f['field'] for f in filters if 'field' in f)
+    metric_sources = tuple(
+        (field, (FINANCIAL_FIELD_MAP[field], field) if field in FINANCIAL_FIELD_MAP else (field,))
+        for field in sorted(needed_fields, key=str)
+    )
+
+    lookbacks: Dict[str, int] = {}
+    for spec in specs:
+        lookbacks[spec.timeframe] = max(lookbacks.get(spec.timeframe, 0), spec.lookback)
+
+    logic = filter_logic.upper() if filter_logic.upper() in ('AND', 'OR') else 'AND'
+    # Classic predicate ordering: cost per symbol the filter settles. Under AND
+    # a failing filter settles the symbol, under OR a passing one does.
+    if logic == 'AND':
+        rank = [spec.cost / max(1.0 - spec.pass_rate, 0.01) for spec in specs]
+    else:
+        rank = [spec.cost / max(spec.pass_rate, 0.01) for spec in specs]
+    order = tuple(sorted(range(len(specs)), key=lambda j: (rank[j], j)))
+
+    # Lookback planner: fetch each timeframe once, deep enough for every filter.
+    # The compact window stays the floor so small scans share cache entries
+    # with fetch_stock_data; window-dependent indicators (VWAP) keep it too.
+    history: Dict[str, Optional[int]] = {}
+    for spec in specs:
+        for tf, bars in spec.history:
+            _add_history(history, tf, bars)
+
+    # Only the finest timeframes are fetched; coarser ones are resampled
+    # locally, so their history is requested in base bars instead.
+    resampled = _resample_sources(timeframes)
+    for tf, base in resampled.items():
+        bars = history.get(tf) or COMPACT_BARS
+        _add_history(history, base, (bars + 1) * ohlcv_resample.bars_per_bar(base, tf))
+    outputsizes = tuple(
+        (tf, history[tf] if history.get(tf) and history[tf] > COMPACT_BARS else 'compact')
+        for tf in timeframes if tf not in resampled
+    )
+
+    return _ScanPlan(
+        filters=specs,
+        timeframes=tuple(timeframes),
+        needed_fields=needed_fields,
+        metric_sources=metric_sources,
+        lookbacks=tuple(lookbacks.items()),
+        logic=logic,
+        order=order,
+        outputsizes=outputsizes,
+        resampled=tuple(resampled.items()),
+    )
+
+
 def _scan_stocks_core(
     symbols: List[str],
     filters: List[Dict[str, Any]],
-    filter_logic: str = "AND"
+    filter_logic: str = "AND",
+    full_details: bool = False,
+    preloaded: Optional[Dict[tuple, Any]] = None,
 ) -> Dict[str, Any]:
-    """Core logic for scanning stocks (internal use)"""
+    """Core logic for scanning stocks (internal use).
+
+    Filters are compiled once into a _ScanPlan (timeframes, fields, offsets,
+    bound operators, cost order) that every symbol shares. Per-timeframe
+    panels stack the symbols so each filter is evaluated for all of them in
+    one vectorized pass; filters or symbols the columnar path cannot handle
+    fall back to evaluate_single_filter on per-symbol DataFrames.
+
+    Filters run in plan order and a symbol stops at its first failing AND
+    filter (first passing OR filter), so timeframes and metrics are only
+    fetched for symbols still undecided. AND matches are unaffected; OR
+    matches mark the filters they never reached as skipped. ``full_details``
+    evaluates every filter for every symbol, as before.
+
+    Universes of SCAN_PARALLEL_MIN_SYMBOLS or more are split across the scan
+    process pool when SCAN_WORKERS > 1 (see _scan_stocks_parallel).
+    ``preloaded`` maps (symbol, timeframe) to fetch results to use instead
+    of fetching them.
+    """
     
     # If no symbols provided, fetch universe from API
     if not symbols:
@@ -1333,6 +3365,9 @@ def _scan_stocks_core(
         symbols = [s['ticker'] for s in universe]
         logger.info(f"Fetched {len(symbols)} symbols from universe")
 
+    if preloaded is None and SCAN_WORKERS > 1 and len(symbols) >= SCAN_PARALLEL_MIN_SYMBOLS:
+        return _scan_stocks_parallel(symbols, filters, filter_logic, full_details)
+
     logger.info(f"Starting scan of {len(symbols)} stocks with {len(filters)} filters")
 
     # TEMP: Log if any filter has expression
@@ -1340,188 +3375,263 @@ def _scan_stocks_core(
         if 'expression' in filter_config:
             logger.info(f"Filter {i} has expression: {filter_config['expression']}")
 
-    matched_stocks = []
-    failed_stocks = []
-
-    def _collect_timeframes_from_ast(node: Any, timeframes: set) -> None:
-        if not isinstance(node, dict):
-            return
-        tf = node.get('timeframe')
-        if isinstance(tf, str) and tf:
-            timeframes.add(tf)
-        node_type = node.get('type')
-        if node_type == 'binary':
-            _collect_timeframes_from_ast(node.get('left'), timeframes)
-            _collect_timeframes_from_ast(node.get('right'), timeframes)
+    plan = _compile_scan_plan(filters, filter_logic)
+
+    failures: List[tuple] = []  # (position, entry) so output keeps symbol order
+    fetched: Dict[int, set] = {pos: set() for pos in range(len(symbols))}
+    symbol_records: Dict[int, Dict[str, Any]] = {pos: {} for pos in range(len(symbols))}  # records list or cached columns per timeframe
+    columns: Dict[str, Dict[int, Dict[str, np.ndarray]]] = {tf: {} for tf in plan.timeframes}
+    frames: Dict[int, Dict[str, pd.DataFrame]] = {}
+    enrichment: Dict[int, Dict[str, Any]] = {}
+    metrics_checked: set = set()
+    plan_needs_metrics = any(spec.needs_metrics for spec in plan.filters)
+    outputsizes = dict(plan.outputsizes)
+    resampled = dict(plan.resampled)
+
+    def fetch_timeframe(tf: str, positions: List[int]) -> None:
+        """Fetch ``tf`` candles for the given symbols concurrently (once per symbol).
+
+        Timeframes the plan resamples are built from their base timeframe's
+        bars; symbols whose base bars are unusable fall back to a fetch.
+        """
+        wanted = [pos for pos in positions if tf not in fetched[pos]]
+        if not wanted:
             return
-        if node_type == 'unary':
-            _collect_timeframes_from_ast(node.get('operand'), timeframes)
-            return
-        if node_type == 'function':
-            args = node.get('args') or []
-            for arg in args:
-                _collect_timeframes_from_ast(arg, timeframes)
+        base = resampled.get(tf)
+        if base is not None:
+            # Base timeframes are never resampled themselves
+            base_wanted = [pos for pos in wanted if base not in fetched[pos]]
+            if base_wanted:
+                load_timeframe(base, base_wanted)
+            unresolved = []
+            for pos in wanted:
+                base_columns = columns[base].get(pos)
+                if base_columns is None:
+                    if base in symbol_records[pos]:
+                        unresolved.append(pos)
+                    else:
+                        fetched[pos].add(tf)
+                    continue
+                try:
+                    derived = ohlcv_resample.resample_ohlcv(base_columns, base, tf, MARKET_SESSION_OPEN_MINUTES)
+                    columns[tf][pos] = derived
+                    symbol_records[pos][tf] = derived
+                    fetched[pos].add(tf)
+                except Exception as e:
+                    logger.error(f"Failed to resample {tf} for {symbols[pos]}: {e}")
+                    unresolved.append(pos)
+            wanted = unresolved
+            if not wanted:
+                return
+        load_timeframe(tf, wanted)
+
+    def load_timeframe(tf: str, wanted: List[int]) -> None:
+        """Fetch ``tf`` candles of the ``wanted`` positions into the scan's columns and records."""
+        pairs = [(symbols[pos], tf) for pos in wanted]
+        missing = [pair for pair in pairs if pair not in preloaded] if preloaded else pairs
+        prefetched = _prefetch_stock_data(missing, outputsizes.get(tf, 'compact')) if missing else {}
+        if preloaded:
+            prefetched.update((pair, preloaded[pair]) for pair in pairs if pair in preloaded)
+        for pos in wanted:
+            fetched[pos].add(tf)
+            symbol = symbols[pos]
+            try:
+                stock_data = prefetched[(symbol, tf)]
+                if isinstance(stock_data, Exception):
+                    raise stock_data
+                if 'columns' in stock_data:
+                    # Binary cache hit: already columnar
+                    cached_columns = stock_data['columns']
+                    if len(cached_columns['date']) == 0:
+                        if tf == 'daily':
+                            failures.append((pos, {'symbol': symbol, 'error': 'No daily data'}))
+                            continue
+                        raise IndexError('list index out of range')
+                    columns[tf][pos] = _cached_columns_to_scan_columns(cached_columns)
+                    symbol_records[pos][tf] = cached_columns
+                    continue
+                if not stock_data['data'] and tf == 'daily':
+                    # If primary timeframe fails, it's critical
+                    failures.append((pos, {'symbol': symbol, 'error': 'No daily data'}))
+                    continue
+                if 'date' not in stock_data['data'][0]:
+                    raise KeyError('date')
+                try:
+                    columns[tf][pos] = _records_to_columns(stock_data['data'])
+                except (KeyError, TypeError, ValueError):
+                    # Non-standard records: validate now, evaluate per symbol only
+                    frames.setdefault(pos, {})[tf] = _records_to_frame(stock_data['data'])
+                symbol_records[pos][tf] = stock_data['data']
+                logger.debug(f"Symbol {symbol} {tf}: {len(stock_data['data'])} rows")
+            except Exception as e:
+                logger.error(f"Failed to fetch {tf} for {symbol}: {e}")
+
+    def enrich(pos: int) -> None:
+        """Fill non-OHLCV fields the filters need from the metrics API (once per symbol)."""
+        if pos in metrics_checked:
             return
-        if node_type == 'attribute':
-            field = node.get('field')
-            if isinstance(field, dict):
-                _collect_timeframes_from_ast(field, timeframes)
+        metrics_checked.add(pos)
+        daily_data = symbol_records[pos]['daily']
+        if isinstance(daily_data, dict):
+            existing_cols = set(OHLCV_COLUMNS)
+        else:
+            existing_cols = set(daily_data[0].keys()) - {'date'}
+        missing_fields = plan.needed_fields - existing_cols
+        if not missing_fields:
             return
-    
-    for symbol in symbols:
         try:
-            df_daily_dummy = None # Placeholder if needed
-            
-            # --- MULTI-TIMEFRAME SUPPORT ---
-            # Identify all required timeframes
-            required_timeframes = set()
-            required_timeframes.add('daily') # Always fetch daily for basic checks/enrichment
-            
-            for f in filters:
-                required_timeframes.add(f.get('timeframe', 'daily'))
-                # Also check compareToTimeframe
-                if 'compareToTimeframe' in f:
-                    required_timeframes.add(f['compareToTimeframe'])
-                if isinstance(f.get('value'), dict):
-                     if 'timeframe' in f['value']:
-                         required_timeframes.add(f['value']['timeframe'])
-                if isinstance(f.get('expression'), dict):
-                    _collect_timeframes_from_ast(f.get('expression'), required_timeframes)
-
-            data_frames = {}
-            error_in_fetch = False
-            
-            for tf in required_timeframes:
-                 try:
-                    # Fetch stock data
-                    stock_data = _fetch_stock_data_core(symbol, tf, "compact")
-                    if not stock_data['data']:
-                        # If primary timeframe fails, it's critical
-                        if tf == 'daily':
-                             failed_stocks.append({'symbol': symbol, 'error': 'No daily data'})
-                             error_in_fetch = True
-                             break
-                        else:
-                             # Warning?
-                             pass
-                    
-                    df = pd.DataFrame(stock_data['data'])
-                    df['date'] = pd.to_datetime(df['date'])
-                    data_frames[tf] = df.set_index('date').sort_index()
-                    logger.info(f"Symbol {symbol} {tf} DF: {len(df)} rows. Last: {df.index[-1]}")
-                    
-                 except Exception as e:
-                     logger.error(f"Failed to fetch {tf} for {symbol}: {e}")
-                     if tf == 'daily': error_in_fetch = True
-            
-            if error_in_fetch or 'daily' not in data_frames:
-                 continue
-            
-            # Primary DF for enrichment (Daily)
-            df = data_frames['daily'] 
-
-
-            # --- ENRICHMENT START ---
-            # Check if we need to fetch additional metrics (financials, etc.)
-            # Identify fields required by filters that are missing in OHLCV
-            needed_fields = set()
-            for f in filters:
-                if 'field' in f:
-                    needed_fields.add(f['field'])
-                # Also check AST expressions or RHS 'indicator' values if complex
-            
-            existing_cols = set(df.columns)
-            missing_fields = needed_fields - existing_cols
-            
-            # Common financial fields that might be requested
-            financial_map = {
-                'marketCap': 'marketCapitalization',
-                'pe_ratio': 'peBasicExclExtraTTM',
-                'peRatio': 'peBasicExclExtraTTM', 
-                'pb_ratio': 'pbQuarterly',
-                'eps': 'epsExclExtraTTM',
-                'dividend_yield': 'dividendYieldIndicatedAnnual',
-                'beta': 'beta',
-                'current_ratio': 'currentRatioQuarterly',
-                'debt_to_equity': 'totalDebtToEquityQuarterly',
-                'roe': 'roeTTM',
-                'net_sales': 'revenueTTM',
-                'net_profit': 'netIncomeTTM',
-                'operating_cash_flow': 'currentRatioQuarterly', # Fallback or use a specific if available? 
-                # Finnhub basic metrics might not have OCF directly in the root 'metric' object or named differently. 
-                # Checking docs: 'operatingCashFlowTTM' is common in basic financials.
-                # Let's try 'operatingCashFlowPerShareTTM' * shares? Or just map to something close if OCF isn't there?
-                # Actually, Finnhub 'metric' has 'operatingCashFlowTTM'.
-                'operating_cash_flow': 'operatingCashFlowTTM',
-                'book_value': 'bookValuePerShareAnnual',
-                'bookValue': 'bookValuePerShareAnnual',
-            }
-
-            if missing_fields:
+            metrics_resp = _fetch_metrics_from_api(symbols[pos])
+            if metrics_resp and 'metric' in metrics_resp:
+                metrics = metrics_resp['metric']
+                # Mapped metric names win over the raw field name.
+                # Broadcast onto the daily DataFrame later
+                enriched = {}
+                for field, sources in plan.metric_sources:
+                    if field in missing_fields:
+                        key = next((k for k in sources if k in metrics), None)
+                        if key is not None:
+                            enriched[field] = metrics[key]
+                if enriched:
+                    enrichment[pos] = enriched
+        except Exception:
+            # Log but continue (field will remain missing and filter will likely fail/skip)
+            pass
+
+    # --- FETCH STAGE ---
+    # Daily candles of every symbol are fetched concurrently up front; other
+    # timeframes and metrics only once a filter still deciding a symbol needs them.
+    fetch_timeframe('daily', list(range(len(symbols))))
+    records = [pos for pos in range(len(symbols)) if 'daily' in symbol_records[pos]]
+
+    with _indicator_cache_scope() as indicator_cache:
+        panels: Dict[str, List[_OHLCVPanel]] = {}
+        data_frames_by_pos: Dict[int, Dict[str, pd.DataFrame]] = {}
+
+        def panels_for(tf: str) -> List[_OHLCVPanel]:
+            if tf not in panels:
+                panels[tf] = _build_panels(tf, columns.get(tf, {}))
+                for panel in panels[tf]:
+                    indicator_cache.bind(panel.frame, tuple(symbols[p] for p in panel.positions), panel.timeframe,
+                                         panel.columns)
+            return panels[tf]
+
+        def frames_for(pos: int) -> Dict[str, pd.DataFrame]:
+            data_frames = data_frames_by_pos.get(pos)
+            if data_frames is None:
+                if plan_needs_metrics:
+                    enrich(pos)
+                data_frames = data_frames_by_pos[pos] = {}
+            for tf, tf_records in symbol_records[pos].items():
+                if tf not in data_frames:
+                    tf_frame = frames.get(pos, {}).get(tf)
+                    if tf_frame is None:
+                        tf_frame = _scan_data_to_frame(tf_records)
+                    if tf == 'daily':
+                        for field, val in enrichment.get(pos, {}).items():
+                            tf_frame[field] = val
+                    indicator_cache.bind(tf_frame, symbols[pos], tf)
+                    data_frames[tf] = tf_frame
+            return data_frames
+
+        # --- FILTER EVALUATION ---
+        # Filters run cheapest/most decisive first. Without full_details a symbol
+        # stops at its first failing AND filter or first passing OR filter.
+        outcomes: Dict[int, List[Optional[tuple]]] = {pos: [None] * len(filters) for pos in records}
+        undecided = set(records)
+        errored = set()
+        for j in plan.order:
+            if not undecided:
+                break
+            spec = plan.filters[j]
+            positions = sorted(undecided)
+            for tf in spec.timeframes:
+                fetch_timeframe(tf, positions)
+            if spec.needs_metrics:
+                for pos in positions:
+                    enrich(pos)
+
+            # Vectorized pass over every panel of the filter's timeframe
+            for panel in panels_for(spec.timeframe):
+                if undecided.isdisjoint(panel.positions):
+                    continue
                 try:
-                    # Only fetch if we suspect it's a financial metric (not just a typo)
-                    # For now, just try fetching if ANY field is missing
-                    metrics_resp = _fetch_metrics_from_api(symbol)
-                    
-                    if metrics_resp and 'metric' in metrics_resp:
-                        metrics = metrics_resp['metric']
-                        
-                        # Add mapped fields
-                        for user_field, api_field in financial_map.items():
-                            if api_field in metrics:
-                                metrics[user_field] = metrics[api_field]
-
-                        # Add metrics to DataFrame (broadcast)
-                        for field in missing_fields:
-                            if field in metrics:
-                                # Ensure it's numeric if possible, or object
-                                val = metrics[field]
-                                df[field] = val
+                    panel_results = _evaluate_filter_columnar(panel, spec.config, spec)
                 except Exception as e:
-                    # Log but continue (field will remain missing and filter will likely fail/skip)
-                    # logger.warning(f"Failed to enrich metrics for {symbol}: {e}")
-                    pass
-            # --- ENRICHMENT END ---
-            
-            # Evaluate each filter
-            filter_results = []
-            filter_details = []
-            
-            for filter_config in filters:
+                    logger.debug(f"Columnar evaluation fell back for filter {j}: {e}")
+                    panel_results = None
+                if panel_results is None:
+                    continue
+                for pos, outcome in zip(panel.positions, panel_results):
+                    # Symbols whose metrics supply this field are evaluated per symbol
+                    if pos in undecided and spec.field not in enrichment.get(pos, ()):
+                        outcomes[pos][j] = outcome
+
+            # Per-symbol fallback
+            for pos in positions:
+                if outcomes[pos][j] is not None:
+                    continue
+                symbol = symbols[pos]
                 try:
-                    result, detail = evaluate_single_filter(symbol, data_frames, filter_config)
-                    filter_results.append(result)
-                    filter_details.append(detail)
+                    data_frames = frames_for(pos)
                 except Exception as e:
-                    # Special handling for missing field error to be clearer?
-                    # logger.error(f"Filter evaluation error for {symbol}: {e}")
-                    filter_results.append(False)
-                    filter_details.append({'error': str(e)})
-            
-            # Apply filter logic
-            if filter_logic.upper() == 'AND':
-                passed = all(filter_results)
-            elif filter_logic.upper() == 'OR':
-                passed = any(filter_results)
-            else:
-                passed = all(filter_results)  # Default to AND
-            
-            # If stock passed filters, add to results
-            if passed:
-                latest = df.iloc[-1]
-                matched_stocks.append({
-                    'symbol': symbol,
-                    'close': float(latest['close']),
-                    'volume': int(latest['volume']) if not pd.isna(latest['volume']) else None,
-                    'date': df.index[-1].strftime('%Y-%m-%d'),
-                    'matched_filters': sum(filter_results),
-                    'total_filters': len(filters),
-                    'filter_details': filter_details
-                })
-        
-        except Exception as e:
-            logger.error(f"Error scanning {symbol}: {e}")
-            failed_stocks.append({'symbol': symbol, 'error': str(e)})
+                    logger.error(f"Error scanning {symbol}: {e}")
+                    failures.append((pos, {'symbol': symbol, 'error': str(e)}))
+                    errored.add(pos)
+                    undecided.discard(pos)
+                    continue
+                try:
+                    outcomes[pos][j] = evaluate_single_filter(symbol, data_frames, spec.config, spec)
+                except Exception as e:
+                    outcomes[pos][j] = (False, {'error': str(e)})
+
+            if not full_details:
+                settled_by = plan.logic == 'OR'
+                for pos in positions:
+                    if pos in undecided and bool(outcomes[pos][j][0]) == settled_by:
+                        undecided.discard(pos)
+
+        # --- FILTER LOGIC ---
+        matched_stocks = []
+        for pos in records:
+            if pos in errored:
+                continue
+            symbol = symbols[pos]
+            try:
+                evaluated = [outcome for outcome in outcomes[pos] if outcome is not None]
+                filter_results = [outcome[0] for outcome in evaluated]
+                if plan.logic == 'OR':
+                    passed = any(filter_results)
+                else:
+                    passed = len(evaluated) == len(filters) and all(filter_results)
+
+                # If stock passed filters, add to results
+                if passed:
+                    if pos not in columns['daily'] or pos in enrichment:
+                        daily = frames_for(pos)['daily']
+                        latest = daily.iloc[-1]
+                        close, volume, date = latest['close'], latest['volume'], daily.index[-1]
+                    else:
+                        cols = columns['daily'][pos]
+                        close, volume, date = cols['close'][-1], cols['volume'][-1], pd.Timestamp(cols['date'][-1])
+                    matched_stocks.append({
+                        'symbol': symbol,
+                        'close': float(close),
+                        'volume': int(volume) if not pd.isna(volume) else None,
+                        'date': date.strftime('%Y-%m-%d'),
+                        'matched_filters': sum(filter_results),
+                        'total_filters': len(filters),
+                        # Filters a short-circuited OR match never reached are marked skipped
+                        'filter_details': [
+                            outcome[1] if outcome is not None else {'skipped': True, 'passed': None}
+                            for outcome in outcomes[pos]
+                        ],
+                    })
+
+            except Exception as e:
+                logger.error(f"Error scanning {symbol}: {e}")
+                failures.append((pos, {'symbol': symbol, 'error': str(e)}))
+
+    failed_stocks = [entry for _, entry in sorted(failures, key=lambda item: item[0])]
     
     result = {
         'matched_stocks': matched_stocks,
@@ -1532,17 +3642,344 @@ def _scan_stocks_core(
         'filters_applied': filters,
         'scan_time': datetime.now().isoformat()
     }
-    
-    logger.info(f"Scan complete: {len(matched_stocks)}/{len(symbols)} stocks matched")
-    
-    return result
+    
+    result['indicator_cache'] = indicator_cache.stats()
+    
+    logger.info(f"Scan complete: {len(matched_stocks)}/{len(symbols)} stocks matched")
+    logger.info(f"Indicator cache: {result['indicator_cache']}")
+    
+    return result
+
+
+# ============================================================================
+# PARALLEL SCAN
+# ============================================================================
+
+# Worker processes for scans of large universes; 0 or 1 scans in process
+SCAN_WORKERS = max(0, int(os.getenv('SCAN_WORKERS', '0')))
+# Smallest universe worth the pool's hand-off costs
+SCAN_PARALLEL_MIN_SYMBOLS = max(1, int(os.getenv('SCAN_PARALLEL_MIN_SYMBOLS', '1000')))
+# Chunks per worker: two, so a slow chunk does not leave the others idle
+# while each chunk stays large enough to amortize its panels
+SCAN_CHUNKS_PER_WORKER = 2
+
+_scan_pool_state: Dict[str, Any] = {'pool': None}
+_scan_pool_lock = threading.Lock()
+
+
+def _scan_process_pool() -> Any:
+    """The ProcessPoolExecutor parallel scans run on, started on first use.
+
+    Workers are spawned, not forked: the server holds threads (event loop,
+    HTTP pool, Redis reconnects) a fork would copy mid-flight. Each worker
+    imports this module once and then serves every later scan.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    with _scan_pool_lock:
+        if _scan_pool_state['pool'] is None:
+            _scan_pool_state['pool'] = ProcessPoolExecutor(
+                max_workers=SCAN_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _scan_pool_state['pool']
+
+
+def _shutdown_scan_process_pool() -> None:
+    with _scan_pool_lock:
+        pool, _scan_pool_state['pool'] = _scan_pool_state['pool'], None
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+def _shareable_columns(stock_data: Any) -> Optional[Dict[str, np.ndarray]]:
+    """OHLCV columns of a daily fetch result to hand to workers in shared memory, or None.
+
+    Results the scan treats specially (errors, empty series, records with
+    extra fields or unparseable values) are pickled to the worker as they are.
+    """
+    if not isinstance(stock_data, dict):
+        return None
+    if 'columns' in stock_data:
+        cached = stock_data['columns']
+        return cached if len(cached['date']) else None
+    records = stock_data.get('data')
+    fields = {'date', *OHLCV_COLUMNS}
+    if not records or any(record.keys() != fields for record in records):
+        return None
+    try:
+        return _records_to_columns(records)
+    except (TypeError, ValueError):
+        return None
+
+
+def _scan_stocks_chunk(
+    symbols: List[str],
+    filters: List[Dict[str, Any]],
+    filter_logic: str,
+    full_details: bool,
+    handle: Any,
+    outcomes: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Pool task: _scan_stocks_core over one chunk, daily bars read from shared memory.
+
+    ``handle`` refers to the SharedOHLCV block of the chunk's daily bars and
+    ``outcomes`` holds the daily fetch results that were not packed into it.
+    """
+    shared = shared_ohlcv.SharedOHLCV.attach(handle)
+    try:
+        preloaded = {(symbol, 'daily'): outcome for symbol, outcome in outcomes.items()}
+        for symbol in shared.index:
+            preloaded[(symbol, 'daily')] = {'symbol': symbol, 'columns': shared.columns(symbol)}
+        return _scan_stocks_core(symbols, filters, filter_logic, full_details, preloaded=preloaded)
+    finally:
+        preloaded = None
+        shared.close()
+
+
+def _merge_scan_results(results: List[Dict[str, Any]], symbols: List[str], filters: List[Dict[str, Any]],
+                        filter_logic: str) -> Dict[str, Any]:
+    """Combine the results of consecutive symbol chunks into one scan result."""
+    matched_stocks = [stock for result in results for stock in result['matched_stocks']]
+    cache_stats = {'hits': 0, 'misses': 0, 'entries': 0}
+    for result in results:
+        for key in cache_stats:
+            cache_stats[key] += result['indicator_cache'][key]
+    lookups = cache_stats['hits'] + cache_stats['misses']
+    cache_stats['hit_rate'] = round(cache_stats['hits'] / lookups, 4) if lookups else 0.0
+    return {
+        'matched_stocks': matched_stocks,
+        'total_matched': len(matched_stocks),
+        'total_scanned': len(symbols),
+        'failed_stocks': [entry for result in results for entry in result['failed_stocks']],
+        'filter_logic': filter_logic,
+        'filters_applied': filters,
+        'scan_time': datetime.now().isoformat(),
+        'indicator_cache': cache_stats,
+    }
+
+
+def _scan_stocks_parallel(
+    symbols: List[str],
+    filters: List[Dict[str, Any]],
+    filter_logic: str = "AND",
+    full_details: bool = False,
+) -> Dict[str, Any]:
+    """_scan_stocks_core over contiguous chunks of ``symbols`` on the scan process pool.
+
+    The daily bars of every symbol are fetched here, as the serial scan
+    would, and packed into one SharedOHLCV block; workers scan their chunk
+    against read-only views of it and fetch other timeframes and metrics
+    themselves. Chunk results are concatenated in chunk order, so the result
+    lists stocks exactly as a serial scan does. If the pool fails, the scan
+    finishes in process on the bars already fetched.
+    """
+    plan = _compile_scan_plan(filters, filter_logic)
+    unique = list(dict.fromkeys(symbols))
+    prefetched = _prefetch_stock_data([(symbol, 'daily') for symbol in unique],
+                                      dict(plan.outputsizes).get('daily', 'compact'))
+
+    series: Dict[str, Dict[str, np.ndarray]] = {}
+    outcomes: Dict[str, Any] = {}
+    for (symbol, _), stock_data in prefetched.items():
+        packed = _shareable_columns(stock_data)
+        if packed is not None:
+            series[symbol] = packed
+        elif isinstance(stock_data, Exception):
+            # Only the message is used; provider exceptions need not pickle
+            outcomes[symbol] = RuntimeError(str(stock_data))
+        else:
+            outcomes[symbol] = stock_data
+
+    size = max(1, math.ceil(len(symbols) / (SCAN_WORKERS * SCAN_CHUNKS_PER_WORKER)))
+    chunks = [symbols[start:start + size] for start in range(0, len(symbols), size)]
+    logger.info(f"Scanning {len(symbols)} stocks in {len(chunks)} chunks on {SCAN_WORKERS} processes")
+
+    shared = None
+    futures = []
+    try:
+        shared = shared_ohlcv.SharedOHLCV.create(series)
+        pool = _scan_process_pool()
+        for chunk in chunks:
+            keys = list(dict.fromkeys(chunk))
+            futures.append(pool.submit(_scan_stocks_chunk, chunk, filters, filter_logic, full_details,
+                                       shared.handle(keys), {s: outcomes[s] for s in keys if s in outcomes}))
+        results = [future.result() for future in futures]
+    except Exception as e:
+        logger.error(f"Parallel scan failed, scanning in process: {e}")
+        for future in futures:
+            future.cancel()  # chunks not started yet; the shared block is about to go
+        if isinstance(e, BrokenExecutor):
+            _shutdown_scan_process_pool()
+        return _scan_stocks_core(symbols, filters, filter_logic, full_details, preloaded=prefetched)
+    finally:
+        if shared is not None:
+            shared.close()
+            shared.unlink()
+
+    result = _merge_scan_results(results, symbols, filters, filter_logic)
+    logger.info(f"Scan complete: {result['total_matched']}/{len(symbols)} stocks matched")
+    return result
+
+
+# ============================================================================
+# SCAN RESULT CACHE
+# ============================================================================
+
+SCAN_LOCK_TIMEOUT = int(os.getenv('SCAN_LOCK_TIMEOUT', '120'))
+
+_scan_inflight: Dict[str, Future] = {}
+_scan_inflight_lock = threading.Lock()
+
+
+def _scan_data_as_of(now: Optional[float] = None) -> int:
+    """Epoch seconds of the data window a scan reads from.
+
+    Windows are CACHE_TTL['scan_result'] long, so identical requests inside
+    one window share a result and the key rolls over with the next window.
+    """
+    window = max(1, CACHE_TTL['scan_result'])
+    now = time.time() if now is None else now
+    return int(now // window) * window
+
+
+def _scan_cache_key(symbols: List[str], filters: List[Dict[str, Any]], filter_logic: str, as_of: int,
+                    full_details: bool = False) -> str:
+    """Canonical hash of a scan request."""
+    logic = filter_logic.upper() if filter_logic.upper() in ('AND', 'OR') else 'AND'
+    request = {
+        'symbols': sorted(symbols),
+        'filters': filters,
+        'filter_logic': logic,
+        'as_of': as_of,
+    }
+    if full_details:
+        request['full_details'] = True
+    canonical = json.dumps(request, sort_keys=True, separators=(',', ':'), default=str)
+    return f"scan:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+
+def _order_scan_result(result: Dict[str, Any], symbols: List[str]) -> Dict[str, Any]:
+    """Deep copy a (possibly shared) scan result, listing stocks in request order.
+
+    The local cache tier and coalesced waiters hand out the same result
+    object, so nothing a caller receives may alias it.
+    """
+    position = {}
+    for index, symbol in enumerate(symbols):
+        position.setdefault(symbol, index)
+    ordered = copy.deepcopy(result)
+    for field in ('matched_stocks', 'failed_stocks'):
+        if isinstance(ordered.get(field), list):
+            ordered[field].sort(key=lambda entry: position.get(entry.get('symbol'), len(position)))
+    return ordered
+
+
+def _wait_for_remote_scan(cache_key: str, lock_key: str) -> Optional[Dict[str, Any]]:
+    """Poll for a result another process is computing; None if it gave up."""
+    deadline = time.monotonic() + SCAN_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.1)
+        try:
+            cached = redis_client.get(cache_key)
+            if cached:
+                return json.loads(cached)
+            if not redis_client.exists(lock_key):
+                return None
+        except Exception as e:
+            logger.error(f"Scan lock wait error: {e}")
+            return None
+    return None
+
+
+def _compute_scan_once(cache_key: str, symbols: List[str], filters: List[Dict[str, Any]], filter_logic: str,
+                       full_details: bool = False) -> Dict[str, Any]:
+    """Run the scan unless another process holds the lock for the same key."""
+    if not _cache_available():
+        return _scan_stocks_core(symbols, filters, filter_logic, full_details)
+
+    lock_key = f"lock:{cache_key}"
+    token = uuid4().hex
+    try:
+        acquired = redis_client.set(lock_key, token, nx=True, ex=SCAN_LOCK_TIMEOUT)
+    except Exception as e:
+        logger.error(f"Scan lock error: {e}")
+        acquired = True
+
+    if not acquired:
+        logger.info(f"Waiting for in-flight scan {cache_key}")
+        remote = _wait_for_remote_scan(cache_key, lock_key)
+        if remote is not None:
+            return remote
+        return _scan_stocks_core(symbols, filters, filter_logic, full_details)
+
+    try:
+        result = _scan_stocks_core(symbols, filters, filter_logic, full_details)
+        shared = {key: value for key, value in result.items() if key != 'indicator_cache'}
+        set_in_cache(cache_key, shared, CACHE_TTL['scan_result'])
+        return result
+    finally:
+        try:
+            held = redis_client.get(lock_key)
+            if held in (token, token.encode()):
+                redis_client.delete(lock_key)
+        except Exception as e:
+            logger.error(f"Scan lock release error: {e}")
+
+
+def _cached_scan(symbols: List[str], filters: List[Dict[str, Any]], filter_logic: str = "AND",
+                 full_details: bool = False) -> Dict[str, Any]:
+    """_scan_stocks_core behind the scan_result cache.
+
+    Results are cached for CACHE_TTL['scan_result'] under a hash of the sorted
+    symbols, filters, filter logic, full_details and data window. Concurrent identical
+    requests are coalesced: in-process callers wait on the first caller's
+    result, and other processes wait on a Redis lock. Returned results are
+    deep copies, so callers may modify them without touching the cache. Only
+    the caller that ran the scan gets its ``indicator_cache`` stats.
+    """
+    symbols = list(symbols or [])
+    cache_key = _scan_cache_key(symbols, filters, filter_logic, _scan_data_as_of(), full_details)
+
+    cached = get_from_cache(cache_key)
+    if cached is not None:
+        logger.info(f"Scan result cache HIT: {cache_key}")
+        return _order_scan_result(cached, symbols)
+
+    with _scan_inflight_lock:
+        future = _scan_inflight.get(cache_key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _scan_inflight[cache_key] = future
+
+    if not owner:
+        logger.info(f"Coalescing with in-flight scan {cache_key}")
+        return _order_scan_result(future.result(), symbols)
+
+    try:
+        result = _compute_scan_once(cache_key, symbols, filters, filter_logic, full_details)
+        # The indicator cache stats describe this run; waiters and cache hits did not compute
+        indicator_stats = result.pop('indicator_cache', None)
+        future.set_result(result)
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    finally:
+        with _scan_inflight_lock:
+            _scan_inflight.pop(cache_key, None)
+
+    ordered = _order_scan_result(result, symbols)
+    if indicator_stats is not None:
+        ordered['indicator_cache'] = indicator_stats
+    return ordered
 
 
-@mcp.tool()
+@_async_tool
 def scan_stocks(
     symbols: List[str],
     filters: List[Dict[str, Any]],
-    filter_logic: str = "AND"
+    filter_logic: str = "AND",
+    full_details: bool = False
 ) -> Dict[str, Any]:
     """
     Scan multiple stocks based on custom technical filters.
@@ -1563,6 +4000,10 @@ def scan_stocks(
             - metric: (optional) Metric identifier for advanced filters
             - pattern: (optional) Candlestick pattern name for 'pattern' type
         filter_logic: 'AND' (all filters must pass) or 'OR' (any filter passes)
+        full_details: Evaluate every filter for every stock. By default filters
+            run cheapest first and a stock stops at its first failing AND filter
+            (first passing OR filter); OR matches then list the remaining
+            filters as {"skipped": true}.
     
     Returns:
         Dictionary containing:
@@ -1577,7 +4018,7 @@ def scan_stocks(
             {"type": "price", "field": "close", "operator": "gt", "value": 100}
         ]
     """
-    return _scan_stocks_core(symbols, filters, filter_logic)
+    return _cached_scan(symbols, filters, filter_logic, full_details)
 
 
 def calculate_candlestick_components(row: pd.Series) -> Dict[str, float]:
@@ -1703,11 +4144,270 @@ def detect_candlestick_pattern(df: pd.DataFrame, idx: int, pattern: str) -> Dict
     }
 
 
-def _get_indicator_value(df: pd.DataFrame, field: str, time_period: int, idx: int, params: Dict[str, Any] = None) -> float:
-    """Helper to calculate indicator value at a specific index."""
+# Filter/node keys that change an indicator's output besides its period
+def _indicator_signature(field_upper: str, time_period: Any, params: Dict[str, Any]) -> Optional[tuple]:
+    """(name, time_period, params) identifying a resolved indicator's series.
+
+    Arguments the calculation ignores are dropped and the ones it reads are
+    normalized with the same defaults and conversions, so equivalent requests
+    from different filters share one IndicatorCache entry. Returns None when
+    the parameters cannot be normalized.
+    """
+    try:
+        if field_upper == 'SUPERTREND':
+            param_items = (('multiplier', float(params.get('multiplier', 3.0))),)
+        elif field_upper.startswith('MACD'):
+            time_period = None
+            param_items = (('fast', int(params.get('fast', 12))), ('slow', int(params.get('slow', 26))),
+                           ('signal', int(params.get('signal', 9))))
+        elif field_upper.startswith('BBANDS') or field_upper == 'BB_WIDTH':
+            param_items = (('std_dev', float(params.get('std_dev', 2.0))),)
+        elif field_upper in ('PARABOLIC_SAR', 'SAR'):
+            time_period = None
+            param_items = (('step', float(params.get('step', 0.02))), ('max', float(params.get('max', 0.2))))
+        elif field_upper.startswith('ICHIMOKU'):
+            time_period = None
+            param_items = (('period_fast', int(params.get('period_fast', 9))),
+                           ('period_med', int(params.get('period_med', 26))),
+                           ('period_slow', int(params.get('period_slow', 52))))
+        else:
+            if field_upper in ('VWAP', 'OBV'):
+                time_period = None
+            param_items = ()
+    except (TypeError, ValueError):
+        return None
+    return field_upper, time_period, param_items
+
+
+class IndicatorCache:
+    """Per-scan memo of full indicator series.
+
+    Entries are keyed by (symbol, timeframe, indicator, time_period, params).
+    Frames are registered with ``bind`` so the cache can map a DataFrame back
+    to its symbol and timeframe (a tuple of symbols for a panel frame, along
+    with the panel's per-symbol columns); unbound frames are never cached. Every index
+    lookup (latest bar, crossover ``prev_idx``, AST offsets) for the same
+    indicator then reads the same stored series.
+    """
+
+    def __init__(self) -> None:
+        self._frames: Dict[int, tuple] = {}
+        self._series: Dict[tuple, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def bind(self, df: pd.DataFrame, symbol: Any, timeframe: str,
+             columns: Optional[List[Dict[str, np.ndarray]]] = None) -> None:
+        """Register ``df`` as the data of ``symbol`` on ``timeframe``."""
+        # Keep a reference so id(df) cannot be reused while the scan runs
+        self._frames[id(df)] = (df, symbol, timeframe, columns)
+
+    def binding(self, df: pd.DataFrame) -> Optional[tuple]:
+        """(symbol, timeframe, panel columns) ``df`` was bound with, or None."""
+        bound = self._frames.get(id(df))
+        if bound is None or bound[0] is not df:
+            return None
+        return bound[1:]
+
+    def key_for(self, df: pd.DataFrame, signature: Optional[tuple]) -> Optional[tuple]:
+        """Return the cache key for an indicator ``signature`` on ``df``, or None if uncacheable."""
+        bound = self._frames.get(id(df))
+        if bound is None or bound[0] is not df or signature is None:
+            return None
+        key = (bound[1], bound[2], *signature)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key: tuple) -> Optional[Any]:
+        series = self._series.get(key)
+        if series is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return series
+
+    def put(self, key: tuple, series: Any) -> None:
+        self._series[key] = series
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(self._series),
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_ACTIVE_INDICATOR_CACHE: contextvars.ContextVar = contextvars.ContextVar('indicator_cache', default=None)
+
+
+@contextmanager
+def _indicator_cache_scope():
+    """Activate a fresh IndicatorCache for the duration of a scan."""
+    cache = IndicatorCache()
+    token = _ACTIVE_INDICATOR_CACHE.set(cache)
+    try:
+        yield cache
+    finally:
+        _ACTIVE_INDICATOR_CACHE.reset(token)
+
+
+class IndicatorStateStore:
+    """Streaming indicator state per (symbol, timeframe, indicator signature).
+
+    Recursive indicators (EMA, RSI, ATR, ADX, MACD, OBV) get an
+    incremental_indicators.IndicatorStream the second time a scan computes
+    them for a symbol, so one-off scans never pay for seeding. From then on
+    only the bars from the stream's last one on are pushed (the forming
+    candle is replaced), so a repeated intraday scan costs O(1) per new bar
+    instead of a pass over the whole frame.
+
+    A stream seeded from a frame returns exactly the batch values for it.
+    Once later frames start after the stream's first bar (the fetch window
+    slid forward), the stream keeps its longer history; its values then
+    differ from a batch over the shorter frame only by the warm-up error the
+    lookback planner already bounds with SCAN_WARMUP_TOLERANCE. Cumulative
+    indicators (OBV) never forget their start, so their streams only resume
+    on frames that begin at the stream's first bar.
+
+    At most ``max_streams`` streams are kept, least recently used evicted;
+    0 disables streaming.
+    """
+
+    def __init__(self, max_streams: int):
+        self.max_streams = max_streams
+        self._streams: 'OrderedDict[tuple, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.seeded = 0
+        self.pushed = 0
+
+    @staticmethod
+    def _resume_at(stream: Any, stamps: np.ndarray, columns: Dict[str, np.ndarray], inputs: tuple,
+                   anchored: bool = False) -> Optional[int]:
+        """Index of the stream's last bar in ``stamps`` if the bars before it are the stream's.
+
+        ``anchored`` streams also need ``stamps`` to start at the stream's first bar.
+        """
+        if anchored and stamps[0] != stream.first_date:
+            return None
+        last = stream.last_date
+        i = int(np.searchsorted(stamps, last))
+        if i >= len(stamps) or stamps[i] != last or i + 1 > len(stream):
+            return None
+        if not np.array_equal(stamps[:i + 1], stream.dates[len(stream) - i - 1:]):
+            return None
+        completed = stream.completed_bar
+        if i > 0 and completed is not None:
+            for field in inputs:
+                value, seen = float(columns[field][i - 1]), completed[field]
+                if value != seen and not (value != value and seen != seen):
+                    return None  # history was revised
+        return i
+
+    def series(self, symbol: str, timeframe: str, signature: tuple, dates: np.ndarray,
+               columns: Dict[str, np.ndarray]) -> Optional[np.ndarray]:
+        """Values of the ``signature`` indicator for one symbol's bars, or None to compute them in batch.
+
+        ``dates`` are the bars' ascending datetime64 dates and ``columns`` the
+        OHLCV arrays the indicator reads.
+        """
+        name, time_period, param_items = signature
+        inputs = incremental_indicators.INDICATOR_INPUTS.get(name)
+        if self.max_streams <= 0 or inputs is None or len(dates) == 0:
+            return None
+        stamps = np.asarray(dates).astype('datetime64[ns]').astype('int64')
+        key = (symbol, timeframe, signature)
+        with self._lock:
+            if key not in self._streams:
+                self._remember(key, None)  # seen once: batch this time
+                return None
+            stream = self._streams[key]
+            anchored = name in incremental_indicators.CUMULATIVE_INDICATORS
+            start = None if stream is None else self._resume_at(stream, stamps, columns, inputs, anchored)
+            if start is not None:
+                # Resuming pushes only the bars since the stream's last one
+                self.pushed += self._push(stream, stamps, columns, inputs, start)
+                self._remember(key, stream)
+                return stream.values[-len(stamps):].copy()
+            if stream is not None and stamps[-1] < stream.last_date:
+                return None  # older bars than the stream has seen
+
+        # Seed outside the lock: it pushes every bar of the frame
+        indicator = incremental_indicators.create_indicator(name, time_period, dict(param_items))
+        stream = incremental_indicators.IndicatorStream(indicator, len(stamps))
+        pushed = self._push(stream, stamps, columns, inputs, 0)
+        values = stream.values[-len(stamps):].copy()
+        with self._lock:
+            self.seeded += 1
+            self.pushed += pushed
+            self._remember(key, stream)
+        return values
+
+    @staticmethod
+    def _push(stream: Any, stamps: np.ndarray, columns: Dict[str, np.ndarray], inputs: tuple, start: int) -> int:
+        """Push the bars from ``start`` on to ``stream``; returns how many."""
+        stream.reserve(len(stamps))
+        bars = zip(*(np.asarray(columns[field][start:], dtype='float64').tolist() for field in inputs))
+        stream.extend(stamps[start:].tolist(), (dict(zip(inputs, bar)) for bar in bars))
+        return len(stamps) - start
+
+    def _remember(self, key: tuple, stream: Any) -> None:
+        self._streams[key] = stream
+        self._streams.move_to_end(key)
+        while len(self._streams) > self.max_streams:
+            self._streams.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._streams.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'streams': len(self._streams), 'seeded': self.seeded, 'pushed': self.pushed}
+
+
+# Streamed (symbol, timeframe, indicator) states kept in process; 0 disables streaming
+INDICATOR_STREAMS = IndicatorStateStore(int(os.getenv('INDICATOR_STREAMS_MAX', '10000')))
+
+
+def _streamed_indicator_series(df: pd.DataFrame, binding: Optional[tuple], signature: Optional[tuple]) -> Optional[Any]:
+    """Indicator series of a bound scan frame from INDICATOR_STREAMS, or None if not streamable."""
+    if binding is None or signature is None or signature[0] not in incremental_indicators.INDICATOR_INPUTS:
+        return None
+    symbol, timeframe, panel_columns = binding
+    try:
+        if isinstance(symbol, tuple):
+            if panel_columns is None:
+                return None
+            # Every symbol is visited so the whole panel is registered or seeded in one scan
+            values = [INDICATOR_STREAMS.series(panel_symbol, timeframe, signature, columns['date'], columns)
+                      for panel_symbol, columns in zip(symbol, panel_columns)]
+            if any(symbol_values is None for symbol_values in values):
+                return None
+            return pd.DataFrame(np.column_stack(values), index=df.index, columns=df['close'].columns)
+        if not isinstance(df.index, pd.DatetimeIndex):
+            return None
+        inputs = incremental_indicators.INDICATOR_INPUTS[signature[0]]
+        columns = {field: df[field].to_numpy(dtype='float64') for field in inputs}
+        values = INDICATOR_STREAMS.series(symbol, timeframe, signature, df.index.to_numpy(), columns)
+        return None if values is None else pd.Series(values, index=df.index)
+    except Exception as e:
+        logger.debug(f"Streaming {signature[0]} for {symbol} skipped: {e}")
+        return None
+
+
+def _resolve_indicator_field(field: str, time_period: int) -> tuple:
+    """Normalize an indicator field name, applying composite period suffixes.
+
+    Composite fields like "rsi_9" or "sma_200" resolve to ("RSI", 9) and
+    ("SMA", 200). Other fields are only upper-cased.
+    """
     field_upper = field.upper()
-    params = params or {}
-    
+
     # Handle composite fields like "rsi_9", "rsi_21"
     if '_' in field_upper and not any(k in field_upper for k in ['BBANDS', 'MACD', 'ICHIMOKU', 'SUPERTREND']):
         parts = field_upper.split('_')
@@ -1722,6 +4422,43 @@ def _get_indicator_value(df: pd.DataFrame, field: str, time_period: int, idx: in
              except ValueError:
                 pass
 
+    return field_upper, time_period
+
+
+def _get_indicator_series(df: pd.DataFrame, field: str, time_period: int, params: Dict[str, Any] = None) -> pd.Series:
+    """Helper to calculate the full indicator series for a field.
+
+    ``df`` is either a single-symbol OHLCV frame or a wide panel frame from the
+    columnar scan engine, in which case a bars x symbols DataFrame is returned.
+    """
+    params = params or {}
+    field_upper, time_period = _resolve_indicator_field(field, time_period)
+
+    cache = _ACTIVE_INDICATOR_CACHE.get()
+    cache_key = None
+    if cache is not None:
+        if field in df.columns:
+            signature = (field, time_period, ())
+        else:
+            signature = _indicator_signature(field_upper, time_period, params)
+        cache_key = cache.key_for(df, signature)
+        if cache_key is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+    series = None
+    if cache_key is not None:
+        series = _streamed_indicator_series(df, cache.binding(df), signature)
+    if series is None:
+        series = _compute_indicator_series(df, field, field_upper, time_period, params)
+    if cache_key is not None:
+        cache.put(cache_key, series)
+    return series
+
+
+def _compute_indicator_series(df: pd.DataFrame, field: str, field_upper: str, time_period: int, params: Dict[str, Any]) -> pd.Series:
+    """Dispatch a resolved indicator name to its calculate_* function."""
     if field_upper == 'RSI':
         series = calculate_rsi(df, time_period)
     elif field_upper == 'SMA':
@@ -1739,6 +4476,8 @@ def _get_indicator_value(df: pd.DataFrame, field: str, time_period: int, idx: in
         series = stoch['k']
     elif field_upper == 'ATR':
         series = calculate_atr(df, time_period)
+    elif field_upper == 'OBV':
+        series = calculate_obv(df)
     elif field_upper == 'SUPERTREND':
         multiplier = float(params.get('multiplier', 3.0))
         series = calculate_supertrend(df, time_period, multiplier)
@@ -1808,7 +4547,12 @@ def _get_indicator_value(df: pd.DataFrame, field: str, time_period: int, idx: in
         else:
             raise ValueError(f"Unsupported indicator: {field}")
     
-    return float(series.iloc[idx])
+    return series
+
+
+def _get_indicator_value(df: pd.DataFrame, field: str, time_period: int, idx: int, params: Dict[str, Any] = None) -> float:
+    """Helper to calculate indicator value at a specific index."""
+    return float(_get_indicator_series(df, field, time_period, params).iloc[idx])
 
 
 def evaluate_ast(node: Dict[str, Any], data_frames: Dict[str, pd.DataFrame], idx: int) -> float:
@@ -1936,23 +4680,418 @@ def evaluate_ast(node: Dict[str, Any], data_frames: Dict[str, pd.DataFrame], idx
     raise ValueError(f"Unknown node type: {node_type}")
 
 
-def evaluate_single_filter(symbol: str, data_frames: Dict[str, pd.DataFrame], filter_config: Dict[str, Any]) -> tuple:
+class _ASTNotVectorizable(Exception):
+    """Raised for AST shapes that compile_ast leaves to evaluate_ast."""
+
+
+def _tail_align(*values: np.ndarray) -> tuple:
+    """Trim end-aligned arrays to their common length; 0-d values broadcast."""
+    lengths = [v.shape[0] for v in values if v.ndim]
+    if not lengths:
+        return values
+    n = min(lengths)
+    return tuple(v[v.shape[0] - n:] if v.ndim else v for v in values)
+
+
+def _shift_back(values: np.ndarray, periods: int) -> np.ndarray:
+    """End-aligned values ``periods`` bars earlier (the last ``periods`` rows drop off)."""
+    if values.ndim == 0 or periods == 0:
+        return values
+    return values[:max(values.shape[0] - periods, 0)]
+
+
+def _ast_divide(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    nonzero = right != 0
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        return np.where(nonzero, left / np.where(nonzero, right, 1.0), 0.0)
+
+
+def _ast_min(args: List[np.ndarray]) -> np.ndarray:
+    # Same NaN handling as builtin min(): a later value only wins if it compares smaller
+    result = args[0]
+    for arg in args[1:]:
+        result = np.where(arg < result, arg, result)
+    return result
+
+
+def _ast_max(args: List[np.ndarray]) -> np.ndarray:
+    result = args[0]
+    for arg in args[1:]:
+        result = np.where(arg > result, arg, result)
+    return result
+
+
+# Elementwise counterparts of the evaluate_ast binary operators (1.0/0.0 for booleans)
+_AST_BINARY_OPERATORS = {
+    '+': lambda l, r: l + r,
+    '-': lambda l, r: l - r,
+    '*': lambda l, r: l * r,
+    '/': _ast_divide,
+    '>': lambda l, r: (l > r).astype('float64'),
+    'gt': lambda l, r: (l > r).astype('float64'),
+    '<': lambda l, r: (l < r).astype('float64'),
+    'lt': lambda l, r: (l < r).astype('float64'),
+    '>=': lambda l, r: (l >= r).astype('float64'),
+    'gte': lambda l, r: (l >= r).astype('float64'),
+    '<=': lambda l, r: (l <= r).astype('float64'),
+    'lte': lambda l, r: (l <= r).astype('float64'),
+    '==': lambda l, r: (l == r).astype('float64'),
+    'eq': lambda l, r: (l == r).astype('float64'),
+    '!=': lambda l, r: (l != r).astype('float64'),
+    'ne': lambda l, r: (l != r).astype('float64'),
+    'AND': lambda l, r: ((l != 0) & (r != 0)).astype('float64'),
+    '&&': lambda l, r: ((l != 0) & (r != 0)).astype('float64'),
+    'OR': lambda l, r: ((l != 0) | (r != 0)).astype('float64'),
+    '||': lambda l, r: ((l != 0) | (r != 0)).astype('float64'),
+}
+
+_AST_UNARY_OPERATORS = {
+    'NOT': lambda v: (v == 0.0).astype('float64'),
+    '!': lambda v: (v == 0.0).astype('float64'),
+    '-': lambda v: -v,
+}
+
+_AST_FUNCTIONS = {
+    'ABS': lambda args: np.abs(args[0]),
+    'MIN': _ast_min,
+    'MAX': _ast_max,
+}
+
+
+def _ast_key(node: Any) -> str:
+    """Structural key of an AST node: equal for structurally identical subtrees."""
+    return json.dumps(node, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def _reuse_last_result(compiled: Callable[[Dict[str, pd.DataFrame]], np.ndarray]) -> Callable[[Dict[str, pd.DataFrame]], np.ndarray]:
+    """Wrap a compiled node so repeated calls with the same data_frames object compute once."""
+    last = [(None, None)]
+
+    def evaluate(data_frames: Dict[str, pd.DataFrame]) -> np.ndarray:
+        frames, result = last[0]
+        if frames is not data_frames:
+            result = compiled(data_frames)
+            last[0] = (data_frames, result)
+        return result
+    return evaluate
+
+
+def _is_constant_node(node: Any) -> bool:
+    return isinstance(node, dict) and node.get('type') == 'constant'
+
+
+def optimize_ast(node: Any, interned: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Return an equivalent AST with constant subtrees folded and structurally
+    identical subtrees interned (the input is left unchanged).
+
+    A binary, unary, function or nested-attribute node whose operands are
+    all constants is replaced by the constant evaluate_ast gives it, unless
+    evaluating it raises. ``interned`` (structural key -> node) may be shared
+    across the expressions of a scan so repeats become the same object.
+    """
+    if not isinstance(node, dict):
+        return node
+    if interned is None:
+        interned = {}
+
+    node_type = node.get('type')
+    optimized = dict(node)
+    children: List[Any] = []
+    if node_type == 'binary':
+        optimized['left'] = optimize_ast(node.get('left'), interned)
+        optimized['right'] = optimize_ast(node.get('right'), interned)
+        children = [optimized['left'], optimized['right']]
+    elif node_type == 'unary':
+        optimized['operand'] = optimize_ast(node.get('operand'), interned)
+        children = [optimized['operand']]
+    elif node_type == 'function' and isinstance(node.get('args'), list):
+        optimized['args'] = [optimize_ast(arg, interned) for arg in node['args']]
+        children = optimized['args']
+    elif node_type == 'attribute' and isinstance(node.get('field'), dict):
+        optimized['field'] = optimize_ast(node['field'], interned)
+        children = [optimized['field']]
+
+    if children and all(_is_constant_node(child) for child in children):
+        try:
+            # Constants do not depend on the bar, so any index gives the value
+            value = evaluate_ast(optimized, {}, -1)
+        except Exception:
+            pass
+        else:
+            optimized = {'type': 'constant', 'value': value}
+
+    return interned.setdefault(_ast_key(optimized), optimized)
+
+
+def compile_ast(node: Dict[str, Any], memo: Optional[Dict[str, Callable]] = None) -> Callable[[Dict[str, pd.DataFrame]], np.ndarray]:
+    """
+    Compile an AST node into a function of ``data_frames`` that evaluates
+    every bar in one pass.
+
+    The returned array is aligned to the last bar: ``result[idx]`` equals
+    ``evaluate_ast(node, data_frames, idx)`` for every index the interpreter
+    can evaluate, and earlier, out-of-range bars are simply absent. Constant
+    expressions yield a 0-d array. With panel frames (bars x symbols) every
+    symbol is evaluated at once and the result has one column per symbol.
+    Crossovers compare the series with itself shifted by one bar, so nothing
+    underneath is computed twice.
+
+    ``memo`` (structural key -> compiled node) may be shared by every
+    expression of a scan: structurally identical subtrees then compile to one
+    function that computes once per ``data_frames``.
+
+    Raises _ASTNotVectorizable (or the interpreter's own error) for nodes
+    that must go through evaluate_ast.
+    """
+    if memo is None:
+        return _compile_ast_node(node, None)
+    key = _ast_key(node)
+    compiled = memo.get(key)
+    if compiled is None:
+        compiled = _compile_ast_node(node, memo)
+        if node.get('type') != 'constant':
+            compiled = _reuse_last_result(compiled)
+        memo[key] = compiled
+    return compiled
+
+
+def _compile_ast_node(node: Dict[str, Any], memo: Optional[Dict[str, Callable]]) -> Callable[[Dict[str, pd.DataFrame]], np.ndarray]:
+    node_type = node.get('type')
+
+    if node_type == 'constant':
+        constant = np.asarray(float(node.get('value', 0)))
+        return lambda data_frames: constant
+
+    if node_type in ('attribute', 'indicator'):
+        node_offset = int(node.get('offset', 0))
+        if node_offset < 0:
+            # Look-ahead offsets index from the first bar in the interpreter
+            raise _ASTNotVectorizable(f"negative offset {node_offset}")
+
+        field = node.get('field', '')
+        if node_type == 'attribute' and isinstance(field, dict):
+            inner = compile_ast(field, memo)
+            return lambda data_frames: _shift_back(inner(data_frames), node_offset)
+
+        tf = node.get('timeframe', 'daily')
+        if node_type == 'attribute':
+            field = str(field).lower()
+
+            def attribute(data_frames: Dict[str, pd.DataFrame]) -> np.ndarray:
+                df = data_frames.get(tf)
+                if df is None:
+                    raise ValueError(f"Timeframe '{tf}' data not found for attribute '{field}'")
+                if field not in df.columns:
+                    raise ValueError(f"Field '{field}' not found in data ({tf})")
+                return _shift_back(df[field].to_numpy(dtype='float64'), node_offset)
+            return attribute
+
+        time_period = int(node.get('time_period', 14))
+
+        def indicator(data_frames: Dict[str, pd.DataFrame]) -> np.ndarray:
+            df = data_frames.get(tf)
+            if df is None:
+                raise ValueError(f"Timeframe '{tf}' data not found for indicator '{field}'")
+            series = _get_indicator_series(df, field, time_period, params=node)
+            return _shift_back(series.to_numpy(dtype='float64'), node_offset)
+        return indicator
+
+    if node_type == 'binary':
+        left = compile_ast(node.get('left'), memo)
+        right = compile_ast(node.get('right'), memo)
+        op = node.get('operator')
+
+        if op in ('crossed_above', 'crossed_below'):
+            def crossover(data_frames: Dict[str, pd.DataFrame]) -> np.ndarray:
+                left_val, right_val = left(data_frames), right(data_frames)
+                left_val, right_val, left_prev, right_prev = _tail_align(
+                    left_val, right_val, _shift_back(left_val, 1), _shift_back(right_val, 1))
+                if op == 'crossed_above':
+                    return ((left_prev <= right_prev) & (left_val > right_val)).astype('float64')
+                return ((left_prev >= right_prev) & (left_val < right_val)).astype('float64')
+            return crossover
+
+        func = _AST_BINARY_OPERATORS.get(op) if isinstance(op, str) else None
+        if func is None:
+            raise ValueError(f"Unknown binary operator: {op}")
+        return lambda data_frames: func(*_tail_align(left(data_frames), right(data_frames)))
+
+    if node_type == 'unary':
+        operand = compile_ast(node.get('operand'), memo)
+        op = node.get('operator')
+        func = _AST_UNARY_OPERATORS.get(op) if isinstance(op, str) else None
+        if func is None:
+            raise ValueError(f"Unknown unary operator: {op}")
+        return lambda data_frames: func(operand(data_frames))
+
+    if node_type == 'function':
+        name = node.get('name', '').upper()
+        args = [compile_ast(arg, memo) for arg in node.get('args', [])]
+        func = _AST_FUNCTIONS.get(name)
+        if func is None:
+            raise ValueError(f"Unknown function: {name}")
+        return lambda data_frames: func(list(_tail_align(*(arg(data_frames) for arg in args))))
+
+    raise ValueError(f"Unknown node type: {node_type}")
+
+
+def _try_compile_ast(expression: Any, interned: Optional[Dict[str, Any]] = None,
+                     memo: Optional[Dict[str, Callable]] = None) -> Optional[Callable[[Dict[str, pd.DataFrame]], np.ndarray]]:
+    """optimize_ast + compile_ast, returning None for expressions the interpreter must handle."""
+    if not isinstance(expression, dict):
+        return None
+    try:
+        return compile_ast(optimize_ast(expression, interned), memo)
+    except Exception:
+        return None
+
+
+def _evaluate_expression_at(spec: _FilterSpec, data_frames: Dict[str, pd.DataFrame], idx: int) -> float:
+    """Value of a filter's expression at ``idx``, preferring its compiled form.
+
+    Anything the compiled form cannot answer (out-of-range bars, missing data,
+    non-numeric columns) is re-evaluated by evaluate_ast, so results and error
+    messages are the interpreter's.
+    """
+    if spec.compiled_expression is not None and idx < 0:
+        try:
+            values = spec.compiled_expression(data_frames)
+            if values.ndim == 0:
+                return float(values)
+            if values.ndim == 1 and idx >= -values.shape[0]:
+                return float(values[idx])
+        except Exception:
+            pass
+    return evaluate_ast(spec.expression, data_frames, idx)
+
+
+def _ast_supports_panel(node: Any, timeframe: str) -> bool:
+    """True if every node reads ``timeframe`` data a wide panel frame can provide."""
+    if not isinstance(node, dict):
+        return False
+    node_type = node.get('type')
+    if node_type == 'constant':
+        return True
+    if node_type == 'attribute':
+        field = node.get('field', '')
+        if isinstance(field, dict):
+            return _ast_supports_panel(field, timeframe)
+        return node.get('timeframe', 'daily') == timeframe and str(field).lower() in OHLCV_COLUMNS
+    if node_type == 'indicator':
+        try:
+            time_period = int(node.get('time_period', 14))
+        except (TypeError, ValueError):
+            return False
+        return node.get('timeframe', 'daily') == timeframe and _panel_supports_indicator(node.get('field'), time_period)
+    if node_type == 'binary':
+        return _ast_supports_panel(node.get('left'), timeframe) and _ast_supports_panel(node.get('right'), timeframe)
+    if node_type == 'unary':
+        return _ast_supports_panel(node.get('operand'), timeframe)
+    if node_type == 'function':
+        args = node.get('args', [])
+        return bool(args) and all(_ast_supports_panel(arg, timeframe) for arg in args)
+    return False
+
+
+def _evaluate_price_52week(symbol: str, data_frames: Dict[str, pd.DataFrame], df: pd.DataFrame,
+                           spec: _FilterSpec) -> tuple:
+    """price_52week filter: distance of the price from its 52-week high or low.
+
+    The high/low come from the symbol's maintained Rolling52WeekSummary. It is
+    rebuilt from the loaded daily frame (the lookback planner loads
+    lookback_days bars) or, for callers with less history, from exactly
+    lookback_days fetched bars (sliced from the candle store when it holds
+    them) only when it does not cover the latest bar.
+    """
+    filter_type = spec.filter_type
+    base_field = spec.field or 'close'
+    filter_config = spec.config
+    lookback_days = int(filter_config.get('lookback_days', WEEK52_BARS))
+    metric = filter_config.get('metric', 'distance_from_high_pct')
+
+    daily = data_frames.get('daily')
+    latest = str(daily.index[-1])[:10] if daily is not None and len(daily) else None
+    summary = WEEK52_SUMMARIES.get(symbol, lookback_days)
+    if summary is None or summary.stale or not summary.complete or summary.last_date != latest:
+        if daily is not None and len(daily) >= lookback_days:
+            summary = WEEK52_SUMMARIES.seed(symbol, lookback_days, daily)
+        else:
+            try:
+                history = _fetch_stock_data_core(symbol, "daily", lookback_days, as_columns=True)
+                bars = history['columns'] if 'columns' in history else history.get('data') or []
+                summary = WEEK52_SUMMARIES.seed(symbol, lookback_days, bars)
+            except Exception as exc:
+                return False, {
+                    'type': filter_type,
+                    'field': base_field,
+                    'error': f'Failed to fetch history for 52-week calculation: {exc}'
+                }
+
+    if summary.high is None or summary.low is None:
+        return False, {
+            'type': filter_type,
+            'field': base_field,
+            'error': 'No data available in 52-week lookback window'
+        }
+
+    high_52w = float(summary.high)
+    low_52w = float(summary.low)
+
+    current_price = float(df[base_field].iloc[spec.idx])
+
+    if metric == 'distance_from_high_pct':
+        if high_52w == 0:
+            current_value = 0.0
+        else:
+            current_value = ((high_52w - current_price) / high_52w) * 100.0
+    elif metric == 'distance_from_low_pct':
+        if low_52w == 0:
+            current_value = 0.0
+        else:
+            current_value = ((current_price - low_52w) / low_52w) * 100.0
+    else:
+        raise ValueError(f"Unsupported metric for price_52week filter: {metric}")
+
+    compare_value = spec.value
+    passed = spec.condition(current_value, compare_value)
+
+    return passed, {
+        'type': filter_type,
+        'field': base_field,
+        'metric': metric,
+        'current_value': current_value,
+        'compare_value': compare_value,
+        'operator': spec.operator,
+        'lookback_days': lookback_days,
+        'high_52w': high_52w,
+        'low_52w': low_52w,
+        'passed': passed
+    }
+
+
+def evaluate_single_filter(symbol: str, data_frames: Dict[str, pd.DataFrame], filter_config: Dict[str, Any],
+                           spec: Optional[_FilterSpec] = None) -> tuple:
     """
     Evaluate a single filter condition on stock data.
     Returns (passed: bool, details: dict)
+
+    ``spec`` is the compiled filter from the scan plan; it is compiled here
+    when omitted, so one-off callers can pass just the config.
     """
-    
-    filter_type = filter_config.get('type', 'price')
-    expression = filter_config.get('expression')
-    
+    if spec is None:
+        spec = _compile_filter(filter_config)
+
+    filter_type = spec.filter_type
+    expression = spec.expression
+
     # Get the index position (0 = latest, 1 = previous day, etc.)
-    offset_val = filter_config.get('offset', 0)
-    offset = _parse_offset(offset_val)
-    idx = -(offset + 1)
-    prev_idx = -(offset + 2)
-    
+    offset = spec.offset
+    idx = spec.idx
+    prev_idx = spec.prev_idx
+
     # Resolve DataFrame for LHS
-    lhs_timeframe = filter_config.get('timeframe', 'daily')
+    lhs_timeframe = spec.timeframe
     df = data_frames.get(lhs_timeframe)
     if df is None:
         return False, {'error': f"Timeframe '{lhs_timeframe}' data not found"}
@@ -1963,7 +5102,7 @@ def evaluate_single_filter(symbol: str, data_frames: Dict[str, pd.DataFrame], fi
             # AST evaluation currently assumes single DF (daily or primary).
             # To support multi-timeframe AST, evaluate_ast needs update.
             # Now passing data_frames!
-            result = evaluate_ast(expression, data_frames, idx)
+            result = _evaluate_expression_at(spec, data_frames, idx)
             # In AST mode, result > 0 is True (passed), 0 is False (failed)
             passed = bool(result)
             return passed, {
@@ -1975,12 +5114,15 @@ def evaluate_single_filter(symbol: str, data_frames: Dict[str, pd.DataFrame], fi
         except Exception as e:
             return False, {'error': str(e)}
 
-    field = filter_config.get('field', 'close')
-    operator = filter_config.get('operator', 'gt')
-    value = filter_config.get('value')
+    field = spec.field
+    operator = spec.operator
+    value = spec.value
     # Default time_period used if not overriden by field name logic
-    time_period = filter_config.get('time_period', 14)
+    time_period = spec.time_period
     
+    if filter_type == 'price_52week':
+        return _evaluate_price_52week(symbol, data_frames, df, spec)
+
     # Calculate LHS Value
     if filter_type == 'indicator':
          # Dynamic indicator calculation
@@ -2181,12 +5323,12 @@ def evaluate_single_filter(symbol: str, data_frames: Dict[str, pd.DataFrame], fi
                         'note': 'Static data detected, fell back to <'
                      }
 
-            passed = evaluate_condition(
-                current_value, compare_value, operator,
+            passed = spec.condition(
+                current_value, compare_value,
                 previous_value, previous_compare
             )
         else:
-            passed = evaluate_condition(current_value, compare_value, operator)
+            passed = spec.condition(current_value, compare_value)
         
         return passed, {
             'type': filter_type,
@@ -2221,12 +5363,12 @@ def evaluate_single_filter(symbol: str, data_frames: Dict[str, pd.DataFrame], fi
             else:
                 previous_compare = compare_value # Static value doesn't change
             
-            passed = evaluate_condition(
-                current_value, compare_value, operator,
+            passed = spec.condition(
+                current_value, compare_value,
                 previous_value, previous_compare
             )
         else:
-            passed = evaluate_condition(current_value, compare_value, operator)
+            passed = spec.condition(current_value, compare_value)
         
         return passed, {
             'type': filter_type,
@@ -2261,7 +5403,7 @@ def evaluate_single_filter(symbol: str, data_frames: Dict[str, pd.DataFrame], fi
         else:
             # Direct volume comparison
             compare_value = value
-            passed = evaluate_condition(current_volume, compare_value, operator)
+            passed = spec.condition(current_volume, compare_value)
             
             return passed, {
                 'type': filter_type,
@@ -2292,7 +5434,7 @@ def evaluate_single_filter(symbol: str, data_frames: Dict[str, pd.DataFrame], fi
         current_value = calculate_percentage_change(current_price, previous_price)
         compare_value = value
 
-        passed = evaluate_condition(current_value, compare_value, operator)
+        passed = spec.condition(current_value, compare_value)
 
         return passed, {
             'type': filter_type,
@@ -2321,7 +5463,7 @@ def evaluate_single_filter(symbol: str, data_frames: Dict[str, pd.DataFrame], fi
         current_value = calculate_percentage_change(current_volume, previous_volume)
         compare_value = value
 
-        passed = evaluate_condition(current_value, compare_value, operator)
+        passed = spec.condition(current_value, compare_value)
 
         return passed, {
             'type': filter_type,
@@ -2399,7 +5541,7 @@ def evaluate_single_filter(symbol: str, data_frames: Dict[str, pd.DataFrame], fi
             current_value = float(metric_val)
             compare_value = float(value)
             
-            passed = evaluate_condition(current_value, compare_value, operator)
+            passed = spec.condition(current_value, compare_value)
             
             return passed, {
                 'type': filter_type,
@@ -2432,7 +5574,7 @@ def evaluate_single_filter(symbol: str, data_frames: Dict[str, pd.DataFrame], fi
         current_value = calculate_percentage_change(current_open, previous_close)
         compare_value = value if value is not None else 0.0
 
-        passed = evaluate_condition(current_value, compare_value, operator)
+        passed = spec.condition(current_value, compare_value)
 
         return passed, {
             'type': filter_type,
@@ -2464,73 +5606,6 @@ def evaluate_single_filter(symbol: str, data_frames: Dict[str, pd.DataFrame], fi
 
         return passed, details
     
-    elif filter_type == 'price_52week':
-        base_field = field or 'close'
-        lookback_days = int(filter_config.get('lookback_days', 252))
-        metric = filter_config.get('metric', 'distance_from_high_pct')
-
-        try:
-            full_data = _fetch_stock_data_core(symbol, "daily", "full")
-        except Exception as exc:
-            return False, {
-                'type': filter_type,
-                'field': base_field,
-                'error': f'Failed to fetch full history for 52-week calculation: {exc}'
-            }
-
-        df_full = pd.DataFrame(full_data.get('data', []))
-        if df_full.empty or 'high' not in df_full.columns or 'low' not in df_full.columns:
-            return False, {
-                'type': filter_type,
-                'field': base_field,
-                'error': 'Insufficient OHLC data for 52-week calculation'
-            }
-
-        df_full['date'] = pd.to_datetime(df_full['date'])
-        df_full = df_full.set_index('date').sort_index()
-        df_lookback = df_full.tail(lookback_days)
-
-        if df_lookback.empty:
-            return False, {
-                'type': filter_type,
-                'field': base_field,
-                'error': 'No data available in 52-week lookback window'
-            }
-
-        high_52w = float(df_lookback['high'].max())
-        low_52w = float(df_lookback['low'].min())
-
-        current_price = float(df[base_field].iloc[idx])
-
-        if metric == 'distance_from_high_pct':
-            if high_52w == 0:
-                current_value = 0.0
-            else:
-                current_value = ((high_52w - current_price) / high_52w) * 100.0
-        elif metric == 'distance_from_low_pct':
-            if low_52w == 0:
-                current_value = 0.0
-            else:
-                current_value = ((current_price - low_52w) / low_52w) * 100.0
-        else:
-            raise ValueError(f"Unsupported metric for price_52week filter: {metric}")
-
-        compare_value = value
-        passed = evaluate_condition(current_value, compare_value, operator)
-
-        return passed, {
-            'type': filter_type,
-            'field': base_field,
-            'metric': metric,
-            'current_value': current_value,
-            'compare_value': compare_value,
-            'operator': operator,
-            'lookback_days': lookback_days,
-            'high_52w': high_52w,
-            'low_52w': low_52w,
-            'passed': passed
-        }
-    
     elif filter_type == 'function':
         func_name = field.lower()
         operator = filter_config.get('operator', 'gt')
@@ -2584,7 +5659,7 @@ def evaluate_single_filter(symbol: str, data_frames: Dict[str, pd.DataFrame], fi
     return False, {'error': 'Invalid filter type'}
 
 
-@mcp.tool()
+@_async_tool
 def load_symbols_from_csv(
     csv_file_path: str,
     symbol_column: str = "symbol",
@@ -2661,7 +5736,7 @@ def load_symbols_from_csv(
         }
 
 
-@mcp.tool()
+@_async_tool
 def get_cached_symbols() -> Dict[str, Any]:
     """
     Get all cached symbols.
@@ -2682,7 +5757,7 @@ def get_cached_symbols() -> Dict[str, Any]:
     }
 
 
-@mcp.tool()
+@_async_tool
 def run_preset_scan(
     preset_name: str,
     symbols: List[str],
@@ -2794,7 +5869,7 @@ def run_preset_scan(
                     filter_item[key] = val
     
     # Run the scan
-    scan_result = _scan_stocks_core(symbols, filters, filter_logic)
+    scan_result = _cached_scan(symbols, filters, filter_logic)
     
     # Add preset information
     scan_result['preset_name'] = preset_name
@@ -3386,7 +6461,7 @@ Consider:
 
 
 
-@mcp.tool()
+@_async_tool
 def parse_natural_language_query(query: str) -> Dict[str, Any]:
     """Parse a natural language query into a list of filter configurations (AST).
 
@@ -3676,7 +6751,7 @@ def parse_natural_language_query(query: str) -> Dict[str, Any]:
 # HEALTH CHECK TOOL
 # ============================================================================
 
-@mcp.tool()
+@_async_tool
 def health_check() -> Dict[str, Any]:
     """Check the health status of the MCP server and its dependencies.
 
@@ -3687,6 +6762,9 @@ def health_check() -> Dict[str, Any]:
         Dictionary containing:
         - status: Overall health status ('healthy' or 'degraded')
         - redis: Redis connection status
+        - local_cache: In-process cache tier usage and hit rate
+        - indicator_streams: Streamed indicator states kept for repeated scans
+        - tools: Tool threads, per-tool concurrency limits and running calls
         - api: API connectivity status
         - version: Server version
         - timestamp: Current server time
@@ -3700,7 +6778,7 @@ def health_check() -> Dict[str, Any]:
     
     # Check Redis
     try:
-        if CACHE_ENABLED:
+        if _cache_available():
             redis_client.ping()
             health['components']['redis'] = {'status': 'connected'}
         else:
@@ -3708,6 +6786,16 @@ def health_check() -> Dict[str, Any]:
     except Exception as e:
         health['components']['redis'] = {'status': 'error', 'message': str(e)}
         health['status'] = 'degraded'
+
+    health['components']['local_cache'] = {
+        'status': 'enabled' if CACHE_ENABLED and LOCAL_CACHE.max_bytes > 0 else 'disabled',
+        **LOCAL_CACHE.stats(),
+    }
+    health['components']['indicator_streams'] = {
+        'status': 'enabled' if INDICATOR_STREAMS.max_streams > 0 else 'disabled',
+        **INDICATOR_STREAMS.stats(),
+    }
+    health['components']['tools'] = _tool_stats()
     
     # Check API connectivity
     try:
@@ -3729,13 +6817,42 @@ if __name__ == "__main__":
     logger.info("Stock Scanner MCP Server v2.0.0")
     logger.info("=" * 60)
     logger.info(f"API URL: {API_BASE_URL}")
-    logger.info(f"Redis Cache: {'Enabled' if CACHE_ENABLED else 'Disabled'}")
+    logger.info(f"Redis Cache: {REDIS_URL} (connected on first use)")
     logger.info(f"Log Level: {LOG_LEVEL}")
     logger.info("=" * 60)
+
+    parser = argparse.ArgumentParser(description="Stock Scanner MCP Server")
+    parser.add_argument('--daemon', action='store_true',
+                        help='Stay running and serve tools over local HTTP (or --socket) instead of stdio')
+    parser.add_argument('--host', default=os.getenv('MCP_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('MCP_PORT', '8000')))
+    parser.add_argument('--socket', default=os.getenv('MCP_DAEMON_SOCKET'), help='Unix socket path for --daemon')
+    args = parser.parse_args()
     
     try:
         # Run the server
-        mcp.run()
+        if args.daemon:
+            # Stateless JSON responses let run_tool.py forward a call with a
+            # single POST, without an MCP session handshake.
+            uvicorn_config = None
+            if args.socket:
+                if os.path.exists(args.socket):
+                    os.unlink(args.socket)
+                uvicorn_config = {'uds': args.socket}
+            logger.info(f"Daemon mode: {args.socket or f'http://{args.host}:{args.port}/mcp'}")
+            # A long-lived process connects up front so the first call finds a warm cache
+            _cache_available()
+            mcp.run(
+                transport='http',
+                host=args.host,
+                port=args.port,
+                path='/mcp',
+                json_response=True,
+                stateless_http=True,
+                uvicorn_config=uvicorn_config,
+            )
+        else:
+            mcp.run()
     except KeyboardInterrupt:
         logger.info("\nServer stopped by user")
     except Exception as e:
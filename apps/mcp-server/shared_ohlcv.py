@@ -0,0 +1,117 @@
+"""OHLCV series of many symbols packed into one shared memory block.
+
+A scan split across worker processes hands them the bars it prefetched
+through ``multiprocessing.shared_memory`` instead of pickling a DataFrame
+per symbol. The block holds six columns back to back, each ``total`` slots
+wide: ``date`` (int64 nanoseconds), then ``open``, ``high``, ``low``,
+``close`` and ``volume`` (float64). Within every column the series follow
+one another, and the index maps a key to its ``(start, stop)`` slots.
+
+The creating process owns the block and must ``unlink`` it; workers
+``attach`` with a small picklable handle (block name, total, index) and get
+read-only column views, laid out like ``ohlcv_codec.decode_ohlcv`` output.
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+COLUMNS = ('date', 'open', 'high', 'low', 'close', 'volume')
+PRICE_COLUMNS = COLUMNS[1:]
+SLOT_BYTES = 8
+
+Handle = Tuple[str, int, Dict[Any, Tuple[int, int]]]
+
+
+def _attach_block(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Workers share the creator's resource tracker, which already knows the name
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedOHLCV:
+    """Columns of many OHLCV series in one shared memory block."""
+
+    def __init__(self, block: shared_memory.SharedMemory, total: int, index: Dict[Any, Tuple[int, int]]):
+        self._block = block
+        self.total = total
+        self.index = index
+
+    @classmethod
+    def create(cls, series: Dict[Any, Dict[str, np.ndarray]]) -> 'SharedOHLCV':
+        """Copy ``series`` (key -> columns with a datetime64 ``date``) into a new block."""
+        index: Dict[Any, Tuple[int, int]] = {}
+        total = 0
+        for key, columns in series.items():
+            count = len(columns['date'])
+            index[key] = (total, total + count)
+            total += count
+        block = shared_memory.SharedMemory(create=True, size=max(len(COLUMNS) * SLOT_BYTES * total, 1))
+        shared = cls(block, total, index)
+        arrays = None
+        try:
+            arrays = shared._arrays(writeable=True)
+            for key, columns in series.items():
+                start, stop = index[key]
+                arrays[0][start:stop] = np.asarray(columns['date']).astype('datetime64[ns]').view('int64')
+                for column, name in enumerate(PRICE_COLUMNS, start=1):
+                    arrays[column][start:stop] = columns[name]
+        except BaseException:
+            arrays = None
+            shared.close()
+            shared.unlink()
+            raise
+        return shared
+
+    @classmethod
+    def attach(cls, handle: Handle) -> 'SharedOHLCV':
+        """Map the block a ``handle`` refers to (in another process)."""
+        name, total, index = handle
+        return cls(_attach_block(name), total, index)
+
+    def handle(self, keys: Optional[Iterable[Any]] = None) -> Handle:
+        """Picklable reference to the block, limited to ``keys`` if given."""
+        if keys is None:
+            index = dict(self.index)
+        else:
+            index = {key: self.index[key] for key in keys if key in self.index}
+        return self._block.name, self.total, index
+
+    def _arrays(self, writeable: bool = False) -> List[np.ndarray]:
+        arrays = []
+        for column in range(len(COLUMNS)):
+            arr = np.frombuffer(self._block.buf, dtype='<i8' if column == 0 else '<f8', count=self.total,
+                                offset=column * SLOT_BYTES * self.total)
+            arr.flags.writeable = writeable
+            arrays.append(arr)
+        return arrays
+
+    def columns(self, key: Any) -> Optional[Dict[str, np.ndarray]]:
+        """Read-only views of one series' columns, or None if it is not in the block."""
+        slots = self.index.get(key)
+        if slots is None:
+            return None
+        start, stop = slots
+        arrays = self._arrays()
+        columns = {'date': arrays[0][start:stop].view('datetime64[ns]')}
+        for column, name in enumerate(PRICE_COLUMNS, start=1):
+            columns[name] = arrays[column][start:stop]
+        return columns
+
+    def close(self) -> None:
+        """Unmap the block; column views handed out must be gone by now."""
+        try:
+            self._block.close()
+        except BufferError:
+            # Views only reachable from reference cycles (e.g. a raised error's traceback)
+            gc.collect()
+            self._block.close()
+
+    def unlink(self) -> None:
+        self._block.unlink()
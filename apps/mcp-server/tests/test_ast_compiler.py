@@ -0,0 +1,191 @@
+"""Parity tests for compile_ast against the evaluate_ast interpreter."""
+from __future__ import annotations
+
+import math
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import server
+
+
+def attr(field: str, **extra: Any) -> Dict[str, Any]:
+    return {"type": "attribute", "field": field, **extra}
+
+
+def ind(field: str, period: int, **extra: Any) -> Dict[str, Any]:
+    return {"type": "indicator", "field": field, "time_period": period, **extra}
+
+
+def const(value: float) -> Dict[str, Any]:
+    return {"type": "constant", "value": value}
+
+
+def binary(op: str, left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": "binary", "operator": op, "left": left, "right": right}
+
+
+EXPRESSIONS = [
+    const(7),
+    attr("close"),
+    attr("high", offset=3),
+    attr(ind("SMA", 5), offset=2),
+    ind("RSI", 14),
+    ind("rsi_9", 0, offset=1),
+    ind("MACD_HIST", 0),
+    binary("+", attr("close"), const(1)),
+    binary("-", attr("close"), attr("open", offset=1)),
+    binary("*", attr("volume"), const(0.5)),
+    binary("/", attr("close"), binary("-", attr("close"), attr("close"))),  # division by zero -> 0
+    binary("/", ind("SMA", 20), attr("close")),  # NaN warm-up bars
+    *[binary(op, attr("close"), ind("SMA", 10)) for op in (">", "lt", ">=", "lte", "==", "ne")],
+    binary("==", attr("close"), attr("close")),
+    binary("AND", binary(">", attr("close"), const(100)), binary("<", ind("RSI", 14), const(70))),
+    binary("||", ind("SMA", 30), const(0)),
+    binary("crossed_above", ind("EMA", 5), ind("SMA", 20)),
+    binary("crossed_below", attr("close"), ind("SMA", 5, offset=1)),
+    binary("crossed_above", attr("close"), const(120)),
+    {"type": "unary", "operator": "NOT", "operand": binary(">", attr("close"), ind("EMA", 10))},
+    {"type": "unary", "operator": "-", "operand": ind("ATR", 14)},
+    {"type": "function", "name": "Abs", "args": [binary("-", attr("close"), attr("open"))]},
+    {"type": "function", "name": "min", "args": [ind("SMA", 20), attr("low"), const(120)]},
+    {"type": "function", "name": "MAX", "args": [attr("high"), ind("SMA", 20)]},
+    binary(">", attr("close", timeframe="weekly"), attr("close", offset=1)),
+]
+
+
+@pytest.fixture(scope="module")
+def data_frames() -> Dict[str, pd.DataFrame]:
+    daily = server._records_to_frame(server.MOCK_DATA_PROVIDER.fetch_ohlc("AAPL", "daily")["data"][-80:])
+    weekly = server._records_to_frame(server.MOCK_DATA_PROVIDER.fetch_ohlc("AAPL", "weekly")["data"][-30:])
+    return {"daily": daily, "weekly": weekly}
+
+
+def _interpret(node: Dict[str, Any], data_frames: Dict[str, pd.DataFrame], idx: int):
+    try:
+        return server.evaluate_ast(node, data_frames, idx)
+    except Exception:
+        return None
+
+
+def _same(a: float, b: float) -> bool:
+    return (math.isnan(a) and math.isnan(b)) or a == b
+
+
+@pytest.mark.parametrize("node", EXPRESSIONS)
+def test_compiled_series_matches_interpreter_at_every_bar(node, data_frames):
+    values = server.compile_ast(node)(data_frames)
+    n_bars = len(data_frames["daily"])
+
+    for idx in range(-n_bars - 2, 0):
+        expected = _interpret(node, data_frames, idx)
+        if values.ndim == 0:
+            assert expected is not None and _same(float(values), expected)
+        elif idx >= -len(values):
+            assert expected is not None, f"compiled value at {idx} where the interpreter fails"
+            assert _same(float(values[idx]), expected), idx
+        else:
+            assert expected is None, f"interpreter value at {idx} missing from compiled result"
+
+
+def test_builtin_min_max_nan_semantics():
+    frames = {"daily": pd.DataFrame({"close": [np.nan, 1.0], "open": [2.0, np.nan]})}
+    node_min = {"type": "function", "name": "MIN", "args": [attr("close"), attr("open")]}
+    node_max = {"type": "function", "name": "MAX", "args": [attr("open"), attr("close")]}
+
+    for node in (node_min, node_max):
+        values = server.compile_ast(node)(frames)
+        for idx in (-2, -1):
+            assert _same(float(values[idx]), server.evaluate_ast(node, frames, idx))
+
+
+def test_panel_evaluation_matches_per_symbol_interpreter():
+    symbols = ["AAPL", "MSFT", "NVDA"]
+    columns = {
+        pos: server._records_to_columns(server.MOCK_DATA_PROVIDER.fetch_ohlc(symbol, "daily")["data"][-60:])
+        for pos, symbol in enumerate(symbols)
+    }
+    panel = server._build_panels("daily", columns)[0]
+    node = binary("AND", binary("crossed_above", ind("EMA", 5), ind("SMA", 10)),
+                  binary(">", attr("volume"), const(0)))
+
+    values = server.compile_ast(node)({"daily": panel.frame})
+
+    assert values.shape[1] == len(symbols)
+    for pos, symbol in enumerate(symbols):
+        frames = {"daily": server._records_to_frame(server.MOCK_DATA_PROVIDER.fetch_ohlc(symbol, "daily")["data"][-60:])}
+        for idx in range(-len(values), 0):
+            assert values[idx, pos] == server.evaluate_ast(node, frames, idx)
+
+
+def test_unsupported_expressions_fall_back_to_interpreter(data_frames):
+    look_ahead = binary(">", attr("close", offset=-1), const(0))
+    unknown = binary("^", attr("close"), const(2))
+
+    with pytest.raises(server._ASTNotVectorizable):
+        server.compile_ast(look_ahead)
+    assert server._try_compile_ast(unknown) is None
+
+    spec = server._compile_filter({"expression": look_ahead})
+    assert spec.compiled_expression is None
+    assert server.evaluate_single_filter("AAPL", data_frames, {"expression": look_ahead})[0] is True
+    passed, detail = server.evaluate_single_filter("AAPL", data_frames, {"expression": unknown})
+    assert passed is False and detail == {"error": "Unknown binary operator: ^"}
+
+
+def test_optimize_ast_folds_constants_and_interns_subtrees():
+    sma = ind("SMA", 50)
+    expression = binary("AND",
+                        binary(">", attr("close"), binary("*", const(2), const(1.5))),
+                        binary(">", attr(dict(sma), offset=1), {"type": "unary", "operator": "-", "operand": const(4)}))
+    other = binary("<", ind("SMA", 50), binary("^", const(1), const(2)))
+    original = repr(expression)
+
+    interned: Dict[str, Any] = {}
+    optimized = server.optimize_ast(expression, interned)
+    optimized_other = server.optimize_ast(other, interned)
+
+    assert repr(expression) == original
+    assert optimized["left"]["right"] == {"type": "constant", "value": 3.0}
+    assert optimized["right"]["right"] == {"type": "constant", "value": -4.0}
+    assert optimized_other["right"]["type"] == "binary"  # unknown operator is left for the interpreter
+    assert optimized["right"]["left"]["field"] is optimized_other["left"]
+
+
+@pytest.mark.parametrize("node", EXPRESSIONS)
+def test_optimized_expressions_match_interpreter(node, data_frames):
+    optimized = server.compile_ast(server.optimize_ast(node), {})(data_frames)
+    plain = server.compile_ast(node)(data_frames)
+
+    assert optimized.shape == plain.shape
+    assert np.array_equal(optimized, plain, equal_nan=True)
+
+
+def test_shared_subexpressions_compute_once_per_data_frames(data_frames, monkeypatch):
+    calls = []
+    real = server._get_indicator_series
+    monkeypatch.setattr(server, "_get_indicator_series",
+                        lambda df, field, *args, **kwargs: calls.append(field) or real(df, field, *args, **kwargs))
+    filters = [
+        {"expression": binary(">", attr("close"), ind("SMA", 50))},
+        {"expression": binary("crossed_above", ind("SMA", 10), ind("SMA", 50))},
+        {"expression": binary("<", binary("-", attr("close"), ind("SMA", 50)), binary("*", const(2), const(3)))},
+    ]
+    plan = server._compile_scan_plan(filters)
+
+    results = [server.evaluate_single_filter("AAPL", data_frames, f, spec) for f, spec in zip(filters, plan.filters)]
+
+    assert sorted(calls) == ["SMA", "SMA"]
+    assert results == [server.evaluate_single_filter("AAPL", data_frames, f) for f in filters]
+
+
+def test_equivalent_indicator_requests_share_a_signature():
+    def signature(field, time_period=14, **params):
+        return server._indicator_signature(*server._resolve_indicator_field(field, time_period), params)
+
+    assert signature("sma_50") == signature("SMA", 50, step=0.1) == ("SMA", 50, ())
+    assert signature("MACD_HIST", 20, fast=12) == signature("MACD_HIST", value_unused=1) == (
+        "MACD_HIST", None, (("fast", 12), ("slow", 26), ("signal", 9))
+    )
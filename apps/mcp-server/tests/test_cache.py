@@ -0,0 +1,115 @@
+"""Tests for the in-process LRU tier in front of Redis."""
+from __future__ import annotations
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import server
+
+
+def test_local_cache_is_bounded_by_bytes():
+    cache = server.LocalLRUCache(max_bytes=100)
+    cache.put("a", "A", ttl=60, size=40)
+    cache.put("b", "B", ttl=60, size=40)
+    assert cache.get("a") == "A"  # "b" is now least recently used
+
+    cache.put("c", "C", ttl=60, size=40)
+    cache.put("huge", "H", ttl=60, size=101)
+
+    assert cache.get("b") is None
+    assert cache.get("huge") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+    assert cache.stats() == {
+        "entries": 2, "bytes": 80, "max_bytes": 100,
+        "hits": 3, "misses": 2, "evictions": 1, "hit_rate": 0.6,
+    }
+
+
+def test_local_cache_honours_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(server.time, "monotonic", lambda: now[0])
+    cache = server.LocalLRUCache(max_bytes=100)
+    cache.put("k", {"v": 1}, ttl=300, size=10)
+    cache.put("expired", 1, ttl=0, size=10)
+
+    now[0] += 299
+    assert cache.get("k") == {"v": 1}
+    now[0] += 1
+    assert cache.get("k") is None
+    assert cache.get("expired") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_local_cache_hits_do_not_alias_stored_values(monkeypatch):
+    class WriteOnlyRedis:
+        def setex(self, key, ttl, value):
+            pass
+
+    monkeypatch.setattr(server, "redis_client", WriteOnlyRedis())
+    monkeypatch.setattr(server, "CACHE_ENABLED", True)
+    monkeypatch.setattr(server, "LOCAL_CACHE", server.LocalLRUCache(max_bytes=10_000))
+    monkeypatch.setattr(server, "CACHE_OHLCV_FORMAT", "json")
+    original = {"symbol": "AAPL", "data": [{"date": "2024-01-02", "close": 1.0}]}
+
+    value = {"symbol": "AAPL", "data": [dict(original["data"][0])]}
+    server.set_in_cache("generic", value, 60)
+    server.set_stock_data_in_cache("stock", value, 60)
+    value["data"].clear()
+    for hit in (server.get_from_cache("generic"), server.get_stock_data_from_cache("stock"),
+                server.get_many_stock_data_from_cache(["stock"])["stock"]):
+        assert hit == original
+        hit["data"][0]["close"] = 2.0
+
+    assert server.get_from_cache("generic") == server.get_stock_data_from_cache("stock") == original
+
+
+def test_health_check_reports_local_cache(monkeypatch):
+    monkeypatch.setattr(server, "_api_request", lambda *args, **kwargs: {})
+    health = server.health_check()
+
+    assert set(health["components"]["local_cache"]) >= {"status", "hits", "misses", "hit_rate", "bytes"}
+
+
+def test_import_defers_heavy_modules_and_redis():
+    code = (
+        "import sys, server; "
+        "loaded = [m for m in ('pandas', 'numpy', 'requests', 'redis') if type(sys.modules[m]).__name__ == 'module']; "
+        "print(loaded, server.redis_client)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=Path(server.__file__).parent,
+        capture_output=True, text=True, check=True,
+    )
+    assert out.stdout.strip() == "[] None"
+
+
+def test_redis_connects_on_first_use_and_reconnects_in_background(monkeypatch):
+    attempts = []
+
+    class FakeClient:
+        def ping(self):
+            if len(attempts) < 3:
+                raise server.redis.ConnectionError("refused")
+            return True
+
+    def from_url(url, **kwargs):
+        attempts.append(kwargs["socket_connect_timeout"])
+        return FakeClient()
+
+    monkeypatch.setattr(server.redis, "from_url", from_url)
+    monkeypatch.setattr(server, "redis_client", None)
+    monkeypatch.setattr(server, "CACHE_ENABLED", False)
+    monkeypatch.setattr(server, "REDIS_RECONNECT_INTERVAL", 0.01)
+    monkeypatch.setattr(server, "_redis_state", {"attempted": False, "reconnecting": False})
+
+    assert server._cache_available() is False
+    deadline = time.monotonic() + 5
+    while not server.CACHE_ENABLED and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert server.CACHE_ENABLED is True
+    assert isinstance(server.redis_client, FakeClient)
+    assert attempts == [server.REDIS_CONNECT_TIMEOUT] * 3
+    assert server._cache_available() is True
@@ -0,0 +1,149 @@
+"""Tests for the memory-mapped candle store and its use as a history source."""
+from __future__ import annotations
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+import candle_store
+import server
+
+
+def _columns(n, start="2024-01-01", seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.standard_normal(n).cumsum()
+    return {"date": np.arange(np.datetime64(start), np.datetime64(start) + n, dtype="datetime64[D]"),
+            "open": close - 0.5, "high": close + 1, "low": close - 1, "close": close,
+            "volume": rng.integers(100, 1000, n).astype(float)}
+
+
+def _head(columns, start, stop):
+    return {col: values[start:stop] for col, values in columns.items()}
+
+
+def _assert_columns(actual, expected):
+    assert np.array_equal(actual["date"], expected["date"].astype("datetime64[s]"))
+    for col in candle_store.PRICE_COLUMNS:
+        assert np.array_equal(actual[col], expected[col]), col
+
+
+def test_append_and_slice_zero_copy(tmp_path):
+    store = candle_store.CandleStore(str(tmp_path))
+    bars = _columns(300)
+
+    assert store.append("daily", {"AAPL": _head(bars, 0, 200), "MSFT": _columns(50, seed=1)}) == 250
+    assert store.append("daily", {"AAPL": _head(bars, 150, 300)}) == 100  # overlap is skipped
+
+    _assert_columns(store.read("daily", "AAPL"), bars)
+    tail = store.read("daily", "AAPL", bars=20)
+    _assert_columns(tail, _head(bars, 280, 300))
+    _assert_columns(store.read("daily", "AAPL", since=np.datetime64("2024-10-01")),
+                    _head(bars, int(np.searchsorted(bars["date"], np.datetime64("2024-10-01"))), 300))
+    assert not tail["close"].flags.writeable and not tail["close"].flags.owndata
+    assert store.symbols("daily") == ["AAPL", "MSFT"] and store.read("daily", "NVDA") is None
+    assert store.info("daily", "AAPL")["count"] == 300
+
+
+def test_published_bars_never_change_under_readers(tmp_path):
+    writer = candle_store.CandleStore(str(tmp_path))
+    reader = candle_store.CandleStore(str(tmp_path))
+    bars = _columns(100)
+    writer.append("5min", {"AAPL": _head(bars, 0, 90)})
+    before = reader.read("5min", "AAPL")
+    snapshot = {col: values.copy() for col, values in before.items()}
+
+    forming = _head(bars, 89, 100)
+    forming["close"] = forming["close"].copy()
+    forming["close"][0] += 5  # the last stored bar is replaced, then ten bars are appended
+    assert writer.append("5min", {"AAPL": forming}) == 11
+    for _ in range(40):  # grow past the segment's capacity, moving it again
+        writer.append("5min", {"AAPL": {"date": [np.datetime64("2024-06-01") + len(reader.read("5min", "AAPL")["date"])],
+                                        "open": [1.0], "high": [1.0], "low": [1.0], "close": [1.0], "volume": [1.0]}})
+    writer.compact("5min")
+
+    for col, values in before.items():
+        assert np.array_equal(values, snapshot[col])
+    after = reader.read("5min", "AAPL")
+    assert len(after["close"]) == 140 and after["close"][89] == forming["close"][0]
+    assert np.array_equal(after["close"][:89], snapshot["close"][:89])
+    assert [path.name for path in tmp_path.glob("5min.*.bars")] == ["5min.1.bars"]
+
+
+def _append_worker(root, symbol, seed):
+    store = candle_store.CandleStore(root)
+    bars = _columns(200, seed=seed)
+    for start in range(0, 200, 10):
+        store.append("daily", {symbol: _head(bars, start, start + 10)})
+
+
+def test_concurrent_appends_from_processes(tmp_path):
+    try:
+        context = multiprocessing.get_context("fork")
+    except ValueError:
+        pytest.skip("fork start method unavailable")
+    workers = [context.Process(target=_append_worker, args=(str(tmp_path), f"SYM{i}", i)) for i in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+        assert worker.exitcode == 0
+
+    store = candle_store.CandleStore(str(tmp_path))
+    for i in range(4):
+        _assert_columns(store.read("daily", f"SYM{i}"), _columns(200, seed=i))
+
+
+class RangeProvider(server.StockDataProvider):
+    def __init__(self, records):
+        self.records = records
+        self.calls = []
+
+    def fetch_ohlc(self, symbol, interval="daily", outputsize="compact"):
+        self.calls.append(("full", symbol))
+        return {"symbol": symbol, "interval": interval, "data": self.records[:-5]}
+
+    def fetch_ohlc_since(self, symbol, interval, since):
+        day = str(np.datetime64(since, "s").astype("datetime64[D]"))
+        self.calls.append(("since", day))
+        return [r for r in self.records if r["date"] >= day]
+
+
+@pytest.fixture
+def stored(tmp_path, monkeypatch):
+    records = server._stock_data_records({"columns": _columns(300)}, "daily")
+    provider = RangeProvider(records)
+    monkeypatch.setattr(server, "CANDLE_STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(server, "_candle_store_state", {"store": None})
+    monkeypatch.setattr(server, "STOCK_DATA_PROVIDER", provider)
+    monkeypatch.setattr(server, "get_stock_data_from_cache", lambda key, as_columns=False: None)
+    monkeypatch.setattr(server, "set_stock_data_in_cache", lambda *args: None)
+    return records, provider
+
+
+def test_ingest_then_serve_scans_and_52_week_lookbacks_from_store(stored, monkeypatch):
+    records, provider = stored
+
+    assert server.ingest_candles(["AAPL"]) == {"interval": "daily", "symbols": 1, "bars_written": 295, "failed": {}}
+    assert server.ingest_candles(["AAPL"])["bars_written"] == 5
+    assert provider.calls == [("full", "AAPL"), ("since", records[-7]["date"])]  # a day before the last stored bar
+
+    result = server._fetch_stock_data_core("AAPL", "daily", 120, as_columns=True)
+    assert len(provider.calls) == 2  # fresh store hit: no provider call
+    assert result["data_points"] == 120 and not result["columns"]["close"].flags.owndata
+    assert server._fetch_stock_data_core("AAPL", "daily", "compact")["data"] == records[-100:]
+
+    monkeypatch.setattr(server, "WEEK52_SUMMARIES", server.Week52SummaryStore(252))
+    config = {"type": "price_52week", "field": "close", "operator": "gt", "value": -100,
+              "metric": "distance_from_high_pct"}
+    frames = {"daily": server._records_to_frame(records[-30:])}
+    passed, detail = server.evaluate_single_filter("AAPL", frames, config)
+    assert passed is True and len(provider.calls) == 2
+    assert detail["high_52w"] == max(r["high"] for r in records[-252:])
+
+
+def test_ingest_requires_a_store_directory(monkeypatch):
+    monkeypatch.setattr(server, "CANDLE_STORE_DIR", "")
+    assert server._stored_stock_data("AAPL", "daily", "compact") is None
+    with pytest.raises(ValueError):
+        server.ingest_candles(["AAPL"])
@@ -0,0 +1,533 @@
+"""Parity tests for the columnar scan engine in _scan_stocks_core.
+
+Every scan is compared against a per-symbol reference that builds one
+DataFrame per symbol and calls evaluate_single_filter directly, which is
+how _scan_stocks_core evaluated filters before the columnar engine.
+"""
+from __future__ import annotations
+
+import copy
+from typing import Any, Dict, List
+
+import numpy as np
+import pytest
+
+import server
+
+
+REAL_FETCH_STOCK_DATA_UNCACHED = server._fetch_stock_data_uncached
+
+SYMBOLS = ["AAPL", "MSFT", "NVDA", "TSLA", "AMZN", "META", "SHORT", "TINY"]
+
+FILTER_SETS: List[List[Dict[str, Any]]] = [
+    [{"type": "price", "field": "close", "operator": "gt", "value": 150}],
+    [{"type": "indicator", "field": "RSI", "operator": "gt", "value": 50, "time_period": 14}],
+    [{"type": "indicator", "field": "rsi_9", "operator": "lt", "value": 45}],
+    [{"type": "indicator", "field": "SMA", "operator": "crossed_above", "value": 120, "time_period": 5}],
+    [{
+        "type": "indicator", "field": "EMA", "operator": "gt", "time_period": 10,
+        "value": {"type": "indicator", "field": "SMA", "time_period": 30},
+    }],
+    [{
+        "type": "indicator", "field": "EMA", "operator": "crossed_below", "time_period": 5,
+        "value": {"type": "indicator", "field": "SMA", "time_period": 20},
+    }],
+    [
+        {"type": "indicator", "field": "MACD_HIST", "operator": "gt", "value": 0},
+        {"type": "indicator", "field": "ADX", "operator": "gte", "value": 15, "time_period": 14},
+        {"type": "indicator", "field": "BB_WIDTH", "operator": "lt", "value": 0.2, "time_period": 20},
+    ],
+    [
+        {"type": "price", "field": "low", "operator": "lt", "value": 140,
+         "arithmeticOperator": "*", "arithmeticValue": 1.01},
+        {"type": "indicator", "field": "ATR", "operator": "between", "value": [1, 4], "time_period": 14},
+        {"type": "price", "field": "close", "operator": "gt", "value": 100, "offset": "3d_ago"},
+    ],
+    [
+        {"type": "indicator", "field": "SUPERTREND", "operator": "lt", "value": 150, "time_period": 10},
+        {"type": "indicator", "field": "PARABOLIC_SAR", "operator": "crossed_below", "step": 0.03,
+         "value": {"type": "indicator", "field": "close"}},
+    ],
+    [
+        {"expression": {
+            "type": "binary", "operator": "crossed_above",
+            "left": {"type": "indicator", "field": "EMA", "time_period": 5},
+            "right": {"type": "indicator", "field": "SMA", "time_period": 10, "offset": 1},
+        }},
+        {"expression": {
+            "type": "binary", "operator": "OR",
+            "left": {"type": "unary", "operator": "NOT", "operand": {
+                "type": "binary", "operator": "<",
+                "left": {"type": "function", "name": "abs", "args": [{
+                    "type": "binary", "operator": "-",
+                    "left": {"type": "attribute", "field": "close"},
+                    "right": {"type": "attribute", "field": "open", "offset": 2},
+                }]},
+                "right": {"type": "constant", "value": 1.5},
+            }},
+            "right": {"type": "binary", "operator": ">=",
+                      "left": {"type": "function", "name": "max", "args": [
+                          {"type": "indicator", "field": "RSI", "time_period": 14},
+                          {"type": "constant", "value": 40}]},
+                      "right": {"type": "constant", "value": 60}},
+        }, "offset": 1},
+    ],
+    # Not covered by the columnar path: must fall back per symbol.
+    [
+        {"type": "indicator", "field": "VWMA", "operator": "gt", "value": 100, "time_period": 10},
+        {"type": "price", "field": "close", "operator": "gt", "value": "abc"},
+        {"expression": {
+            "type": "binary", "operator": ">",
+            "left": {"type": "attribute", "field": "close"},
+            "right": {"type": "indicator", "field": "SMA", "time_period": 20},
+        }},
+    ],
+]
+
+
+@pytest.fixture
+def mock_market(monkeypatch):
+    """Serve deterministic mock candles of varying length without network access."""
+    lengths = {"SHORT": 40, "TINY": 1}
+
+    def fake_fetch(symbol: str, interval: str = "daily", outputsize: str = "compact", as_columns: bool = False) -> Dict[str, Any]:
+        result = server.MOCK_DATA_PROVIDER.fetch_ohlc(symbol, interval, outputsize)
+        data = result["data"][-lengths.get(symbol, 150):]
+        return {**result, "data": data, "data_points": len(data)}
+
+    def no_metrics(symbol: str) -> Dict[str, Any]:
+        raise ValueError("metrics unavailable in tests")
+
+    monkeypatch.setattr(server, "STOCK_DATA_PROVIDER", server.MOCK_DATA_PROVIDER)
+    monkeypatch.setattr(server, "_fetch_stock_data_core", fake_fetch)
+    monkeypatch.setattr(server, "_fetch_stock_data_uncached", fake_fetch)
+    monkeypatch.setattr(server, "_fetch_metrics_from_api", no_metrics)
+    return fake_fetch
+
+
+def _reference_scan(fetch, symbols: List[str], filters: List[Dict[str, Any]], logic: str) -> List[Dict[str, Any]]:
+    matched = []
+    for symbol in symbols:
+        data_frames = {"daily": server._records_to_frame(fetch(symbol)["data"])}
+        results, details = [], []
+        for filter_config in filters:
+            try:
+                passed, detail = server.evaluate_single_filter(symbol, data_frames, filter_config)
+            except Exception as exc:
+                passed, detail = False, {"error": str(exc)}
+            results.append(passed)
+            details.append(detail)
+        if (any(results) if logic == "OR" else all(results)):
+            df = data_frames["daily"]
+            matched.append({
+                "symbol": symbol,
+                "close": float(df["close"].iloc[-1]),
+                "volume": int(df["volume"].iloc[-1]),
+                "date": df.index[-1].strftime("%Y-%m-%d"),
+                "matched_filters": sum(results),
+                "total_filters": len(filters),
+                "filter_details": details,
+            })
+    return matched
+
+
+@pytest.mark.parametrize("filters", FILTER_SETS)
+@pytest.mark.parametrize("logic", ["AND", "OR"])
+def test_columnar_scan_matches_per_symbol_reference(mock_market, filters, logic):
+    result = server._scan_stocks_core(SYMBOLS, filters, logic, full_details=True)
+
+    assert result["matched_stocks"] == _reference_scan(mock_market, SYMBOLS, filters, logic)
+    assert result["total_scanned"] == len(SYMBOLS)
+    assert result["failed_stocks"] == []
+
+
+@pytest.mark.parametrize("filters", FILTER_SETS)
+@pytest.mark.parametrize("logic", ["AND", "OR"])
+def test_short_circuit_scan_keeps_matches(mock_market, filters, logic):
+    result = server._scan_stocks_core(SYMBOLS, filters, logic)
+    reference = _reference_scan(mock_market, SYMBOLS, filters, logic)
+
+    assert [m["symbol"] for m in result["matched_stocks"]] == [m["symbol"] for m in reference]
+    for match, expected in zip(result["matched_stocks"], reference):
+        if logic == "AND":
+            assert match == expected
+            continue
+        # OR stops at the first passing filter in plan order; the rest are skipped
+        for detail, expected_detail in zip(match["filter_details"], expected["filter_details"]):
+            assert detail == {"skipped": True, "passed": None} or detail == expected_detail
+        assert match["matched_filters"] == 1
+
+
+def test_plan_orders_filters_by_cost_and_selectivity():
+    filters = [
+        {"type": "indicator", "field": "ADX", "operator": "gt", "value": 25, "time_period": 14},
+        {"type": "price", "field": "close", "operator": "gt", "value": 10, "timeframe": "60min"},
+        {"type": "price", "field": "peRatio", "operator": "lt", "value": 30},
+        {"type": "price", "field": "close", "operator": "eq", "value": 10},
+        {"type": "price", "field": "close", "operator": "gt", "value": 10},
+    ]
+
+    plan = server._compile_scan_plan(filters, "AND")
+
+    assert [spec.needs_metrics for spec in plan.filters] == [False, False, True, False, False]
+    assert plan.filters[1].timeframes == ("60min",)
+    # Cheap, selective daily filters first; extra fetches and metrics last
+    assert plan.order[:2] == (3, 4)
+    assert plan.order.index(0) < plan.order.index(1) < plan.order.index(2)
+    assert server._compile_scan_plan(filters, "OR").order[0] == 4
+
+
+def test_lookback_planner_sizes_each_timeframe():
+    filters = [
+        {"type": "indicator", "field": "SMA", "operator": "gt", "value": 1, "time_period": 200, "offset": 2},
+        {"type": "indicator", "field": "EMA", "operator": "crossed_above", "time_period": 50,
+         "value": {"type": "indicator", "field": "SMA", "time_period": 10}, "timeframe": "weekly"},
+        {"type": "price_52week", "field": "close", "operator": "lt", "value": 5},
+        {"type": "indicator", "field": "RSI", "operator": "gt", "value": 50, "timeframe": "monthly"},
+        {"expression": {"type": "binary", "operator": ">",
+                        "left": {"type": "indicator", "field": "VWAP", "timeframe": "60min"},
+                        "right": {"type": "constant", "value": 1}}},
+    ]
+
+    plan = server._compile_scan_plan(filters)
+    outputsizes = dict(plan.outputsizes)
+
+    ema_horizon = server._smoothing_horizon(2 / 51)
+    assert dict(plan.filters[0].history) == {"daily": 202}
+    assert dict(plan.filters[1].history) == {"weekly": 1 + ema_horizon}
+    rsi_bars = 1 + server._smoothing_horizon(1 / 14)
+    # weekly and monthly are resampled from daily, so daily covers them too
+    assert dict(plan.resampled) == {"weekly": "daily", "monthly": "daily"}
+    assert outputsizes == {"daily": (rsi_bars + 1) * 23, "60min": "compact"}
+    assert server._compile_scan_plan(filters[:3]).outputsizes == (("daily", (2 + ema_horizon) * 5),)
+    assert dict(plan.filters[4].history)["60min"] is None
+
+
+@pytest.mark.parametrize("field, period", [("EMA", 20), ("RSI", 14), ("ATR", 14), ("ADX", 14), ("MACD_HIST", 0)])
+def test_warmup_bars_reproduce_full_history_values(field, period):
+    frame = server._records_to_frame(server.MOCK_DATA_PROVIDER.fetch_ohlc("AAPL", "daily")["data"])
+    long_frame = server.pd.concat([frame] * 3)
+    long_frame.index = server.pd.date_range("2000-01-01", periods=len(long_frame))
+    field_upper, time_period = server._resolve_indicator_field(field, period)
+    warmup = server._indicator_warmup(field_upper, time_period, {})
+
+    full = server._get_indicator_series(long_frame, field, period).iloc[-1]
+    trimmed = server._get_indicator_series(long_frame.iloc[-warmup:], field, period).iloc[-1]
+
+    assert warmup < len(long_frame)
+    assert abs(trimmed - full) <= 0.01 * max(abs(full), 1.0)
+
+
+def test_short_circuit_skips_fetches_for_rejected_symbols(mock_market, monkeypatch):
+    requested, metrics = [], []
+    real_prefetch = server._prefetch_stock_data
+    monkeypatch.setattr(server, "_prefetch_stock_data",
+                        lambda pairs, *args, **kwargs: requested.extend(pairs) or real_prefetch(pairs, *args, **kwargs))
+    monkeypatch.setattr(server, "_fetch_metrics_from_api",
+                        lambda symbol: metrics.append(symbol) or {"metric": {"peBasicExclExtraTTM": 20}})
+    filters = [
+        {"type": "indicator", "field": "SMA", "operator": "gt", "value": 1, "time_period": 5, "timeframe": "60min"},
+        {"type": "price", "field": "peRatio", "operator": "lt", "value": 30},
+        {"type": "price", "field": "close", "operator": "gt", "value": 150},
+    ]
+
+    result = server._scan_stocks_core(SYMBOLS, filters, "AND")
+    survivors = {symbol for symbol in SYMBOLS
+                 if mock_market(symbol)["data"][-1]["close"] > 150}
+
+    assert {m["symbol"] for m in result["matched_stocks"]} <= survivors
+    assert [symbol for symbol, tf in requested if tf == "daily"] == SYMBOLS
+    assert {symbol for symbol, tf in requested if tf == "60min"} <= survivors
+    assert set(metrics) <= survivors
+
+    requested.clear()
+    metrics.clear()
+    server._scan_stocks_core(SYMBOLS, filters, "AND", full_details=True)
+    assert {symbol for symbol, tf in requested if tf == "60min"} == set(SYMBOLS)
+
+
+def test_columnar_filter_returns_none_for_unsupported_filters(mock_market):
+    cols = {0: server._records_to_columns(mock_market("AAPL")["data"])}
+    panel = server._build_panels("daily", cols)[0]
+    weekly_expression = {"expression": {
+        "type": "binary", "operator": ">",
+        "left": {"type": "attribute", "field": "close", "timeframe": "weekly"},
+        "right": {"type": "constant", "value": 100},
+    }}
+
+    assert server._evaluate_filter_columnar(panel, FILTER_SETS[-1][0]) is None
+    assert server._evaluate_filter_columnar(panel, weekly_expression) is None
+    assert len(server._evaluate_filter_columnar(panel, FILTER_SETS[-1][2])) == 1
+    assert len(server._evaluate_filter_columnar(panel, FILTER_SETS[0][0])) == 1
+
+
+def test_scan_plan_is_compiled_once_and_immutable(mock_market, monkeypatch):
+    filters = [
+        {"type": "price", "field": "close", "operator": "gt", "value": 100, "offset": "2d_ago"},
+        {"type": "indicator", "field": "SMA", "operator": "crossed_above", "value": 120,
+         "time_period": 5, "timeframe": "weekly"},
+        {"type": "price_change", "field": "close", "operator": "gt", "value": 1, "lookback": 5},
+        {"type": "price", "field": "peRatio", "operator": "lt", "value": 30},
+    ]
+    plan = server._compile_scan_plan(filters, "or")
+
+    assert plan.timeframes == ("daily", "weekly")
+    assert plan.logic == "OR"
+    assert plan.needed_fields == {"close", "SMA", "peRatio"}
+    assert dict(plan.metric_sources)["peRatio"] == ("peBasicExclExtraTTM", "peRatio")
+    assert dict(plan.lookbacks) == {"daily": 6, "weekly": 2}
+    assert [(spec.offset, spec.idx, spec.is_crossover) for spec in plan.filters[:2]] == [(2, -3, False), (0, -1, True)]
+    assert plan.filters[0].condition(101, 100) and not plan.filters[0].condition(99, 100)
+    assert plan.filters[1].condition(121, 120, 119, 120)
+    assert not hasattr(plan, "__dict__") and not hasattr(plan.filters[0], "__dict__")
+    with pytest.raises(AttributeError):
+        plan.filters[0].offset = 5
+
+    compiled = []
+    real_compile = server._compile_filter
+    monkeypatch.setattr(server, "_compile_filter", lambda config, *args: compiled.append(config) or real_compile(config, *args))
+    server._scan_stocks_core(SYMBOLS, filters[:2], "OR")
+    assert len(compiled) == 2
+
+
+@pytest.mark.parametrize("operator", ["gt", ">", "gte", ">=", "lt", "<", "lte", "<=", "eq", "==", "between", "nope", None])
+def test_bound_conditions_match_evaluate_condition(operator):
+    for current, compare in [(1.0, 2.0), (2.0, 2.0), (2.005, 2.0), (3.0, [1, 4]), (5.0, [1, 4])]:
+        try:
+            expected = server.evaluate_condition(current, compare, operator)
+        except TypeError:
+            continue
+        assert server._bind_condition(operator)(current, compare) == expected
+
+
+def test_indicator_cache_reuses_series_within_scan(mock_market):
+    filters = [
+        {"type": "indicator", "field": "RSI", "operator": "gt", "value": 70, "time_period": 14},
+        {"type": "indicator", "field": "RSI", "operator": "crossed_above", "value": 50, "time_period": 14},
+        {"expression": {
+            "type": "binary", "operator": ">",
+            "left": {"type": "indicator", "field": "RSI", "time_period": 14},
+            "right": {"type": "constant", "value": 30},
+        }},
+    ]
+
+    result = server._scan_stocks_core(SYMBOLS, filters, "OR", full_details=True)
+
+    stats = result["indicator_cache"]
+    # Each RSI(14) series is computed once per frame and then served from the cache
+    assert stats["misses"] == stats["entries"]
+    assert stats["hits"] > 0
+    assert result["matched_stocks"] == _reference_scan(mock_market, SYMBOLS, filters, "OR")
+
+
+def test_indicator_cache_keys_include_params(mock_market):
+    df = server._records_to_frame(mock_market("AAPL")["data"])
+
+    with server._indicator_cache_scope() as cache:
+        cache.bind(df, "AAPL", "daily")
+        fast = server._get_indicator_series(df, "MACD", 14, params={"fast": 5})
+        default = server._get_indicator_series(df, "MACD", 14, params={"operator": "gt"})
+        again = server._get_indicator_series(df, "MACD", 14, params={"fast": 5, "value": 1})
+        unbound = server._get_indicator_series(df.copy(), "MACD", 14)
+
+    assert again is fast
+    assert not fast.equals(default)
+    assert unbound.equals(default)
+    assert cache.stats() == {"hits": 1, "misses": 2, "entries": 2, "hit_rate": 0.3333}
+
+
+class FakeRedis:
+    """In-memory stand-in for the bytes-mode redis client."""
+
+    def __init__(self):
+        self.store: Dict[str, bytes] = {}
+        self.round_trips = 0
+
+    def get(self, key):
+        self.round_trips += 1
+        return self.store.get(key)
+
+    def setex(self, key, ttl, value):
+        self.store[key] = value if isinstance(value, bytes) else value.encode()
+
+    def ttl(self, key):
+        return 300 if key in self.store else -2
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return None
+        self.store[key] = value if isinstance(value, bytes) else value.encode()
+        return True
+
+    def exists(self, key):
+        return int(key in self.store)
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+    def mget(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        redis, calls = self, []
+
+        class Pipeline:
+            def __getattr__(self, name):
+                return lambda *args: calls.append((name, args))
+
+            def execute(self):
+                redis.round_trips += 1
+                return [getattr(redis, name)(*args) for name, args in calls]
+
+        return Pipeline()
+
+
+def test_scan_reads_binary_cache_entries(mock_market, monkeypatch):
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(server, "redis_client", fake_redis)
+    monkeypatch.setattr(server, "CACHE_ENABLED", True)
+    monkeypatch.setattr(server, "LOCAL_CACHE", server.LocalLRUCache(0))
+    monkeypatch.setattr(server, "_fetch_stock_data_uncached", REAL_FETCH_STOCK_DATA_UNCACHED)
+
+    class TrimmedProvider(server.StockDataProvider):
+        def fetch_ohlc(self, symbol, interval, outputsize):
+            return mock_market(symbol, interval, outputsize)
+
+    monkeypatch.setattr(server, "STOCK_DATA_PROVIDER", TrimmedProvider())
+    filters = FILTER_SETS[6] + FILTER_SETS[-1]
+
+    first = server._scan_stocks_core(SYMBOLS, filters, "OR", full_details=True)
+    assert all(server.ohlcv_codec.is_ohlcv_blob(blob) for blob in fake_redis.store.values())
+    second = server._scan_stocks_core(SYMBOLS, filters, "OR", full_details=True)
+
+    assert first["matched_stocks"] == second["matched_stocks"]
+    assert second["matched_stocks"] == _reference_scan(mock_market, SYMBOLS, filters, "OR")
+
+
+def test_scan_serves_repeat_reads_from_local_tier(mock_market, monkeypatch):
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(server, "redis_client", fake_redis)
+    monkeypatch.setattr(server, "CACHE_ENABLED", True)
+    monkeypatch.setattr(server, "LOCAL_CACHE", server.LocalLRUCache(10 * 1024 * 1024))
+    monkeypatch.setattr(server, "_fetch_stock_data_uncached", REAL_FETCH_STOCK_DATA_UNCACHED)
+
+    class TrimmedProvider(server.StockDataProvider):
+        def fetch_ohlc(self, symbol, interval, outputsize):
+            return mock_market(symbol, interval, outputsize)
+
+    monkeypatch.setattr(server, "STOCK_DATA_PROVIDER", TrimmedProvider())
+    filters = FILTER_SETS[6]
+
+    first = server._scan_stocks_core(SYMBOLS, filters, "AND")
+    fake_redis.store.clear()
+    second = server._scan_stocks_core(SYMBOLS, filters, "AND")
+
+    assert first["matched_stocks"] == second["matched_stocks"]
+    assert server.LOCAL_CACHE.stats()["hits"] == len(SYMBOLS)
+
+
+def test_bulk_cache_round_trips_scale_with_batches(mock_market, monkeypatch):
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(server, "redis_client", fake_redis)
+    monkeypatch.setattr(server, "CACHE_ENABLED", True)
+    monkeypatch.setattr(server, "LOCAL_CACHE", server.LocalLRUCache(0))
+    monkeypatch.setattr(server, "CACHE_BULK_BATCH_SIZE", 3)
+    pairs = [(symbol, "daily") for symbol in SYMBOLS]
+
+    first = server._prefetch_stock_data(pairs)
+    assert fake_redis.round_trips == 6  # 3 MGET + 3 SETEX batches for 8 keys
+    fake_redis.round_trips = 0
+    second = server._prefetch_stock_data(pairs)
+
+    assert fake_redis.round_trips == 3
+    for pair in pairs:
+        np.testing.assert_array_equal(
+            second[pair]["columns"]["close"], [r["close"] for r in first[pair]["data"]]
+        )
+
+
+def test_scan_results_are_cached_by_canonical_request(mock_market, monkeypatch):
+    monkeypatch.setattr(server, "redis_client", FakeRedis())
+    monkeypatch.setattr(server, "CACHE_ENABLED", True)
+    monkeypatch.setattr(server, "LOCAL_CACHE", server.LocalLRUCache(10 * 1024 * 1024))
+    calls = []
+    real_core = server._scan_stocks_core
+    monkeypatch.setattr(server, "_scan_stocks_core", lambda *args: calls.append(args) or real_core(*args))
+    filters = [{"type": "price", "field": "close", "operator": "gt", "value": 0}]
+
+    first = server.scan_stocks(SYMBOLS, filters, "and")
+    second = server.scan_stocks(list(reversed(SYMBOLS)), [dict(reversed(filters[0].items()))], "AND")
+
+    assert len(calls) == 1
+    assert [m["symbol"] for m in first["matched_stocks"]] == SYMBOLS
+    assert [m["symbol"] for m in second["matched_stocks"]] == list(reversed(SYMBOLS))
+    preset = server.run_preset_scan("rsi_oversold", SYMBOLS)
+    assert preset["preset_name"] == "rsi_oversold" and len(calls) == 2
+
+
+def test_cached_scan_results_do_not_alias_the_cache(mock_market, monkeypatch):
+    monkeypatch.setattr(server, "redis_client", FakeRedis())
+    monkeypatch.setattr(server, "CACHE_ENABLED", True)
+    monkeypatch.setattr(server, "LOCAL_CACHE", server.LocalLRUCache(10 * 1024 * 1024))
+    filters = [{"type": "price", "field": "close", "operator": "gt", "value": 0}]
+
+    first = server._cached_scan(SYMBOLS, filters, "AND", True)
+    expected = copy.deepcopy(first)
+    del expected["indicator_cache"]  # only reported by the call that ran the scan
+    first["matched_stocks"][0]["symbol"] = "MUTATED"
+    first["matched_stocks"][1].clear()
+    first["failed_stocks"].append({"symbol": "MUTATED"})
+
+    assert server._cached_scan(SYMBOLS, filters, "AND", True) == expected
+
+
+def test_only_the_computing_call_reports_indicator_cache_stats(mock_market, monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(server, "redis_client", redis)
+    monkeypatch.setattr(server, "CACHE_ENABLED", True)
+    monkeypatch.setattr(server, "LOCAL_CACHE", server.LocalLRUCache(10 * 1024 * 1024))
+    filters = [{"type": "indicator", "field": "RSI", "time_period": 14, "operator": "gt", "value": 0}]
+
+    first = server._cached_scan(SYMBOLS, filters, "AND")
+    second = server._cached_scan(SYMBOLS, filters, "AND")
+
+    assert first["indicator_cache"]["misses"] > 0
+    assert "indicator_cache" not in second
+    assert all(b"indicator_cache" not in payload for payload in redis.store.values())
+    assert {k: v for k, v in first.items() if k != "indicator_cache"} == second
+
+
+def test_scan_cache_key_normalization():
+    filters = [{"type": "price", "field": "close", "operator": "gt", "value": 1}]
+    key = server._scan_cache_key(["B", "A"], filters, "and", 600)
+
+    assert key == server._scan_cache_key(["A", "B"], [dict(reversed(filters[0].items()))], "AND", 600)
+    assert key != server._scan_cache_key(["A", "B"], filters, "OR", 600)
+    assert key != server._scan_cache_key(["A", "B"], filters, "AND", 900)
+    assert server._scan_data_as_of(1000) == 900
+
+
+def test_concurrent_identical_scans_are_coalesced(monkeypatch):
+    import threading
+    import time
+
+    calls = []
+
+    def slow_scan(symbols, filters, filter_logic, *args):
+        calls.append(symbols)
+        time.sleep(0.2)
+        return {"matched_stocks": [{"symbol": s} for s in symbols], "failed_stocks": []}
+
+    monkeypatch.setattr(server, "_scan_stocks_core", slow_scan)
+    results = []
+    threads = [
+        threading.Thread(target=lambda s=s: results.append(server._cached_scan(s, [], "AND")))
+        for s in (["A", "B"], ["B", "A"], ["A", "B"], ["B", "A"])
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted([m["symbol"] for m in r["matched_stocks"]] for r in results) == [["A", "B"]] * 2 + [["B", "A"]] * 2
@@ -0,0 +1,402 @@
+"""Tests for the concurrent fetch stage, batch candle client and pooled API client."""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+import pytest
+
+import server
+
+
+@pytest.fixture
+def api_server(monkeypatch):
+    """Local stand-in for the NestJS API; fails the first request per path with 503."""
+    hits: Dict[str, int] = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split("?")[0]
+            hits[path] = hits.get(path, 0) + 1
+            if path == "/flaky" and hits[path] == 1:
+                self.send_response(503)
+                self.end_headers()
+                return
+            if path == "/slow":
+                time.sleep(0.5)
+            body = json.dumps({"path": path, "hits": hits[path]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(server, "API_BASE_URL", f"http://127.0.0.1:{httpd.server_address[1]}")
+    monkeypatch.setattr(server, "_http_session", None)
+    yield hits
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_api_request_retries_transient_errors(api_server):
+    assert server._api_request("GET", "/flaky") == {"path": "/flaky", "hits": 2}
+    assert server._get_http_session() is server._get_http_session()
+
+
+def test_concurrent_first_calls_share_one_session(monkeypatch):
+    import requests
+
+    created = []
+
+    class SlowSession(requests.Session):
+        def __init__(self):
+            time.sleep(0.05)  # widen the window between the check and the assignment
+            super().__init__()
+            created.append(self)
+
+    monkeypatch.setattr(requests, "Session", SlowSession)
+    monkeypatch.setattr(server, "_http_session", None)
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(server._get_http_session())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1 and all(session is created[0] for session in sessions)
+
+
+def test_api_request_times_out(api_server, monkeypatch):
+    monkeypatch.setattr(server, "API_TIMEOUT", 0.1)
+    monkeypatch.setattr(server, "API_MAX_RETRIES", 0)
+
+    with pytest.raises(ValueError, match="Failed to communicate with API"):
+        server._api_request("GET", "/slow")
+
+
+def test_prefetch_bounds_concurrency_and_keeps_failures(monkeypatch):
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def fake_fetch(symbol: str, interval: str = "daily", outputsize: str = "compact") -> Dict[str, Any]:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        if symbol == "BAD":
+            raise ValueError("boom")
+        return {"symbol": symbol, "interval": interval}
+
+    monkeypatch.setattr(server, "STOCK_DATA_PROVIDER", server.MOCK_DATA_PROVIDER)
+    monkeypatch.setattr(server, "_fetch_stock_data_uncached", fake_fetch)
+    pairs = [(f"S{i}", tf) for i in range(12) for tf in ("daily", "weekly")] + [("BAD", "daily")]
+
+    result = server._prefetch_stock_data(pairs, concurrency=4)
+
+    assert list(result) == pairs
+    assert result[("S3", "weekly")] == {"symbol": "S3", "interval": "weekly"}
+    assert isinstance(result[("BAD", "daily")], ValueError)
+    assert 1 < peak <= 4
+
+
+def test_prefetch_runs_inside_event_loop(monkeypatch):
+    monkeypatch.setattr(server, "STOCK_DATA_PROVIDER", server.MOCK_DATA_PROVIDER)
+    monkeypatch.setattr(server, "_fetch_stock_data_uncached", lambda s, i, o: {"symbol": s})
+
+    async def call_from_loop():
+        return server._prefetch_stock_data([("AAPL", "daily")])
+
+    assert asyncio.run(call_from_loop()) == {("AAPL", "daily"): {"symbol": "AAPL"}}
+
+
+def _candles(seed: float) -> Dict[str, Any]:
+    return {
+        "s": "ok",
+        "t": [1704153600, 1704240000],
+        "o": [seed, seed + 1], "h": [seed + 2, seed + 3], "l": [seed - 1, seed],
+        "c": [seed + 1, seed + 2], "v": [1000, 2000],
+    }
+
+
+@pytest.fixture
+def candle_api(monkeypatch):
+    """Stand-in candle API recording every request; the batch endpoint can be made to fail."""
+    calls = []
+    state = {"batch_status": 200}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            from urllib.parse import parse_qs, urlparse
+            url = urlparse(self.path)
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            calls.append((url.path, query))
+            if url.path.endswith("/batch"):
+                if state["batch_status"] != 200:
+                    self.send_response(state["batch_status"])
+                    self.end_headers()
+                    return
+                symbols = query["symbols"].split(",")
+                payload = {"candles": {s: _candles(100 + i) for i, s in enumerate(symbols) if s != "NODATA"}}
+            else:
+                payload = _candles(50)
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    monkeypatch.setattr(server, "API_BASE_URL", f"http://127.0.0.1:{httpd.server_address[1]}")
+    monkeypatch.setattr(server, "_http_session", None)
+    monkeypatch.setattr(server, "CANDLE_BATCH_SIZE", 2)
+    yield calls, state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_fetch_ohlc_batch_chunks_symbols(candle_api):
+    calls, _ = candle_api
+    provider = server.FinnhubDataProvider()
+
+    result = provider.fetch_ohlc_batch(["AAPL", "MSFT", "NODATA"], "daily", "compact")
+
+    assert [(path, query["symbols"]) for path, query in calls] == [
+        ("/api/market-data/candles/local/batch", "AAPL,MSFT"),
+        ("/api/market-data/candles/local/batch", "NODATA"),
+    ]
+    assert list(result) == ["AAPL", "MSFT", "NODATA"]
+    assert result["MSFT"]["data"][0] == {
+        "date": result["MSFT"]["data"][0]["date"],
+        "open": 101.0, "high": 103.0, "low": 100.0, "close": 102.0, "volume": 1000,
+    }
+    assert result["MSFT"]["latest_price"] == 103.0
+    assert result["NODATA"]["data"] == []
+
+
+def test_fetch_ohlc_batch_falls_back_to_per_symbol(candle_api, monkeypatch):
+    calls, state = candle_api
+    state["batch_status"] = 404
+    provider = server.FinnhubDataProvider()
+    now = [1000.0]
+    monkeypatch.setattr(server.time, "monotonic", lambda: now[0])
+
+    result = provider.fetch_ohlc_batch(["AAPL", "MSFT", "NVDA"], "daily", "compact")
+
+    assert [path for path, _ in calls] == ["/api/market-data/candles/local/batch"] + ["/api/market-data/candles/local"] * 3
+    assert [query["symbol"] for _, query in calls[1:]] == ["AAPL", "MSFT", "NVDA"]
+    assert result["NVDA"]["latest_price"] == 52.0
+    assert provider.supports_batch is False
+
+    now[0] += server.CANDLE_BATCH_RETRY_INTERVAL
+    state["batch_status"] = 200
+    assert provider.supports_batch is True
+    assert provider.fetch_ohlc_batch(["AAPL"], "daily", "compact")["AAPL"]["latest_price"] == 102.0
+    assert calls[-1][0] == "/api/market-data/candles/local/batch"
+
+
+def test_failed_batch_chunk_is_fetched_per_symbol(candle_api, monkeypatch):
+    calls, state = candle_api
+    state["batch_status"] = 500
+    monkeypatch.setattr(server, "API_MAX_RETRIES", 0)
+    provider = server.FinnhubDataProvider()
+
+    result = provider.fetch_ohlc_batch(["AAPL", "MSFT", "NVDA"], "daily", "compact")
+
+    assert [query.get("symbols", query.get("symbol")) for _, query in calls] == ["AAPL,MSFT", "AAPL", "MSFT", "NVDA", "NVDA"]
+    assert all(result[symbol]["latest_price"] == 52.0 for symbol in ("AAPL", "MSFT", "NVDA"))
+    assert provider.supports_batch is True
+
+
+def test_prefetch_uses_batch_provider(candle_api, monkeypatch):
+    calls, _ = candle_api
+    monkeypatch.setattr(server, "STOCK_DATA_PROVIDER", server.FinnhubDataProvider())
+    pairs = [(s, tf) for s in ("AAPL", "MSFT", "NVDA") for tf in ("daily", "weekly")]
+
+    result = server._prefetch_stock_data(pairs)
+
+    assert list(result) == pairs
+    assert all(result[pair]["data_points"] == 2 for pair in pairs)
+    assert len(calls) == 4  # two chunks per timeframe
+
+
+def test_fetch_ohlc_bar_count_requests_exact_window(candle_api):
+    calls, _ = candle_api
+    provider = server.FinnhubDataProvider()
+
+    result = provider.fetch_ohlc("AAPL", "daily", 1)
+    weekly_span = provider._request_window("weekly", 52)
+    compact_span = provider._request_window("daily", "compact")
+
+    query = calls[0][1]
+    days = (int(query["to"]) - int(query["from"])) / 86400
+    assert 1 <= days <= 10
+    assert result["outputsize"] == 1 and result["data_points"] == 1
+    assert result["data"][0]["close"] == 52.0  # latest bar kept
+    assert 52 * 7 <= weekly_span[2] / 86400 - weekly_span[1] / 86400 <= 54 * 7
+    assert compact_span[2] - compact_span[1] == 150 * 86400
+
+
+def test_scan_fetches_planned_bar_count(monkeypatch):
+    requested = []
+    monkeypatch.setattr(server, "_prefetch_stock_data",
+                        lambda pairs, outputsize="compact", *args: requested.append((outputsize, pairs)) or {})
+    filters = [
+        {"type": "indicator", "field": "SMA", "operator": "gt", "value": 1, "time_period": 200},
+        {"type": "price", "field": "close", "operator": "gt", "value": 1, "timeframe": "weekly"},
+    ]
+
+    server._scan_stocks_core(["AAPL"], filters, "AND", full_details=True)
+
+    assert requested == [(200, [("AAPL", "daily")])]
+
+
+class DeltaProvider(server.StockDataProvider):
+    """Provider serving a fixed daily series; records every full and delta fetch."""
+
+    def __init__(self, records):
+        self.records = records
+        self.calls = []
+
+    def fetch_ohlc(self, symbol, interval, outputsize):
+        self.calls.append(("full", symbol))
+        return {"symbol": symbol, "interval": interval, "data": self.records[-100:],
+                "last_updated": server.datetime.now().isoformat()}
+
+    def fetch_ohlc_since(self, symbol, interval, since):
+        self.calls.append(("since", server.datetime.fromtimestamp(since).strftime("%Y-%m-%d")))
+        return [r for r in self.records if r["date"] >= server.datetime.fromtimestamp(since).strftime("%Y-%m-%d")]
+
+
+def _daily_records(n, start="2024-01-01"):
+    dates = server.pd.bdate_range(start, periods=n).strftime("%Y-%m-%d")
+    return [{"date": d, "open": 1.0 + i, "high": 2.0 + i, "low": 0.5 + i, "close": 1.5 + i, "volume": 100 + i}
+            for i, d in enumerate(dates)]
+
+
+def _stale(records):
+    fetched_at = server.datetime.now() - server.timedelta(seconds=server.CACHE_TTL["stock_data"] + 60)
+    return {"symbol": "AAPL", "interval": "daily", "outputsize": "compact", "data": records,
+            "last_updated": fetched_at.isoformat()}
+
+
+def test_merge_bars_replaces_forming_candle_and_keeps_window():
+    old = _daily_records(5)
+    forming = dict(old[-1], close=99.0)
+    new = [forming] + _daily_records(7)[5:]
+
+    merged = server._merge_bars(old, new, limit=5)
+
+    assert [r["date"] for r in merged] == [r["date"] for r in _daily_records(7)[2:]]
+    assert merged[2]["close"] == 99.0
+    assert server._merge_bars(old, [], limit=5) is old
+
+
+def test_stale_cache_entry_is_topped_up_with_delta_fetch(monkeypatch):
+    records = _daily_records(120)
+    provider = DeltaProvider(records)
+    stored = {}
+    monkeypatch.setattr(server, "STOCK_DATA_PROVIDER", provider)
+    monkeypatch.setattr(server, "get_stock_data_from_cache", lambda key, as_columns=False: _stale(records[:-3]))
+    monkeypatch.setattr(server, "set_stock_data_in_cache", lambda key, value, ttl: stored.update({key: (value, ttl)}))
+
+    result = server._fetch_stock_data_core("AAPL", "daily", "compact")
+
+    day_before_last = (server.pd.Timestamp(records[-4]["date"]) - server.pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    assert provider.calls == [("since", day_before_last)]
+    assert result["data"] == records[3:]
+    assert result["data_points"] == 117 and result["latest_price"] == records[-1]["close"]
+    assert server._is_fresh_stock_data(result)
+    value, ttl = stored["stock:AAPL:daily:compact"]
+    assert value is result and ttl == server.STOCK_SERIES_RETENTION
+
+
+def test_fresh_cache_entries_are_served_and_unsupported_providers_refetch(monkeypatch):
+    records = _daily_records(120)
+    monkeypatch.setattr(server, "set_stock_data_in_cache", lambda *args: None)
+    fresh = dict(_stale(records), last_updated=server.datetime.now().isoformat())
+    monkeypatch.setattr(server, "get_stock_data_from_cache", lambda key, as_columns=False: fresh)
+    assert server._fetch_stock_data_core("AAPL") is fresh
+
+    class FullOnly(DeltaProvider):
+        fetch_ohlc_since = server.StockDataProvider.fetch_ohlc_since
+
+    provider = FullOnly(records)
+    monkeypatch.setattr(server, "STOCK_DATA_PROVIDER", provider)
+    monkeypatch.setattr(server, "get_stock_data_from_cache", lambda key, as_columns=False: _stale(records[:-3]))
+    assert server._fetch_stock_data_core("AAPL")["data"] == records[-100:]
+    assert provider.calls == [("full", "AAPL")]
+
+
+def test_prefetch_refreshes_stale_entries_from_cached_columns(monkeypatch):
+    records = _daily_records(60)
+    provider = DeltaProvider(records)
+    cached = server.ohlcv_codec.decode_ohlcv(server.ohlcv_codec.encode_ohlcv(_stale(records[:-2])))
+    monkeypatch.setattr(server, "STOCK_DATA_PROVIDER", provider)
+    monkeypatch.setattr(server, "get_many_stock_data_from_cache",
+                        lambda keys, as_columns=False: {key: cached for key in keys})
+    written = {}
+    monkeypatch.setattr(server, "set_many_stock_data_in_cache", lambda entries, ttl: written.update(entries))
+
+    result = server._prefetch_stock_data([("AAPL", "daily")])
+
+    day_before_last = (server.pd.Timestamp(records[-3]["date"]) - server.pd.Timedelta(days=1)).strftime("%Y-%m-%d")
+    assert provider.calls == [("since", day_before_last)]
+    assert result[("AAPL", "daily")]["data"] == records[2:]
+    assert list(written) == ["stock:AAPL:daily:compact"]
+
+
+def test_mock_fallback_is_short_lived_and_replaced_once_the_provider_recovers(monkeypatch):
+    records = _daily_records(120)
+
+    class Flaky(DeltaProvider):
+        def fetch_ohlc(self, symbol, interval, outputsize):
+            if not self.calls:
+                self.calls.append(("failed", symbol))
+                raise ConnectionError("provider down")
+            return super().fetch_ohlc(symbol, interval, outputsize)
+
+    provider = Flaky(records)
+    cache = {}
+    monkeypatch.setattr(server, "STOCK_DATA_PROVIDER", provider)
+    monkeypatch.setattr(server, "get_stock_data_from_cache", lambda key, as_columns=False: cache.get(key, (None,))[0])
+    monkeypatch.setattr(server, "set_stock_data_in_cache", lambda key, value, ttl: cache.update({key: (value, ttl)}))
+
+    mock = server._fetch_stock_data_core("AAPL")
+    assert mock["source"] == "mock" and mock["data"] != records[-100:]
+    assert cache["stock:AAPL:daily:compact"][1] == server.CACHE_TTL["stock_data"]
+
+    # The mock entry outlived its freshness (e.g. in the local tier): no delta is merged onto it
+    cache["stock:AAPL:daily:compact"] = (dict(mock, last_updated=_stale(records)["last_updated"]), 0)
+    result = server._fetch_stock_data_core("AAPL")
+
+    assert provider.calls == [("failed", "AAPL"), ("full", "AAPL")]
+    assert result["data"] == records[-100:] and "source" not in result
+    assert cache["stock:AAPL:daily:compact"] == (result, server.STOCK_SERIES_RETENTION)
+
+
+def test_finnhub_delta_fetch_requests_from_last_bar(candle_api):
+    calls, _ = candle_api
+
+    records = server.FinnhubDataProvider().fetch_ohlc_since("AAPL", "5min", 1704153600)
+
+    assert calls[0][0] == "/api/market-data/candles"
+    assert calls[0][1]["from"] == "1704153600" and calls[0][1]["resolution"] == "5"
+    assert len(records) == 2
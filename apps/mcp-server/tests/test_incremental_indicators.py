@@ -0,0 +1,155 @@
+"""Tests for the streaming indicator states and their use by repeated scans."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import incremental_indicators
+import server
+
+
+@pytest.fixture(scope="module")
+def bars() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    close = 100 + rng.standard_normal(300).cumsum()
+    df = pd.DataFrame({"open": close, "high": close + rng.random(300), "low": close - rng.random(300),
+                       "close": close, "volume": rng.integers(1, 1000, 300).astype(float)},
+                      index=pd.bdate_range("2024-01-01", periods=300))
+    df.iloc[50:56, :4] = df["close"].iloc[50]  # flat bars: zero ranges and 0/0 directional index
+    df.iloc[80, 3] = np.nan
+    return df
+
+
+BATCH = {
+    "EMA": lambda df: server.calculate_ema(df, 10),
+    "RSI": lambda df: server.calculate_rsi(df, 14),
+    "ATR": lambda df: server.calculate_atr(df, 14),
+    "ADX": lambda df: server.calculate_adx(df, 14),
+    "MACD": lambda df: server.calculate_macd(df, 5, 13, 4)["macd"],
+    "MACD_SIGNAL": lambda df: server.calculate_macd(df, 5, 13, 4)["signal"],
+    "MACD_HIST": lambda df: server.calculate_macd(df, 5, 13, 4)["histogram"],
+    "OBV": lambda df: server.calculate_obv(df),
+}
+PARAMS = {"fast": 5, "slow": 13, "signal": 4}
+
+
+def _indicator(name):
+    return incremental_indicators.create_indicator(name, 10 if name == "EMA" else 14, PARAMS)
+
+
+@pytest.mark.parametrize("name", sorted(BATCH))
+def test_streaming_matches_batch_bit_for_bit(name, bars):
+    indicator = _indicator(name)
+
+    values = [indicator.update(bar) for bar in bars.to_dict("records")]
+
+    assert np.array_equal(values, BATCH[name](bars).to_numpy(dtype=float), equal_nan=True)
+
+
+@pytest.mark.parametrize("name", ["RSI", "ADX", "MACD_HIST"])
+def test_forming_candle_replaces_last_bar(name, bars):
+    stream = incremental_indicators.IndicatorStream(_indicator(name), history=50)
+    records = bars.to_dict("records")
+    stamps = bars.index.asi8.tolist()
+
+    stream.extend(stamps[:200], records[:200])
+    for k in range(200, 300):
+        forming = dict(records[k], close=records[k]["close"] + 1, high=records[k]["high"] + 2)
+        stream.push(stamps[k], forming)
+        stream.push(stamps[k], records[k])  # the bar closes at its final values
+
+    assert len(stream) == 50 and stream.dates.tolist() == stamps[-50:]
+    assert np.array_equal(stream.values, BATCH[name](bars).to_numpy(dtype=float)[-50:], equal_nan=True)
+    with pytest.raises(ValueError):
+        stream.push(stamps[0], records[0])
+
+
+def test_store_seeds_on_second_request_then_appends_new_bars(bars):
+    store = server.IndicatorStateStore(10)
+    signature = ("RSI", 14, ())
+    columns = {col: bars[col].to_numpy() for col in server.OHLCV_COLUMNS}
+    dates = bars.index.to_numpy()
+    expected = BATCH["RSI"](bars).to_numpy()
+
+    def request(stop, start=0):
+        window = {col: values[start:stop] for col, values in columns.items()}
+        return store.series("AAPL", "5min", signature, dates[start:stop], window)
+
+    assert request(200) is None
+    assert np.array_equal(request(200), expected[:200], equal_nan=True)
+    assert store.stats() == {"streams": 1, "seeded": 1, "pushed": 200}
+
+    # Sliding window with three new bars: only the last known bar and the new ones are pushed
+    assert np.array_equal(request(203, start=3), expected[3:203], equal_nan=True)
+    assert store.stats()["pushed"] == 204
+
+    revised = {col: values.copy() for col, values in columns.items()}
+    revised["close"][150] += 1
+    assert np.array_equal(store.series("AAPL", "5min", signature, dates[:210], {c: v[:210] for c, v in revised.items()}),
+                          BATCH["RSI"](bars.assign(close=revised["close"])).to_numpy()[:210], equal_nan=True)
+    assert store.stats()["seeded"] == 2
+    assert request(100) is None  # older than the stream: batch
+
+
+def test_repeated_scans_serve_streamed_indicators(monkeypatch):
+    records = server.MOCK_DATA_PROVIDER.fetch_ohlc("AAPL", "daily")["data"]
+    window = {"bars": 120}
+    monkeypatch.setattr(server, "INDICATOR_STREAMS", server.IndicatorStateStore(100))
+    monkeypatch.setattr(server, "_prefetch_stock_data", lambda pairs, outputsize="compact", *args: {
+        pair: {"symbol": pair[0], "data": records[:window["bars"]]} for pair in pairs})
+    filters = [
+        {"type": "indicator", "field": "RSI", "time_period": 14, "operator": "gt", "value": 0},
+        {"expression": {"type": "binary", "operator": "crossed_above",
+                        "left": {"type": "indicator", "field": "EMA", "time_period": 5},
+                        "right": {"type": "indicator", "field": "MACD", "time_period": 0}}},
+    ]
+
+    def scan():
+        return server._scan_stocks_core(["AAPL"], filters, "OR", full_details=True)["matched_stocks"]
+
+    scan()
+    for bars in (120, 125, 150):
+        window["bars"] = bars
+        frames = {"daily": server._records_to_frame(records[:bars])}
+        assert scan()[0]["filter_details"] == [server.evaluate_single_filter("AAPL", frames, f)[1] for f in filters]
+
+    assert server.INDICATOR_STREAMS.stats() == {"streams": 3, "seeded": 3, "pushed": 3 * (120 + 1 + 5 + 1 + 25)}
+
+
+def test_repeated_obv_scans_match_batch(monkeypatch):
+    records = {symbol: server.MOCK_DATA_PROVIDER.fetch_ohlc(symbol, "daily")["data"] for symbol in ("AAA", "BBB")}
+    window = {"start": 0, "stop": 120}
+    monkeypatch.setattr(server, "INDICATOR_STREAMS", server.IndicatorStateStore(100))
+    monkeypatch.setattr(server, "_prefetch_stock_data", lambda pairs, outputsize="compact", *args: {
+        pair: {"symbol": pair[0], "data": records[pair[0]][window["start"]:window["stop"]]} for pair in pairs})
+    filters = [{"type": "indicator", "field": "OBV", "operator": "gt", "value": 50}]
+
+    def scan(streams=None):
+        if streams is not None:
+            monkeypatch.setattr(server, "INDICATOR_STREAMS", streams)
+        return server._scan_stocks_core(["AAA", "BBB"], filters, full_details=True)["matched_stocks"]
+
+    streamed = server.INDICATOR_STREAMS
+    first = scan()
+    assert first and first == scan()
+    for start, stop in ((0, 125), (10, 130)):  # new bars, then a window that slid forward
+        window.update(start=start, stop=stop)
+        expected = scan(server.IndicatorStateStore(0))
+        assert expected and scan(streamed) == expected
+    assert streamed.stats()["seeded"] == 4  # the slid window reseeds OBV
+
+
+def test_panel_scan_streams_every_symbol_from_the_second_scan(monkeypatch):
+    symbols = ["AAA", "BBB", "CCC"]
+    records = {symbol: server.MOCK_DATA_PROVIDER.fetch_ohlc(symbol, "daily")["data"][:120] for symbol in symbols}
+    monkeypatch.setattr(server, "INDICATOR_STREAMS", server.IndicatorStateStore(100))
+    monkeypatch.setattr(server, "_prefetch_stock_data", lambda pairs, outputsize="compact", *args: {
+        pair: {"symbol": pair[0], "data": records[pair[0]]} for pair in pairs})
+    filters = [{"type": "indicator", "field": "RSI", "time_period": 14, "operator": "gt", "value": 0}]
+    expected = server._scan_stocks_core(symbols, filters, full_details=True)["matched_stocks"]
+
+    assert server.INDICATOR_STREAMS.stats() == {"streams": 3, "seeded": 0, "pushed": 0}
+    for pushed in (3 * 120, 3 * 121):
+        assert server._scan_stocks_core(symbols, filters, full_details=True)["matched_stocks"] == expected
+        assert server.INDICATOR_STREAMS.stats() == {"streams": 3, "seeded": 3, "pushed": pushed}
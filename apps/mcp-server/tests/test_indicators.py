@@ -7,7 +7,61 @@ import unittest
 # Add parent dir
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from server import calculate_psar, calculate_ichimoku, _get_indicator_value
+import server
+from server import (
+    calculate_psar, calculate_ichimoku, calculate_supertrend, calculate_atr,
+    calculate_wma, calculate_aroon, calculate_cci, _get_indicator_value,
+)
+
+
+def legacy_psar(df, step=0.02, max_step=0.2):
+    """Reference .iloc implementation that calculate_psar replaced."""
+    high, low = df['high'], df['low']
+    psar_series = pd.Series(index=df.index, dtype='float64')
+    bullish, af, hp, lp = True, step, high.iloc[0], low.iloc[0]
+    psar_series.iloc[0] = low.iloc[0]
+    for i in range(1, len(df)):
+        curr_high, curr_low, prev_psar = high.iloc[i], low.iloc[i], psar_series.iloc[i-1]
+        if bullish:
+            psar_series.iloc[i] = prev_psar + af * (hp - prev_psar)
+            psar_series.iloc[i] = min(psar_series.iloc[i], low.iloc[i-1])
+            if i > 1:
+                psar_series.iloc[i] = min(psar_series.iloc[i], low.iloc[i-2])
+            if curr_low < psar_series.iloc[i]:
+                bullish, lp, af = False, curr_low, step
+                psar_series.iloc[i] = hp
+            elif curr_high > hp:
+                hp, af = curr_high, min(af + step, max_step)
+        else:
+            psar_series.iloc[i] = prev_psar + af * (lp - prev_psar)
+            psar_series.iloc[i] = max(psar_series.iloc[i], high.iloc[i-1])
+            if i > 1:
+                psar_series.iloc[i] = max(psar_series.iloc[i], high.iloc[i-2])
+            if curr_high > psar_series.iloc[i]:
+                bullish, hp, af = True, curr_high, step
+                psar_series.iloc[i] = lp
+            elif curr_low < lp:
+                lp, af = curr_low, min(af + step, max_step)
+    return psar_series
+
+
+def legacy_supertrend(df, period=10, multiplier=3.0):
+    """Reference loop implementation that calculate_supertrend replaced."""
+    atr = calculate_atr(df, period)
+    hl2 = (df['high'] + df['low']) / 2
+    bu = (hl2 + multiplier * atr).values
+    bl = (hl2 - multiplier * atr).values
+    c = df['close'].values
+    fu, fl, st = np.zeros(len(df)), np.zeros(len(df)), np.zeros(len(df))
+    for i in range(1, len(df)):
+        fu[i] = bu[i] if (bu[i] < fu[i-1] or c[i-1] > fu[i-1]) else fu[i-1]
+        fl[i] = bl[i] if (bl[i] > fl[i-1] or c[i-1] < fl[i-1]) else fl[i-1]
+        if st[i-1] == fu[i-1]:
+            st[i] = fl[i] if c[i] > fu[i] else fu[i]
+        else:
+            st[i] = fu[i] if c[i] < fl[i] else fl[i]
+    return pd.Series(st, index=df.index)
+
 
 class TestIndicators(unittest.TestCase):
     def setUp(self):
@@ -52,5 +106,48 @@ class TestIndicators(unittest.TestCase):
         kijun = _get_indicator_value(self.df, 'ICHIMOKU_KIJUN', 0, -1, params={'period_med': 20})
         self.assertIsInstance(kijun, float)
 
+    def test_iterative_kernels_match_legacy_loops(self):
+        df = self.create_sample_df(500)
+        for params in [(0.02, 0.2), (0.05, 0.3)]:
+            pd.testing.assert_series_equal(calculate_psar(df, *params), legacy_psar(df, *params))
+        for params in [(10, 3.0), (7, 1.5)]:
+            pd.testing.assert_series_equal(calculate_supertrend(df, *params), legacy_supertrend(df, *params))
+
+    def test_pure_python_kernel_fallback_matches_legacy_loops(self):
+        df = self.create_sample_df(300)
+        compiled = dict(server._COMPILED_KERNELS)
+        try:
+            # Pin the uncompiled kernels, as when numba is not installed
+            server._COMPILED_KERNELS.update({
+                '_psar_kernel': server._psar_kernel,
+                '_supertrend_kernel': server._supertrend_kernel,
+            })
+            pd.testing.assert_series_equal(calculate_psar(df), legacy_psar(df))
+            pd.testing.assert_series_equal(calculate_supertrend(df), legacy_supertrend(df))
+        finally:
+            server._COMPILED_KERNELS.clear()
+            server._COMPILED_KERNELS.update(compiled)
+
+    def test_windowed_indicators_match_rolling_apply(self):
+        df = self.create_sample_df(300)
+        df.iloc[[10, 150], df.columns.get_loc('close')] = np.nan
+        tp = (df['high'] + df['low'] + df['close']) / 3
+        for period in [1, 14, 25]:
+            weights = np.arange(1, period + 1)
+            wma = df['close'].rolling(period).apply(lambda x: np.dot(x, weights) / weights.sum(), raw=True)
+            pd.testing.assert_series_equal(calculate_wma(df, period), wma)
+
+            aroon = calculate_aroon(df, period)
+            up = df['high'].rolling(period + 1).apply(lambda x: period - np.argmax(x), raw=True) / period * 100
+            down = df['low'].rolling(period + 1).apply(lambda x: period - np.argmin(x), raw=True) / period * 100
+            pd.testing.assert_series_equal(aroon['aroon_up'], up)
+            pd.testing.assert_series_equal(aroon['aroon_down'], down)
+
+            mad = tp.rolling(period).apply(lambda x: np.abs(x - x.mean()).mean(), raw=True)
+            cci = (tp - tp.rolling(period).mean()) / (0.015 * mad)
+            pd.testing.assert_series_equal(calculate_cci(df, period), cci)
+
+        self.assertTrue(calculate_wma(df.iloc[:5], 20).isna().all())
+
 if __name__ == '__main__':
     unittest.main()
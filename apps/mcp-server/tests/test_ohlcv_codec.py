@@ -0,0 +1,52 @@
+"""Round-trip tests for the binary OHLCV cache codec."""
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pytest
+
+import ohlcv_codec
+import server
+
+
+@pytest.fixture
+def daily_result():
+    return server.MOCK_DATA_PROVIDER.fetch_ohlc("AAPL", "daily", "compact")
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_round_trip_records(daily_result, compress):
+    blob = ohlcv_codec.encode_ohlcv(daily_result, compress=compress)
+
+    assert ohlcv_codec.is_ohlcv_blob(blob)
+    assert len(blob) < len(json.dumps(daily_result))
+    assert ohlcv_codec.decode_ohlcv(blob, records=True) == daily_result
+
+
+def test_round_trip_intraday_records(daily_result):
+    intraday = dict(daily_result, interval="5min", data=[
+        dict(record, date=f"{record['date']} 09:35:00") for record in daily_result["data"]
+    ])
+
+    assert ohlcv_codec.decode_ohlcv(ohlcv_codec.encode_ohlcv(intraday), records=True) == intraday
+
+
+def test_decode_to_columns(daily_result):
+    decoded = ohlcv_codec.decode_ohlcv(ohlcv_codec.encode_ohlcv(daily_result))
+    columns = decoded["columns"]
+
+    assert "data" not in decoded and decoded["symbol"] == "AAPL"
+    assert columns["date"].dtype == np.dtype("datetime64[s]")
+    assert columns["volume"].dtype == np.int64 and columns["close"].dtype == np.float64
+    np.testing.assert_array_equal(columns["close"], [r["close"] for r in daily_result["data"]])
+    assert str(columns["date"][-1])[:10] == daily_result["data"][-1]["date"]
+
+
+@pytest.mark.parametrize("data", [
+    [{"date": "2024-01-02", "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1, "pe": 3}],
+    [{"date": "2024-01-02T00:00:00Z", "open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1}],
+    [{"date": "2024-01-02", "open": None, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1}],
+])
+def test_unsupported_results_stay_json(daily_result, data):
+    assert ohlcv_codec.try_encode_ohlcv(dict(daily_result, data=data)) is None
@@ -0,0 +1,95 @@
+"""Tests for local OHLCV resampling and its use by multi-timeframe scans."""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ohlcv_resample
+import server
+
+
+def _frame(columns):
+    return pd.DataFrame({col: columns[col] for col in ohlcv_resample.COLUMNS},
+                        index=pd.DatetimeIndex(columns["date"]))
+
+
+def _pandas_reference(frame, rule, **kwargs):
+    grouped = frame.resample(rule, **kwargs)
+    bars = grouped.agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+    return bars[grouped.size() > 0]
+
+
+@pytest.fixture
+def daily_columns():
+    records = server.MOCK_DATA_PROVIDER.fetch_ohlc("AAPL", "daily")["data"]
+    # Drop a Monday and a month's first session so groups start mid-week/month
+    records = [r for r in records if r["date"] not in (records[10]["date"], records[40]["date"])]
+    return server._records_to_columns(records)
+
+
+@pytest.mark.parametrize("target, rule", [("weekly", "W-SUN"), ("monthly", "MS")])
+def test_calendar_resampling_matches_pandas(daily_columns, target, rule):
+    bars = ohlcv_resample.resample_ohlcv(daily_columns, "daily", target)
+    expected = _pandas_reference(_frame(daily_columns), rule)
+
+    for col in ohlcv_resample.COLUMNS:
+        assert np.array_equal(bars[col], expected[col].to_numpy()), col
+    # Dated by each period's first session
+    first_sessions = _frame(daily_columns).index.to_series().resample(rule).first().dropna()
+    assert np.array_equal(bars["date"], first_sessions.to_numpy())
+
+
+def test_intraday_buckets_align_to_session_open():
+    dates = pd.date_range("2024-03-04 09:30", "2024-03-04 15:55", freq="5min").append(
+        pd.date_range("2024-03-05 09:30", "2024-03-05 15:55", freq="5min"))
+    rng = np.random.default_rng(0)
+    close = 100 + rng.standard_normal(len(dates)).cumsum()
+    columns = {"date": dates.to_numpy(), "open": close - 0.1, "high": close + 0.5, "low": close - 0.5,
+               "close": close, "volume": rng.integers(100, 1000, len(dates)).astype(float)}
+
+    bars = ohlcv_resample.resample_ohlcv(columns, "5min", "60min")
+    expected = _pandas_reference(_frame(columns), "60min", offset="30min")
+
+    assert pd.DatetimeIndex(bars["date"])[:7].strftime("%H:%M").tolist() == [
+        "09:30", "10:30", "11:30", "12:30", "13:30", "14:30", "15:30"]
+    assert np.array_equal(bars["date"], expected.index.to_numpy())
+    for col in ohlcv_resample.COLUMNS:
+        assert np.allclose(bars[col], expected[col].to_numpy()), col
+
+
+def test_only_finer_dividing_timeframes_resample():
+    assert ohlcv_resample.can_resample("daily", "weekly")
+    assert ohlcv_resample.can_resample("15min", "60min")
+    assert not ohlcv_resample.can_resample("weekly", "monthly")
+    assert not ohlcv_resample.can_resample("60min", "15min")
+    assert server._resample_sources(("daily", "monthly", "60min", "15min", "5min")) == {
+        "monthly": "daily", "60min": "5min", "15min": "5min"}
+    with pytest.raises(ValueError):
+        ohlcv_resample.resample_ohlcv({}, "daily", "5min")
+
+
+def test_multi_timeframe_scan_fetches_only_base_bars(monkeypatch):
+    requested = []
+
+    def fake_prefetch(pairs, outputsize="compact", *args):
+        requested.extend(tf for _, tf in pairs)
+        return {pair: server.MOCK_DATA_PROVIDER.fetch_ohlc(pair[0], "daily") for pair in pairs}
+
+    monkeypatch.setattr(server, "_prefetch_stock_data", fake_prefetch)
+    filters = [
+        {"type": "price", "field": "close", "operator": "gt", "value": 1, "timeframe": "weekly"},
+        {"expression": {"type": "binary", "operator": ">",
+                        "left": {"type": "attribute", "field": "high", "timeframe": "monthly"},
+                        "right": {"type": "indicator", "field": "SMA", "time_period": 3, "timeframe": "weekly"}}},
+    ]
+
+    result = server._scan_stocks_core(["AAPL", "MSFT"], filters, "AND", full_details=True)
+
+    assert requested == ["daily", "daily"]
+    for match in result["matched_stocks"]:
+        daily = server._records_to_columns(server.MOCK_DATA_PROVIDER.fetch_ohlc(match["symbol"], "daily")["data"])
+        frames = {tf: server._cached_columns_to_frame(ohlcv_resample.resample_ohlcv(daily, "daily", tf))
+                  for tf in ("weekly", "monthly")}
+        frames["daily"] = server._cached_columns_to_frame(daily)
+        assert match["filter_details"] == [server.evaluate_single_filter(match["symbol"], frames, f)[1] for f in filters]
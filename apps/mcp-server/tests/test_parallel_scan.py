@@ -0,0 +1,112 @@
+"""Tests for scans split across worker processes over shared-memory bars."""
+from __future__ import annotations
+
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+import server
+import shared_ohlcv
+
+FILTERS = [
+    {"type": "indicator", "field": "RSI", "time_period": 14, "operator": "gt", "value": 45},
+    {"type": "price", "field": "close", "operator": "gt", "value": 50},
+]
+
+
+def test_shared_block_round_trip():
+    series = {symbol: server._records_to_columns(server.MOCK_DATA_PROVIDER.fetch_ohlc(symbol, "daily")["data"])
+              for symbol in ("AAPL", "MSFT", "TSLA")}
+    owner = shared_ohlcv.SharedOHLCV.create(series)
+    try:
+        attached = shared_ohlcv.SharedOHLCV.attach(owner.handle(["MSFT", "NVDA"]))
+        assert list(attached.index) == ["MSFT"] and attached.columns("AAPL") is None
+        columns = attached.columns("MSFT")
+        assert np.array_equal(columns["date"], series["MSFT"]["date"])
+        for name in shared_ohlcv.PRICE_COLUMNS:
+            assert np.array_equal(columns[name], series["MSFT"][name])
+        assert not columns["close"].flags.writeable
+        del columns
+        attached.close()
+    finally:
+        owner.close()
+        owner.unlink()
+
+
+@pytest.fixture
+def universe(monkeypatch):
+    symbols = [f"SYM{i}" for i in range(12)] + ["BAD", "EMPTY", "EXTRA", "SYM3"]
+    calls = []
+
+    def prefetch(pairs, outputsize="compact", *args):
+        calls.append(list(pairs))
+        fetched = {}
+        for symbol, tf in pairs:
+            if symbol == "BAD":
+                fetched[(symbol, tf)] = ConnectionError("provider down")
+            elif symbol == "EMPTY":
+                fetched[(symbol, tf)] = {"symbol": symbol, "data": []}
+            else:
+                records = server.MOCK_DATA_PROVIDER.fetch_ohlc(symbol, tf)["data"]
+                if symbol == "EXTRA":
+                    records = [dict(record, vwap=record["close"]) for record in records]
+                fetched[(symbol, tf)] = {"symbol": symbol, "data": records}
+        return fetched
+
+    monkeypatch.setattr(server, "_prefetch_stock_data", prefetch)
+    monkeypatch.setattr(server, "_scan_pool_state", {"pool": None})
+    monkeypatch.setattr(server, "SCAN_PARALLEL_MIN_SYMBOLS", 10)
+    yield symbols, calls
+    server._shutdown_scan_process_pool()
+
+
+def _comparable(result):
+    return {key: value for key, value in result.items() if key not in ("scan_time", "indicator_cache")}
+
+
+def test_parallel_scan_matches_serial_scan(universe, monkeypatch):
+    symbols, calls = universe
+    serial = {logic: server._scan_stocks_core(symbols, FILTERS, logic) for logic in ("AND", "OR")}
+    assert 0 < serial["AND"]["total_matched"] < serial["OR"]["total_matched"]
+    monkeypatch.setattr(server, "SCAN_WORKERS", 2)
+
+    for logic in ("AND", "OR"):
+        parallel = server._scan_stocks_core(symbols, FILTERS, logic)
+        assert _comparable(parallel) == _comparable(serial[logic])
+        assert [stock["symbol"] for stock in parallel["failed_stocks"]] == ["EMPTY"]
+        assert len(calls[-1]) == len(set(symbols))  # workers fetched nothing
+    assert len(calls) == 4 and server._scan_pool_state["pool"] is not None
+
+
+def test_broken_pool_finishes_in_process(universe, monkeypatch):
+    symbols, calls = universe
+    serial = server._scan_stocks_core(symbols, FILTERS)
+    monkeypatch.setattr(server, "SCAN_WORKERS", 4)
+
+    def broken_pool():
+        raise BrokenProcessPool("worker died")
+
+    monkeypatch.setattr(server, "_scan_process_pool", broken_pool)
+    assert _comparable(server._scan_stocks_core(symbols, FILTERS)) == _comparable(serial)
+    assert len(calls) == 2  # the bars fetched for the workers are reused
+
+
+def test_failed_chunk_cancels_pending_chunks(universe, monkeypatch):
+    symbols, calls = universe
+    serial = server._scan_stocks_core(symbols, FILTERS)
+    submitted = []
+
+    class FailingPool:
+        def submit(self, fn, *args):
+            future = Future()
+            if not submitted:
+                future.set_exception(RuntimeError("chunk failed"))
+            submitted.append(future)
+            return future
+
+    monkeypatch.setattr(server, "SCAN_WORKERS", 2)
+    monkeypatch.setattr(server, "_scan_process_pool", FailingPool)
+    assert _comparable(server._scan_stocks_core(symbols, FILTERS)) == _comparable(serial)
+    assert len(submitted) == 4 and all(future.cancelled() for future in submitted[1:])
@@ -0,0 +1,109 @@
+"""Tests for run_tool.py forwarding calls to a warm daemon."""
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import run_tool
+
+
+@pytest.fixture
+def daemon(monkeypatch):
+    """Stand-in for `server.py --daemon` answering JSON-RPC tools/call."""
+    responses = {}
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            message = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            received.append((self.path, message))
+            body = json.dumps({"jsonrpc": "2.0", "id": message["id"],
+                               "result": responses[message["params"]["name"]]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    monkeypatch.setattr(run_tool, "DAEMON_URL", f"http://127.0.0.1:{httpd.server_address[1]}/mcp")
+    monkeypatch.setattr(run_tool, "DAEMON_SOCKET", None)
+    yield responses, received
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_forwards_tool_call(daemon):
+    responses, received = daemon
+    responses["scan_stocks"] = {"content": [], "structuredContent": {"matched_stocks": []}, "isError": False}
+
+    assert run_tool._call_daemon("scan_stocks", {"symbols": ["AAPL"]}) == {"matched_stocks": []}
+    assert received == [("/mcp", {
+        "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+        "params": {"name": "scan_stocks", "arguments": {"symbols": ["AAPL"]}},
+    })]
+
+
+def test_wrapped_and_failed_results(daemon):
+    responses, _ = daemon
+    responses["fetch_stock_universe"] = {
+        "_meta": {"fastmcp": {"wrap_result": True}},
+        "content": [{"type": "text", "text": "[]"}], "structuredContent": {"result": "[]"}, "isError": False,
+    }
+    responses["broken"] = {"content": [{"type": "text", "text": "boom"}], "isError": True}
+
+    with pytest.raises(TypeError):
+        run_tool._call_daemon("fetch_stock_universe", {})
+    with pytest.raises(RuntimeError, match="boom"):
+        run_tool._call_daemon("broken", {})
+
+
+def test_unreachable_daemon_falls_back(monkeypatch, tmp_path):
+    monkeypatch.setattr(run_tool, "DAEMON_URL", None)
+    monkeypatch.setattr(run_tool, "DAEMON_SOCKET", None)
+    assert run_tool._call_daemon("scan_stocks", {}) is None
+
+    monkeypatch.setattr(run_tool, "DAEMON_SOCKET", str(tmp_path / "missing.sock"))
+    assert run_tool._call_daemon("scan_stocks", {}) is None
+
+
+def test_batch_runs_concurrently_and_keeps_input_order():
+    import asyncio
+    import io
+
+    active, peak = 0, 0
+
+    async def fake_call(tool_name, payload):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(payload["delay"])
+        active -= 1
+        if tool_name == "fail":
+            raise RuntimeError("tool failed")
+        return {"tool": tool_name, "n": payload["n"]}
+
+    lines = [
+        {"id": "slow", "tool": "a", "payload": {"delay": 0.2, "n": 1}},
+        {"tool": "b", "payload": {"delay": 0.1, "n": 2}},
+        {"id": 9, "tool": "fail", "payload": {"delay": 0.05, "n": 3}},
+    ]
+    stdin = io.StringIO("\n".join(json.dumps(line) for line in lines) + "\n\n[1]\n")
+    stdout = io.StringIO()
+
+    asyncio.run(run_tool._process_batch(fake_call, stdin, stdout, concurrency=4))
+
+    assert [json.loads(line) for line in stdout.getvalue().splitlines()] == [
+        {"id": "slow", "ok": True, "result": {"tool": "a", "n": 1}},
+        {"id": 2, "ok": True, "result": {"tool": "b", "n": 2}},
+        {"id": 9, "ok": False, "error": "RuntimeError: tool failed"},
+        {"id": 5, "ok": False, "error": "ValueError: request must be a JSON object"},
+    ]
+    assert peak == 3
@@ -0,0 +1,68 @@
+"""Tests for running MCP tools on the bounded tool executor."""
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from fastmcp import Client
+
+import server
+
+
+def test_tools_are_registered_async_and_run_on_tool_threads():
+    async def call():
+        async with Client(server.mcp) as client:
+            names = {tool.name for tool in await client.list_tools()}
+            result = await client.call_tool("parse_natural_language_query", {"query": "RSI above 70"})
+            thread = await server._run_tool("fetch_stock_data", lambda: threading.current_thread().name)
+            return names, result.data, thread
+
+    names, data, thread = asyncio.run(call())
+
+    assert {"scan_stocks", "fetch_stock_data", "health_check"} <= names
+    assert data["filters"][0]["field"] == "rsi" and data["filters"][0]["value"] == 70.0
+    assert thread.startswith("mcp-tool")
+
+
+def test_slow_tool_limit_leaves_threads_for_quick_calls(monkeypatch):
+    monkeypatch.setattr(server, "TOOL_WORKERS", 4)
+    monkeypatch.setattr(server, "TOOL_SLOW_CONCURRENCY", 2)
+    monkeypatch.setattr(server, "TOOL_CONCURRENCY", {"scan_stocks": 1})
+    monkeypatch.setattr(server, "_tool_semaphores", {})
+    monkeypatch.setattr(server, "_tool_executor_state", {"executor": None})
+    release = threading.Event()
+    running = {"scan_stocks": 0, "run_preset_scan": 0}
+    peak = []
+
+    def slow(name):
+        running[name] += 1
+        peak.append(dict(running))
+        release.wait(5)
+        running[name] -= 1
+        return name
+
+    async def call():
+        # Two different slow tools saturate together: they share two of the four threads
+        slow_calls = [asyncio.create_task(server._run_tool(name, slow, name))
+                      for name in ["scan_stocks"] * 3 + ["run_preset_scan"] * 3]
+        await asyncio.sleep(0.05)
+        quick = await asyncio.gather(*(asyncio.wait_for(server._run_tool("fetch_stock_data", lambda: "fetched"), 2)
+                                       for _ in range(2)))
+        stats = server._tool_stats()
+        release.set()
+        return quick, stats, await asyncio.gather(*slow_calls)
+
+    try:
+        quick, stats, results = asyncio.run(call())
+    finally:
+        server._tool_executor().shutdown()
+
+    assert quick == ["fetched"] * 2 and sorted(results) == ["run_preset_scan"] * 3 + ["scan_stocks"] * 3
+    assert stats["running"] == {"scan_stocks": 1, "run_preset_scan": 1}
+    assert max(sum(counts.values()) for counts in peak) == 2
+    assert max(counts["scan_stocks"] for counts in peak) == 1
+
+
+def test_tool_concurrency_spec():
+    limits = server._parse_tool_concurrency("scan_stocks=2, fetch_stock_data=6,ingest_candles=0,bogus")
+    assert limits == {"scan_stocks": 2, "fetch_stock_data": 6}
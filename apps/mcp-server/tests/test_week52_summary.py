@@ -0,0 +1,117 @@
+"""Tests for the maintained 52-week high/low summaries behind price_52week filters."""
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, List
+
+import pytest
+
+import server
+
+
+def _bars(n: int, seed: int = 1, start: str = "2024-01-01") -> List[Dict[str, Any]]:
+    r = random.Random(seed)
+    dates = server.pd.bdate_range(start, periods=n)
+    price, records = 100.0, []
+    for day in dates:
+        price *= 1 + (r.random() - 0.5) / 25
+        records.append({"date": day.strftime("%Y-%m-%d"), "open": price, "high": price * 1.01,
+                        "low": price * 0.99, "close": price, "volume": 1000})
+    return records
+
+
+def test_rolling_summary_matches_window_extremes():
+    records = _bars(400)
+    summary = server.Rolling52WeekSummary(50)
+
+    for i, record in enumerate(records):
+        summary.push(record["date"], record["high"], record["low"], record["close"])
+        window = records[max(0, i - 49):i + 1]
+        assert summary.high == max(r["high"] for r in window)
+        assert summary.low == min(r["low"] for r in window)
+        assert summary.close == record["close"]
+    assert summary.complete and len(summary._highs) < 50
+
+
+def test_forming_candle_updates_in_place_or_marks_stale():
+    summary = server.Rolling52WeekSummary(3)
+    for date, high, low in [("2024-01-01", 10, 5), ("2024-01-02", 12, 6), ("2024-01-03", 11, 7)]:
+        summary.push(date, high, low, low)
+
+    summary.push("2024-01-03", 13, 4, 4)  # expanding candle: applied exactly
+    assert (summary.high, summary.low, summary.count, summary.stale) == (13, 4, 3, False)
+
+    summary.push("2024-01-03", 11, 7, 7)  # shrinking candle: previous extremes are lost
+    assert summary.stale
+
+
+def test_store_appends_only_new_bars_and_rebuilds_on_gaps():
+    records = _bars(300)
+    store = server.Week52SummaryStore(252)
+
+    store.observe("AAPL", records[:260])
+    first = store.get("AAPL", 252)
+    store.observe("AAPL", records[200:280])
+    columns = {"date": server.np.array([r["date"] for r in records[270:]], dtype="datetime64[s]"),
+               **{c: server.np.array([r[c] for r in records[270:]]) for c in ("high", "low", "close")}}
+    store.observe("AAPL", columns)
+
+    expected = server.Week52SummaryStore(252).seed("AAPL", 252, records)
+    summary = store.get("AAPL", 252)
+    assert summary is first
+    assert (summary.high, summary.low, summary.last_date, summary.count) == (
+        expected.high, expected.low, expected.last_date, 252 + 40)
+
+    store.observe("AAPL", _bars(20, start="2026-01-01"))
+    assert store.get("AAPL", 252).count == 20 and not store.get("AAPL", 252).complete
+
+
+@pytest.fixture
+def daily_market(monkeypatch):
+    records = _bars(300, seed=7)
+    fetches = []
+
+    def fake_fetch(symbol, interval="daily", outputsize="compact", as_columns=False):
+        fetches.append(outputsize)
+        data = records[-outputsize:] if isinstance(outputsize, int) else records[-100:]
+        return {"symbol": symbol, "interval": interval, "data": data, "data_points": len(data)}
+
+    monkeypatch.setattr(server, "WEEK52_SUMMARIES", server.Week52SummaryStore(252))
+    monkeypatch.setattr(server, "_fetch_stock_data_uncached", fake_fetch)
+    monkeypatch.setattr(server, "_fetch_stock_data_core", fake_fetch)
+    monkeypatch.setattr(server, "_prefetch_stock_data", lambda pairs, outputsize="compact", *args: {
+        pair: fake_fetch(pair[0], pair[1], outputsize) for pair in pairs})
+    return records, fetches
+
+
+def test_price_52week_filter_reads_maintained_summary(daily_market):
+    records, fetches = daily_market
+    window = records[-252:]
+    filters = [{"type": "price_52week", "field": "close", "operator": "lt", "value": 100,
+                "metric": "distance_from_high_pct"}]
+
+    result = server._scan_stocks_core(["AAPL"], filters, "AND")
+    detail = result["matched_stocks"][0]["filter_details"][0]
+
+    assert fetches == [252]  # planned window only; never outputsize='full'
+    assert detail["high_52w"] == max(r["high"] for r in window)
+    assert detail["low_52w"] == min(r["low"] for r in window)
+    assert detail["current_value"] == pytest.approx(
+        (detail["high_52w"] - records[-1]["close"]) / detail["high_52w"] * 100)
+
+    summary = server.WEEK52_SUMMARIES.get("AAPL", 252)
+    server._scan_stocks_core(["AAPL"], filters, "AND")
+    assert server.WEEK52_SUMMARIES.get("AAPL", 252) is summary
+
+
+def test_price_52week_one_off_call_fetches_exact_window(daily_market):
+    records, fetches = daily_market
+    frames = {"daily": server._records_to_frame(records[-100:])}
+    config = {"type": "price_52week", "field": "close", "operator": "gt", "value": 0,
+              "metric": "distance_from_low_pct", "lookback_days": 200}
+
+    passed, detail = server.evaluate_single_filter("MSFT", frames, config)
+
+    assert passed is True
+    assert fetches == [200]
+    assert detail["low_52w"] == min(r["low"] for r in records[-200:])